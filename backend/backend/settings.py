@@ -93,3 +93,86 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+
+
+# Wumpus session store
+# Live games per store, seconds of inactivity before a game is snapshotted,
+# and how many bytes of compressed snapshots of evicted games are kept for restoring
+
+WUMPUS_SESSION_STORE = 'wumpus.session_store.SessionStore'
+WUMPUS_SESSION_MAX_GAMES = 1000
+WUMPUS_SESSION_IDLE_TTL = 1800
+WUMPUS_SESSION_MAX_SNAPSHOT_BYTES = 64 * 1024 * 1024
+
+
+# Shared game store
+# Games are persisted here so every worker process can serve any session.
+# Use 'wumpus.game_store.MemoryGameBackend' for a single-process setup.
+# Sessions are locked in stripes; more stripes mean fewer unrelated sessions
+# waiting on each other
+
+WUMPUS_GAME_BACKEND = 'wumpus.game_store.SQLiteGameBackend'
+WUMPUS_GAME_DB = BASE_DIR / 'wumpus_games.sqlite3'
+WUMPUS_GAME_LOCK_STRIPES = 64
+
+
+# Background jobs (benchmarks and strategy comparisons)
+# Worker processes shared by all jobs (None = one per core), jobs run at once,
+# finished jobs kept for status queries, and the most games one job may play
+# across all of its strategies. Jobs are published to the shared game backend,
+# so any worker process can report on or cancel them
+
+WUMPUS_JOB_WORKERS = None
+WUMPUS_MAX_RUNNING_JOBS = 2
+WUMPUS_MAX_FINISHED_JOBS = 100
+WUMPUS_MAX_BENCHMARK_GAMES = 1000
+
+
+# Most AI moves a single api/ai-step/ request may play
+
+WUMPUS_MAX_AI_STEPS = 200
+
+
+# Largest board api/random-environment/ generates; the game board is 10x10
+
+WUMPUS_MAX_BOARD_SIZE = 10
+
+
+# Server push (WebSocket at ws/game/, Server-Sent Events at api/events/)
+# Events queued per observer before the oldest are dropped, seconds between
+# keep-alive messages, and the shortest delay between auto-played AI moves.
+# Events reach observers connected to other worker processes through the
+# shared game backend, which is polled every WUMPUS_PUSH_POLL_INTERVAL seconds
+# and keeps each event for WUMPUS_PUSH_EVENT_TTL seconds. Under WSGI every
+# Server-Sent Events observer holds a worker thread, so at most
+# WUMPUS_PUSH_MAX_SYNC_STREAMS are open at once per process (ASGI has no limit)
+
+WUMPUS_PUSH_MAX_QUEUED = 100
+WUMPUS_PUSH_HEARTBEAT = 15.0
+WUMPUS_AUTO_PLAY_MIN_DELAY = 0.05
+WUMPUS_PUSH_POLL_INTERVAL = 0.25
+WUMPUS_PUSH_EVENT_TTL = 60.0
+WUMPUS_PUSH_MAX_SYNC_STREAMS = 8
+
+
+# Threads running game work for the async views (None = Python's default);
+# requests of one session are still handled one at a time
+
+WUMPUS_SESSION_WORKERS = None
+
+
+# Environment pool
+# Random boards generated ahead of time for new games and unseeded
+# api/random-environment/ requests
+
+WUMPUS_ENVIRONMENT_POOL_SIZE = 32
+
+
+# What the AI is told about the cave
+# Most wumpuses it may assume are in the cave (None = unknown), and the prior
+# share of cells holding a pit or a wumpus (None = one wumpus per board), as on
+# generated boards
+
+WUMPUS_AI_WUMPUS_LIMIT = None
+WUMPUS_AI_PIT_DENSITY = 0.06
+WUMPUS_AI_WUMPUS_DENSITY = None
@@ -0,0 +1,126 @@
+"""
+Session Executor for Wumpus World
+Runs game work for the async views on a bounded thread pool, off the event
+loop. Calls for the same session run one at a time in submission order, so a
+slow AI hint only delays later requests of its own session; calls for other
+sessions keep running on the remaining workers. Across processes, sessions
+are protected by the version check of the shared game store.
+"""
+
+import asyncio
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from django.conf import settings
+
+from .game_store import GameConflictError
+
+# Attempts at a call whose game save keeps losing to other processes
+CONFLICT_RETRIES = 3
+
+
+class SessionExecutor:
+    """Bounded thread pool with one queue of pending calls per busy session"""
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='wumpus-session')
+        # Calls waiting behind the running call of their session; a session is
+        # present only while one of its calls is running
+        self.pending: Dict[str, Deque[Tuple[Callable, tuple, Future]]] = {}
+        self.lock = threading.Lock()
+
+        self.metrics = {
+            'submitted': 0,
+            'queued': 0,
+            'completed': 0,
+            'failed': 0,
+            'cancelled': 0
+        }
+
+    def submit(self, session_id: str, fn: Callable, *args) -> Future:
+        """Schedule fn(*args) after every earlier call of the session"""
+        future = Future()
+        with self.lock:
+            self.metrics['submitted'] += 1
+            pending = self.pending.get(session_id)
+            if pending is not None:
+                pending.append((fn, args, future))
+                self.metrics['queued'] += 1
+                return future
+            self.pending[session_id] = deque()
+
+        self.pool.submit(self.run, session_id, fn, args, future)
+        return future
+
+    def run(self, session_id: str, fn: Callable, args: tuple, future: Future):
+        """Run one call, then hand the worker to the next call of the same session"""
+        while True:
+            # Calls whose caller has gone away are skipped
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args)
+                except BaseException as e:
+                    future.set_exception(e)
+                    outcome = 'failed'
+                else:
+                    future.set_result(result)
+                    outcome = 'completed'
+            else:
+                outcome = 'cancelled'
+
+            with self.lock:
+                self.metrics[outcome] += 1
+                pending = self.pending[session_id]
+                if not pending:
+                    del self.pending[session_id]
+                    return
+                fn, args, future = pending.popleft()
+
+    async def run_async(self, session_id: str, fn: Callable, *args) -> Any:
+        """Await fn(*args) from an event loop"""
+        return await asyncio.wrap_future(self.submit(session_id, fn, *args))
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            return {
+                **self.metrics,
+                'busy_sessions': len(self.pending),
+                'waiting': sum(len(pending) for pending in self.pending.values()),
+                'max_workers': self.max_workers
+            }
+
+
+_executor: Optional[SessionExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_session_executor() -> SessionExecutor:
+    """Get the process-wide session executor, configured from settings"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = SessionExecutor(max_workers=getattr(settings, 'WUMPUS_SESSION_WORKERS', None))
+        return _executor
+
+
+def retry_conflicts(fn: Callable, *args) -> Any:
+    """
+    Call fn(*args) again when its save lost a race with another process. The
+    stale game has been dropped from the store by then, so the next attempt
+    works on the stored version.
+    """
+    for attempt in range(CONFLICT_RETRIES):
+        try:
+            return fn(*args)
+        except GameConflictError:
+            if attempt == CONFLICT_RETRIES - 1:
+                raise
+
+
+async def run_for_session(session_id: str, fn: Callable, *args) -> Any:
+    """Run game work for a session on the session executor"""
+    return await get_session_executor().run_async(session_id, retry_conflicts, fn, *args)
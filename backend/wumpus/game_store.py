@@ -0,0 +1,409 @@
+"""
+Shared Game Store for Wumpus World
+Persists serialised games in a backend that every Django worker process can
+reach, so requests for one session may land on any worker. SQLite is the
+default backend; MemoryGameBackend is a Redis-like stand-in with the same
+interface. Backends also keep a short log of game events, through which push.py
+relays events between processes.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Bumped whenever the serialised layout of a game changes
+FORMAT_VERSION = 7
+
+
+class GameConflictError(Exception):
+    """The stored game was changed by someone else since it was loaded"""
+
+
+def serialize_game(game: Any) -> bytes:
+    """Serialise a game into a compact, versioned blob"""
+    return bytes([FORMAT_VERSION]) + zlib.compress(pickle.dumps(game, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def deserialize_game(data: bytes) -> Any:
+    """Rebuild a game from serialize_game output"""
+    if not data or data[0] != FORMAT_VERSION:
+        raise ValueError("Unsupported game format")
+    return pickle.loads(zlib.decompress(data[1:]))
+
+
+class GameStateBackend:
+    """Key/value storage for serialised games, shared between worker processes"""
+
+    # Set by backends that only the threads of one process can reach
+    process_local = False
+
+    def load(self, key: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        """
+        Get (version, data) for a key, or None if it is not stored.
+        Data is None when the stored version equals known_version.
+        """
+        raise NotImplementedError
+
+    def save(self, key: str, data: bytes, expected_version: Optional[int] = None) -> int:
+        """
+        Store data for a key and return its new version. With expected_version
+        the write only happens if the stored version still equals it, and
+        GameConflictError is raised otherwise.
+        """
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        """Remove a key if it is stored"""
+        raise NotImplementedError
+
+    def keys(self) -> list:
+        """List every stored key"""
+        raise NotImplementedError
+
+    def expire(self, max_idle: float):
+        """Remove keys that have not been written for max_idle seconds"""
+        raise NotImplementedError
+
+    def append_event(self, key: str, data: bytes) -> int:
+        """Add an event for a key to the event log and return its id; ids only ever grow"""
+        raise NotImplementedError
+
+    def read_events(self, after_id: int, limit: int = 500) -> List[Tuple[int, str, bytes]]:
+        """Get up to limit (id, key, data) events newer than after_id, oldest first"""
+        raise NotImplementedError
+
+    def last_event_id(self) -> int:
+        """Id of the newest event, or 0 if none was ever added"""
+        raise NotImplementedError
+
+    def expire_events(self, max_age: float):
+        """Remove events added more than max_age seconds ago"""
+        raise NotImplementedError
+
+
+class SQLiteGameBackend(GameStateBackend):
+    """Game storage in a SQLite file; every process opening the same file sees the same games"""
+
+    def __init__(self, path: str):
+        self.path = str(path)
+        self.local = threading.local()
+        self.connection().execute(
+            "CREATE TABLE IF NOT EXISTS wumpus_games ("
+            "session_id TEXT PRIMARY KEY, version INTEGER NOT NULL, "
+            "data BLOB NOT NULL, updated REAL NOT NULL)"
+        )
+        # AUTOINCREMENT keeps ids of expired events from being handed out again
+        self.connection().execute(
+            "CREATE TABLE IF NOT EXISTS wumpus_events ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, session_id TEXT NOT NULL, "
+            "data BLOB NOT NULL, created REAL NOT NULL)"
+        )
+
+    def connection(self) -> sqlite3.Connection:
+        """One connection per thread, in autocommit mode with WAL so readers never block the writer"""
+        connection = getattr(self.local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def load(self, key: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        connection = self.connection()
+        if known_version is not None:
+            row = connection.execute(
+                "SELECT version FROM wumpus_games WHERE session_id = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[0] == known_version:
+                return row[0], None
+
+        row = connection.execute(
+            "SELECT version, data FROM wumpus_games WHERE session_id = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return row[0], bytes(row[1])
+
+    def save(self, key: str, data: bytes, expected_version: Optional[int] = None) -> int:
+        if expected_version is not None:
+            # Compare-and-swap: a single statement, so no other writer can slip in between
+            row = self.connection().execute(
+                "UPDATE wumpus_games SET version = version + 1, data = ?, updated = ? "
+                "WHERE session_id = ? AND version = ? RETURNING version",
+                (data, time.time(), key, expected_version)
+            ).fetchone()
+            if row is None:
+                raise GameConflictError(f"Game {key} changed since version {expected_version}")
+            return row[0]
+
+        row = self.connection().execute(
+            "INSERT INTO wumpus_games (session_id, version, data, updated) VALUES (?, 1, ?, ?) "
+            "ON CONFLICT(session_id) DO UPDATE SET version = version + 1, "
+            "data = excluded.data, updated = excluded.updated "
+            "RETURNING version",
+            (key, data, time.time())
+        ).fetchone()
+        return row[0]
+
+    def delete(self, key: str):
+        self.connection().execute("DELETE FROM wumpus_games WHERE session_id = ?", (key,))
+
+    def keys(self) -> list:
+        return [row[0] for row in self.connection().execute("SELECT session_id FROM wumpus_games")]
+
+    def expire(self, max_idle: float):
+        self.connection().execute("DELETE FROM wumpus_games WHERE updated < ?", (time.time() - max_idle,))
+
+    def append_event(self, key: str, data: bytes) -> int:
+        return self.connection().execute(
+            "INSERT INTO wumpus_events (session_id, data, created) VALUES (?, ?, ?)",
+            (key, data, time.time())
+        ).lastrowid
+
+    def read_events(self, after_id: int, limit: int = 500) -> List[Tuple[int, str, bytes]]:
+        return [(row[0], row[1], bytes(row[2])) for row in self.connection().execute(
+            "SELECT id, session_id, data FROM wumpus_events WHERE id > ? ORDER BY id LIMIT ?",
+            (after_id, limit))]
+
+    def last_event_id(self) -> int:
+        row = self.connection().execute("SELECT MAX(id) FROM wumpus_events").fetchone()
+        return row[0] or 0
+
+    def expire_events(self, max_age: float):
+        self.connection().execute("DELETE FROM wumpus_events WHERE created < ?", (time.time() - max_age,))
+
+
+class MemoryGameBackend(GameStateBackend):
+    """
+    In-memory stand-in for a Redis-style server: versioned values under string
+    keys. Shared between the threads of one process only.
+    """
+
+    process_local = True
+
+    def __init__(self):
+        self.values: Dict[str, Tuple[int, bytes, float]] = {}
+        self.events: List[Tuple[int, str, bytes, float]] = []
+        self.next_event_id = 1
+        self.lock = threading.Lock()
+
+    def load(self, key: str, known_version: Optional[int] = None) -> Optional[Tuple[int, Optional[bytes]]]:
+        with self.lock:
+            entry = self.values.get(key)
+        if entry is None:
+            return None
+        version, data, _ = entry
+        return version, (None if version == known_version else data)
+
+    def save(self, key: str, data: bytes, expected_version: Optional[int] = None) -> int:
+        with self.lock:
+            entry = self.values.get(key)
+            if expected_version is not None and (entry is None or entry[0] != expected_version):
+                raise GameConflictError(f"Game {key} changed since version {expected_version}")
+            version = entry[0] + 1 if entry else 1
+            self.values[key] = (version, data, time.time())
+        return version
+
+    def delete(self, key: str):
+        with self.lock:
+            self.values.pop(key, None)
+
+    def keys(self) -> list:
+        with self.lock:
+            return list(self.values)
+
+    def expire(self, max_idle: float):
+        cutoff = time.time() - max_idle
+        with self.lock:
+            for key in [key for key, entry in self.values.items() if entry[2] < cutoff]:
+                del self.values[key]
+
+    def append_event(self, key: str, data: bytes) -> int:
+        with self.lock:
+            event_id = self.next_event_id
+            self.next_event_id += 1
+            self.events.append((event_id, key, data, time.time()))
+        return event_id
+
+    def read_events(self, after_id: int, limit: int = 500) -> List[Tuple[int, str, bytes]]:
+        with self.lock:
+            return [(event_id, key, data) for event_id, key, data, _ in self.events
+                    if event_id > after_id][:limit]
+
+    def last_event_id(self) -> int:
+        with self.lock:
+            return self.next_event_id - 1
+
+    def expire_events(self, max_age: float):
+        cutoff = time.time() - max_age
+        with self.lock:
+            self.events = [event for event in self.events if event[3] >= cutoff]
+
+
+class SharedGameStore(MutableMapping):
+    """
+    Mapping of session id -> game backed by a shared GameStateBackend.
+    Deserialised games are kept in a small per-process cache and reused for as
+    long as the stored version has not moved on. Unlike a plain dict, a game
+    changed in place must be assigned back to be saved.
+
+    Sessions are guarded by striped locks rather than one store-wide lock, so
+    backend reads and writes of different sessions overlap. Saving a game that
+    was loaded from the store only succeeds if no other process saved that
+    session in the meantime; otherwise GameConflictError is raised and the
+    stale copy is dropped, so the caller can load the game again and retry.
+    A stored game that can no longer be unpickled is deleted and reported as
+    missing, so views start a new game for the session.
+    """
+
+    def __init__(self, name: str, backend: GameStateBackend, max_cached: int = 1000,
+                 idle_ttl: float = 1800.0, expire_every: int = 500, stripes: int = 64):
+        self.name = name
+        self.backend = backend
+        self.max_cached = max(1, max_cached)
+        self.idle_ttl = idle_ttl
+        self.expire_every = expire_every
+        self.cache: "OrderedDict[str, Tuple[int, Any]]" = OrderedDict()
+        # Guards the cache and metrics only; never held during backend calls
+        self.cache_lock = threading.Lock()
+        self.stripes = [threading.RLock() for _ in range(max(1, stripes))]
+
+        self.metrics = {
+            'hits': 0,
+            'loads': 0,
+            'misses': 0,
+            'discarded': 0,
+            'saves': 0,
+            'conflicts': 0,
+            'bytes_saved': 0
+        }
+
+    def session_lock(self, session_id: str) -> threading.RLock:
+        """
+        Lock of the stripe a session belongs to. Hold it around a load, change
+        and save of a game to keep other threads of this process out.
+        """
+        return self.stripes[hash(session_id) % len(self.stripes)]
+
+    def __getitem__(self, session_id: str) -> Any:
+        with self.session_lock(session_id):
+            with self.cache_lock:
+                cached = self.cache.get(session_id)
+            entry = self.backend.load(session_id, cached[0] if cached else None)
+
+            if entry is None:
+                with self.cache_lock:
+                    self.cache.pop(session_id, None)
+                    self.metrics['misses'] += 1
+                raise KeyError(session_id)
+
+            version, data = entry
+            if data is None:
+                with self.cache_lock:
+                    self.metrics['hits'] += 1
+                    if session_id in self.cache:
+                        self.cache.move_to_end(session_id)
+                return cached[1]
+
+            try:
+                game = deserialize_game(data)
+            except Exception as e:
+                # Written in an older format or with engine classes that have
+                # changed since; the session starts over with a new game
+                print(f"Discarding stored game {session_id}: {e}")
+                self.backend.delete(session_id)
+                with self.cache_lock:
+                    self.cache.pop(session_id, None)
+                    self.metrics['discarded'] += 1
+                raise KeyError(session_id)
+
+            with self.cache_lock:
+                self.metrics['loads'] += 1
+                self.remember(session_id, version, game)
+            return game
+
+    def __setitem__(self, session_id: str, game: Any):
+        data = serialize_game(game)
+        with self.session_lock(session_id):
+            # A game loaded from the store is saved over the version it was loaded
+            # at; a new game object replaces whatever is stored
+            with self.cache_lock:
+                cached = self.cache.get(session_id)
+            expected_version = cached[0] if cached and cached[1] is game else None
+
+            try:
+                version = self.backend.save(session_id, data, expected_version)
+            except GameConflictError:
+                with self.cache_lock:
+                    self.cache.pop(session_id, None)
+                    self.metrics['conflicts'] += 1
+                raise
+
+            with self.cache_lock:
+                self.remember(session_id, version, game)
+                self.metrics['saves'] += 1
+                self.metrics['bytes_saved'] += len(data)
+                expire = self.idle_ttl and self.expire_every and self.metrics['saves'] % self.expire_every == 0
+
+        if expire:
+            self.backend.expire(self.idle_ttl)
+
+    def __delitem__(self, session_id: str):
+        with self.session_lock(session_id):
+            with self.cache_lock:
+                self.cache.pop(session_id, None)
+            self.backend.delete(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.backend.keys())
+
+    def __len__(self) -> int:
+        return len(self.backend.keys())
+
+    def remember(self, session_id: str, version: int, game: Any):
+        """Cache a deserialised game, dropping the least recently used beyond the limit; needs cache_lock"""
+        self.cache[session_id] = (version, game)
+        self.cache.move_to_end(session_id)
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+
+    def get_metrics(self) -> Dict:
+        """Get cache and backend counters"""
+        with self.cache_lock:
+            lookups = self.metrics['hits'] + self.metrics['loads'] + self.metrics['misses']
+            return {
+                'name': self.name,
+                'backend': type(self.backend).__name__,
+                **self.metrics,
+                'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+                'cached': len(self.cache),
+                'average_game_bytes': self.metrics['bytes_saved'] / self.metrics['saves'] if self.metrics['saves'] else 0
+            }
+
+
+def create_game_backend() -> GameStateBackend:
+    """Create the shared game backend configured in settings"""
+    backend_class = import_string(getattr(settings, 'WUMPUS_GAME_BACKEND', 'wumpus.game_store.SQLiteGameBackend'))
+    if issubclass(backend_class, SQLiteGameBackend):
+        return backend_class(getattr(settings, 'WUMPUS_GAME_DB', settings.BASE_DIR / 'wumpus_games.sqlite3'))
+    return backend_class()
+
+
+def create_game_store(name: str) -> SharedGameStore:
+    """Create the shared game store configured in settings"""
+    return SharedGameStore(
+        name,
+        create_game_backend(),
+        max_cached=getattr(settings, 'WUMPUS_SESSION_MAX_GAMES', 1000),
+        idle_ttl=getattr(settings, 'WUMPUS_SESSION_IDLE_TTL', 1800.0),
+        stripes=getattr(settings, 'WUMPUS_GAME_LOCK_STRIPES', 64)
+    )
@@ -0,0 +1,303 @@
+"""
+Background Jobs for Wumpus World
+Runs benchmarks and strategy comparisons off the request path. A submitted
+job gets an id straight away; its games are played on a shared process pool
+while a coordinator thread collects results, so clients can poll the status,
+read partial results or cancel it. Jobs are published to the shared game
+backend as they progress, so any worker process can answer for a job, and a
+cancellation requested on another worker is picked up by the one running it.
+"""
+
+import json
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+from django.conf import settings
+
+from .game_store import GameStateBackend, MemoryGameBackend, create_game_backend
+from .logic.auto_play import AutoPlayAI
+
+# Shortest time between two writes of a running job to the shared backend, and
+# between two checks for a cancellation requested by another process
+PUBLISH_INTERVAL = 0.5
+
+
+@dataclass
+class Job:
+    """A benchmark or strategy comparison running in the background"""
+    job_id: str
+    kind: str
+    params: Dict
+    total_games: int
+    status: str = 'queued'  # 'queued', 'running', 'completed', 'cancelled', 'failed'
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    results: List[Dict] = field(default_factory=list)
+    result: Optional[Dict] = None
+    error: Optional[str] = None
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+    future: Optional[Future] = field(default=None, repr=False)
+    # Results not yet handed to the job's on_results callback
+    unreported: int = field(default=0, repr=False)
+    published_at: float = field(default=0.0, repr=False)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('completed', 'cancelled', 'failed')
+
+    def to_dict(self) -> Dict:
+        """Status of the job without its per-game results"""
+        return {
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'params': self.params,
+            'status': self.status,
+            'completed_games': len(self.results),
+            'total_games': self.total_games,
+            'progress': len(self.results) / self.total_games if self.total_games else 1.0,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'error': self.error
+        }
+
+    def to_record(self) -> bytes:
+        """Everything other processes need to answer for the job"""
+        return json.dumps({
+            'job_id': self.job_id,
+            'kind': self.kind,
+            'params': self.params,
+            'total_games': self.total_games,
+            'status': self.status,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at,
+            'results': self.results,
+            'result': self.result,
+            'error': self.error
+        }).encode()
+
+    @classmethod
+    def from_record(cls, data: bytes) -> 'Job':
+        """Read-only copy of a job published by another process"""
+        return cls(**json.loads(data))
+
+    def partial_results(self, offset: int = 0) -> Dict:
+        """Summary of the games finished so far, per strategy, plus the results after offset"""
+        by_strategy: Dict[str, List[Dict]] = {}
+        for result in self.results:
+            by_strategy.setdefault(result['strategy_used'], []).append(result)
+
+        summary = {}
+        for strategy, results in by_strategy.items():
+            summary[strategy] = AutoPlayAI.summarize_benchmark(results, strategy)
+            del summary[strategy]['results']
+
+        return {
+            **self.to_dict(),
+            'summary': summary,
+            'offset': offset,
+            'results': self.results[offset:],
+            'final_result': self.result
+        }
+
+
+class JobManager:
+    """Queue of background jobs sharing one process pool"""
+
+    def __init__(self, max_workers: int = None, max_running: int = 2, max_finished: int = 100,
+                 backend: GameStateBackend = None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.backend = backend or MemoryGameBackend()
+        self.max_finished = max_finished
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.lock = threading.Lock()
+        self.coordinator = ThreadPoolExecutor(max_workers=max_running, thread_name_prefix='wumpus-job')
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+
+    def get_process_pool(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use; spawned workers are safe to start from a threaded server"""
+        with self.lock:
+            if self.process_pool is None:
+                self.process_pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                        mp_context=multiprocessing.get_context('spawn'))
+            return self.process_pool
+
+    def submit_benchmark(self, strategy: str, num_games: int, environment: Dict = None, seed: int = 0,
+                         on_results: Callable[[List[Dict]], None] = None) -> Job:
+        """
+        Queue a benchmark of one strategy. on_results, if given, is called from
+        the coordinator thread with each batch of newly finished game results.
+        """
+        player = AutoPlayAI(headless=True)
+        player.set_strategy(strategy)
+
+        job = self.create_job('benchmark', {'strategy': strategy, 'num_games': num_games, 'seed': seed},
+                              num_games)
+
+        def work(on_result: Callable, should_stop: Callable) -> Dict:
+            return player.run_benchmark(num_games, environment, workers=self.max_workers, seed=seed,
+                                        on_result=on_result, executor=self.get_process_pool(),
+                                        should_stop=should_stop)
+
+        return self.start(job, work, on_results)
+
+    def submit_comparison(self, strategies: List[str], num_games: int, seed: int = 0,
+                          on_results: Callable[[List[Dict]], None] = None) -> Job:
+        """Queue a comparison of several strategies; on_results as for submit_benchmark"""
+        player = AutoPlayAI(headless=True)
+        for strategy in strategies:
+            player.set_strategy(strategy)
+
+        job = self.create_job('compare_strategies',
+                              {'strategies': strategies, 'num_games': num_games, 'seed': seed},
+                              num_games * len(strategies))
+
+        def work(on_result: Callable, should_stop: Callable) -> Dict:
+            return player.compare_strategies(strategies, num_games, workers=self.max_workers, seed=seed,
+                                             on_result=on_result, executor=self.get_process_pool(),
+                                             should_stop=should_stop)
+
+        return self.start(job, work, on_results)
+
+    def create_job(self, kind: str, params: Dict, total_games: int) -> Job:
+        job = Job(job_id=uuid.uuid4().hex, kind=kind, params=params, total_games=total_games)
+        with self.lock:
+            self.jobs[job.job_id] = job
+            pruned = self.prune()
+        for job_id in pruned:
+            self.backend.delete(job_key(job_id))
+            self.backend.delete(cancel_key(job_id))
+        self.publish(job)
+        return job
+
+    def start(self, job: Job, work: Callable, on_results: Optional[Callable[[List[Dict]], None]]) -> Job:
+        """Hand a job to a coordinator thread"""
+        checked_at = [time.monotonic()]
+
+        def report(force: bool = False):
+            """Publish the job and pass on its new results, at most every PUBLISH_INTERVAL unless forced"""
+            if not force and time.monotonic() - job.published_at < PUBLISH_INTERVAL:
+                return
+            new_results = job.results[len(job.results) - job.unreported:]
+            job.unreported = 0
+            if on_results is not None and new_results:
+                on_results(new_results)
+            self.publish(job)
+
+        def on_result(index: int, result: Dict):
+            job.results.append(result)
+            job.unreported += 1
+            report()
+
+        def should_stop() -> bool:
+            # Another process asks for a cancellation through the backend
+            if not job.cancel_event.is_set() and time.monotonic() - checked_at[0] >= PUBLISH_INTERVAL:
+                checked_at[0] = time.monotonic()
+                if self.backend.load(cancel_key(job.job_id)) is not None:
+                    job.cancel_event.set()
+            return job.cancel_event.is_set()
+
+        def run():
+            if job.cancel_event.is_set():
+                job.status = 'cancelled'
+                job.finished_at = time.time()
+                self.publish(job)
+                return
+            job.status = 'running'
+            job.started_at = time.time()
+            self.publish(job)
+            try:
+                job.result = work(on_result, should_stop)
+                job.status = 'cancelled' if job.cancel_event.is_set() else 'completed'
+            except Exception as e:
+                job.status = 'failed'
+                job.error = str(e)
+            job.finished_at = time.time()
+            report(force=True)
+            self.backend.delete(cancel_key(job.job_id))
+
+        job.future = self.coordinator.submit(run)
+        return job
+
+    def publish(self, job: Job):
+        """Write the job to the shared backend for the other processes"""
+        job.published_at = time.monotonic()
+        try:
+            self.backend.save(job_key(job.job_id), job.to_record())
+        except Exception as e:
+            print(f"Error publishing job {job.job_id}: {e}")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job of this process, or the copy another process has published"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is not None:
+            return job
+        entry = self.backend.load(job_key(job_id))
+        return Job.from_record(entry[1]) if entry is not None else None
+
+    def cancel(self, job_id: str) -> bool:
+        """Ask a job to stop; games already running finish, queued batches are dropped"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            # Running in another process, which checks the backend between batches
+            job = self.get(job_id)
+            if job is None or job.finished:
+                return False
+            self.backend.save(cancel_key(job_id), b'1')
+            return True
+
+        if job.finished:
+            return False
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.status = 'cancelled'
+            job.finished_at = time.time()
+            self.publish(job)
+        return True
+
+    def prune(self) -> List[str]:
+        """Forget the oldest finished jobs beyond the limit and return their ids; needs lock"""
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        pruned = finished[:max(0, len(finished) - self.max_finished)]
+        for job_id in pruned:
+            del self.jobs[job_id]
+        return pruned
+
+
+def job_key(job_id: str) -> str:
+    """Backend key of a published job"""
+    return f'job:{job_id}'
+
+
+def cancel_key(job_id: str) -> str:
+    """Backend key of a cancellation requested for a job"""
+    return f'job-cancel:{job_id}'
+
+
+_job_manager: Optional[JobManager] = None
+_job_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Get the process-wide job manager, configured from settings"""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(
+                max_workers=getattr(settings, 'WUMPUS_JOB_WORKERS', None),
+                max_running=getattr(settings, 'WUMPUS_MAX_RUNNING_JOBS', 2),
+                max_finished=getattr(settings, 'WUMPUS_MAX_FINISHED_JOBS', 100),
+                backend=create_game_backend()
+            )
+        return _job_manager
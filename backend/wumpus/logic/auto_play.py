@@ -3,21 +3,54 @@ Auto Play AI for Wumpus World
 Implements autonomous AI agent for playing Wumpus World
 """
 
+import os
 import random
 import time
-from typing import Dict, List, Tuple, Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Tuple, Optional
+from .environment_generator import EnvironmentGenerator
 from .game import WumpusGame
 from .logical_inference import LogicalInference
 
 
+def game_seed(base_seed: int, index: int) -> int:
+    """Deterministic seed for one benchmark game, independent of which worker plays it"""
+    return base_seed * 1000003 + index
+
+
+def play_benchmark_games(board_size: int, strategy: str, max_moves: int, environment: Optional[Dict],
+                         base_seed: int, indices: List[int]) -> List[Tuple[int, Dict]]:
+    """
+    Play a batch of benchmark games headless; runs inside a worker process.
+    Each game seeds the player's own RNG and, unless a fixed environment is
+    given, generates its board from the same seed.
+    """
+    player = AutoPlayAI(board_size, headless=True)
+    player.set_strategy(strategy)
+    player.set_max_moves(max_moves)
+    
+    results = []
+    for index in indices:
+        seed = game_seed(base_seed, index)
+        player.rng.seed(seed)
+        game_environment = environment
+        if game_environment is None:
+            game_environment = EnvironmentGenerator(size=board_size, seed=seed).generate()
+        results.append((index, player.play_game(game_environment)))
+    return results
+
+
 class AutoPlayAI:
     """Autonomous AI agent for Wumpus World"""
     
-    def __init__(self, board_size: int = 10):
+    def __init__(self, board_size: int = 10, headless: bool = False):
         self.game = WumpusGame(board_size)
         self.strategy = 'logical'  # 'logical', 'random', 'cautious', 'aggressive'
         self.max_moves = 1000
         self.thinking_time = 0.1  # Seconds to "think" between moves
+        self.rng = random.Random()  # Random choices of the strategies, seeded per benchmark game
+        self.headless = False  # No sleeps, no printing, compact results only
+        self.set_headless(headless)
         self.performance_stats = {
             'games_played': 0,
             'games_won': 0,
@@ -45,6 +78,9 @@ class AutoPlayAI:
         if environment:
             self.game.load_environment(environment)
         
+        if self.headless:
+            return self.play_headless_game()
+        
         move_log = []
         
         if verbose:
@@ -104,6 +140,30 @@ class AutoPlayAI:
         
         return result
     
+    def play_headless_game(self) -> Dict:
+        """Play the loaded game as fast as possible and return a compact result"""
+        game = self.game
+        board = game.board
+        
+        while not board.game_over and len(game.move_history) < self.max_moves:
+            action = self.get_next_move()
+            if action is None:
+                break
+            game.make_move(action)
+        
+        self.update_performance_stats()
+        
+        return {
+            'game_won': board.game_won,
+            'agent_alive': board.agent.alive,
+            'score': game.score,
+            'moves_made': len(game.move_history),
+            'gold_collected': board.agent.has_gold,
+            'wumpus_killed': not board.wumpus_alive,
+            'final_position': (board.agent.x, board.agent.y),
+            'strategy_used': self.strategy
+        }
+    
     def get_next_move(self) -> Optional[str]:
         """Get the next move based on current strategy"""
         if self.strategy == 'logical':
@@ -119,7 +179,8 @@ class AutoPlayAI:
     
     def get_logical_move(self) -> Optional[str]:
         """Get move using logical inference"""
-        # Use the inference engine's suggestion
+        # Use the inference engine's suggestion; it keeps its plan between
+        # calls and only re-plans when the knowledge changes
         suggestion = self.game.get_ai_suggestion()
         
         if suggestion:
@@ -133,7 +194,7 @@ class AutoPlayAI:
         possible_actions = self.game.get_possible_actions()
         
         if possible_actions:
-            return random.choice(possible_actions)
+            return self.rng.choice(possible_actions)
         
         return None
     
@@ -153,7 +214,7 @@ class AutoPlayAI:
         # Get safe moves only
         safe_moves = self.get_safe_moves()
         if safe_moves:
-            return random.choice(safe_moves)
+            return self.rng.choice(safe_moves)
         
         # If no safe moves, be very cautious
         return self.get_most_cautious_move()
@@ -278,7 +339,7 @@ class AutoPlayAI:
                         return 'forward'
         
         # If no safe moves, just turn (doesn't change position)
-        return random.choice(['turn_left', 'turn_right'])
+        return self.rng.choice(['turn_left', 'turn_right'])
     
     def should_shoot_wumpus(self) -> bool:
         """Determine if we should shoot the wumpus"""
@@ -347,7 +408,8 @@ class AutoPlayAI:
     
     def get_required_turn(self, current_direction: str, target_direction: str) -> Optional[str]:
         """Get the turn required to face target direction"""
-        directions = ['right', 'up', 'left', 'down']
+        # Clockwise order, matching WumpusGame.turn_right
+        directions = ['up', 'right', 'down', 'left']
         
         try:
             current_index = directions.index(current_direction)
@@ -391,12 +453,20 @@ class AutoPlayAI:
     
     def update_performance_stats(self):
         """Update performance statistics"""
+        self.record_game_result({
+            'game_won': self.game.board.game_won,
+            'score': self.game.score,
+            'moves_made': len(self.game.move_history)
+        })
+    
+    def record_game_result(self, result: Dict):
+        """Merge one game result into the performance statistics"""
         self.performance_stats['games_played'] += 1
         
-        if self.game.board.game_won:
+        if result['game_won']:
             self.performance_stats['games_won'] += 1
         
-        score = self.game.score
+        score = result['score']
         self.performance_stats['total_score'] += score
         
         if score > self.performance_stats['best_score']:
@@ -405,7 +475,7 @@ class AutoPlayAI:
         if score < self.performance_stats['worst_score']:
             self.performance_stats['worst_score'] = score
         
-        moves = len(self.game.move_history)
+        moves = result['moves_made']
         self.performance_stats['total_moves'] += moves
         self.performance_stats['average_moves'] = (
             self.performance_stats['total_moves'] / self.performance_stats['games_played']
@@ -424,26 +494,94 @@ class AutoPlayAI:
         
         return stats
     
-    def run_benchmark(self, num_games: int = 100, environment: Dict = None) -> Dict:
-        """Run benchmark with multiple games"""
-        print(f"Running benchmark with {num_games} games...")
+    def iter_benchmark_results(self, num_games: int, environment: Dict = None, workers: int = None,
+                               seed: int = 0, executor: ProcessPoolExecutor = None,
+                               should_stop: Callable[[], bool] = None) -> Iterator[Tuple[int, Dict]]:
+        """
+        Play benchmark games across a process pool, yielding (game index, result)
+        as each batch finishes. Game i is always played with the same seed (and,
+        without a fixed environment, on the board generated from it), so the
+        results do not depend on the number of workers or the order they finish in.
+        A shared executor may be passed in; should_stop is checked between batches.
+        """
+        workers = workers or os.cpu_count() or 1
+        workers = max(1, min(workers, num_games))
+        board_size = self.game.board.size
+        
+        # Several games per task keeps the inter-process traffic small
+        chunk_size = max(1, min(50, num_games // (workers * 4)))
+        batches = [list(range(start, min(start + chunk_size, num_games)))
+                   for start in range(0, num_games, chunk_size)]
+        
+        if workers == 1 and executor is None:
+            for batch in batches:
+                if should_stop and should_stop():
+                    return
+                yield from play_benchmark_games(board_size, self.strategy, self.max_moves, environment,
+                                                seed, batch)
+            return
+        
+        own_executor = executor is None
+        if own_executor:
+            executor = ProcessPoolExecutor(max_workers=workers)
+        
+        futures = [
+            executor.submit(play_benchmark_games, board_size, self.strategy, self.max_moves,
+                            environment, seed, batch)
+            for batch in batches
+        ]
+        try:
+            for future in as_completed(futures):
+                if should_stop and should_stop():
+                    return
+                yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+            if own_executor:
+                executor.shutdown(wait=True, cancel_futures=True)
+    
+    def run_benchmark(self, num_games: int = 100, environment: Dict = None, workers: int = None,
+                      seed: int = 0, on_result: Callable[[int, Dict], None] = None,
+                      executor: ProcessPoolExecutor = None, should_stop: Callable[[], bool] = None) -> Dict:
+        """Run benchmark with multiple games, spread over worker processes"""
+        if not self.headless:
+            print(f"Running benchmark with {num_games} games...")
+        
+        results: List[Optional[Dict]] = [None] * num_games
+        completed = 0
+        
+        for index, result in self.iter_benchmark_results(num_games, environment, workers, seed,
+                                                         executor, should_stop):
+            results[index] = result
+            self.record_game_result(result)
+            completed += 1
+            
+            if on_result:
+                on_result(index, result)
+            if completed % 10 == 0 and not self.headless:
+                print(f"Game {completed}/{num_games}")
         
-        results = []
+        # Calculate aggregate statistics; a stopped benchmark only counts the games it finished
+        benchmark_stats = self.summarize_benchmark([r for r in results if r is not None], self.strategy)
         
-        for i in range(num_games):
-            if i % 10 == 0:
-                print(f"Game {i + 1}/{num_games}")
-            
-            result = self.play_game(environment, verbose=False)
-            results.append(result)
+        if not self.headless:
+            print(f"Benchmark completed!")
+            print(f"Win rate: {benchmark_stats['win_rate']:.2%}")
+            print(f"Average score: {benchmark_stats['average_score']:.2f}")
+            print(f"Average moves: {benchmark_stats['average_moves']:.2f}")
         
-        # Calculate aggregate statistics
+        return benchmark_stats
+    
+    @staticmethod
+    def summarize_benchmark(results: List[Dict], strategy: str) -> Dict:
+        """Aggregate statistics over a list of game results"""
         total_games = len(results)
         games_won = sum(1 for r in results if r['game_won'])
         total_score = sum(r['score'] for r in results)
         total_moves = sum(r['moves_made'] for r in results)
         
-        benchmark_stats = {
+        return {
             'total_games': total_games,
             'games_won': games_won,
             'win_rate': games_won / total_games if total_games > 0 else 0,
@@ -453,25 +591,22 @@ class AutoPlayAI:
             'average_moves': total_moves / total_games if total_games > 0 else 0,
             'best_score': max(r['score'] for r in results) if results else 0,
             'worst_score': min(r['score'] for r in results) if results else 0,
-            'strategy_used': self.strategy,
+            'strategy_used': strategy,
             'results': results
         }
-        
-        print(f"Benchmark completed!")
-        print(f"Win rate: {benchmark_stats['win_rate']:.2%}")
-        print(f"Average score: {benchmark_stats['average_score']:.2f}")
-        print(f"Average moves: {benchmark_stats['average_moves']:.2f}")
-        
-        return benchmark_stats
     
-    def compare_strategies(self, strategies: List[str], num_games: int = 50) -> Dict:
+    def compare_strategies(self, strategies: List[str], num_games: int = 50, workers: int = None,
+                           seed: int = 0, on_result: Callable[[int, Dict], None] = None,
+                           executor: ProcessPoolExecutor = None, should_stop: Callable[[], bool] = None) -> Dict:
         """Compare different strategies"""
-        print(f"Comparing strategies: {strategies}")
+        if not self.headless:
+            print(f"Comparing strategies: {strategies}")
         
         comparison_results = {}
         
         for strategy in strategies:
-            print(f"\nTesting strategy: {strategy}")
+            if not self.headless:
+                print(f"\nTesting strategy: {strategy}")
             self.set_strategy(strategy)
             
             # Reset performance stats
@@ -486,15 +621,17 @@ class AutoPlayAI:
             }
             
             # Run benchmark
-            benchmark_result = self.run_benchmark(num_games)
+            benchmark_result = self.run_benchmark(num_games, workers=workers, seed=seed, on_result=on_result,
+                                                  executor=executor, should_stop=should_stop)
             comparison_results[strategy] = benchmark_result
         
         # Find best strategy
         best_strategy = max(comparison_results.keys(), 
                           key=lambda s: comparison_results[s]['win_rate'])
         
-        print(f"\nBest strategy: {best_strategy}")
-        print(f"Win rate: {comparison_results[best_strategy]['win_rate']:.2%}")
+        if not self.headless:
+            print(f"\nBest strategy: {best_strategy}")
+            print(f"Win rate: {comparison_results[best_strategy]['win_rate']:.2%}")
         
         return {
             'results': comparison_results,
@@ -502,6 +639,11 @@ class AutoPlayAI:
             'best_win_rate': comparison_results[best_strategy]['win_rate']
         }
     
+    def set_headless(self, headless: bool):
+        """Turn headless simulation mode on or off for this player and its game"""
+        self.headless = headless
+        self.game.set_headless(headless)
+    
     def set_thinking_time(self, seconds: float):
         """Set thinking time between moves"""
         self.thinking_time = max(0.0, seconds)
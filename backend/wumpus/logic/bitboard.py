@@ -0,0 +1,550 @@
+"""
+Bitboard-backed board for Wumpus World
+Stores every cell property as an integer bitmask (one bit per cell) while
+exposing the same public API as WumpusBoard
+"""
+
+from collections.abc import MutableSet
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from .board import AgentState
+
+
+# Per-size lookup tables shared by every board of that size
+_TABLES: Dict[int, Tuple[int, int, int, List[int]]] = {}
+
+
+def _get_tables(size: int) -> Tuple[int, int, int, List[int]]:
+    """Return (full mask, mask without first column, mask without last column, neighbour masks)"""
+    tables = _TABLES.get(size)
+    if tables is None:
+        full = (1 << (size * size)) - 1
+        first_column = 0
+        last_column = 0
+        for y in range(size):
+            first_column |= 1 << (y * size)
+            last_column |= 1 << (y * size + size - 1)
+        neighbours = []
+        for index in range(size * size):
+            x, y = index % size, index // size
+            mask = 0
+            for adj_x, adj_y in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if 0 <= adj_x < size and 0 <= adj_y < size:
+                    mask |= 1 << (adj_y * size + adj_x)
+            neighbours.append(mask)
+        tables = (full, full & ~first_column, full & ~last_column, neighbours)
+        _TABLES[size] = tables
+    return tables
+
+
+# Per-size (x, y) of every bit index
+_POSITIONS: Dict[int, List[Tuple[int, int]]] = {}
+
+
+def _get_positions(size: int) -> List[Tuple[int, int]]:
+    positions = _POSITIONS.get(size)
+    if positions is None:
+        positions = [(index % size, index // size) for index in range(size * size)]
+        _POSITIONS[size] = positions
+    return positions
+
+
+def neighbour_mask(size: int, x: int, y: int) -> int:
+    """Get the bitmask of the cells orthogonally adjacent to (x, y)"""
+    return _get_tables(size)[3][y * size + x]
+
+
+def spread_mask(size: int, mask: int) -> int:
+    """Get the bitmask of every cell orthogonally adjacent to a cell in mask"""
+    full, not_first_column, not_last_column, _ = _get_tables(size)
+    return (((mask << 1) & not_first_column) |
+            ((mask >> 1) & not_last_column) |
+            (mask << size) |
+            (mask >> size)) & full
+
+
+class CellMask(MutableSet):
+    """Set of (x, y) positions stored as a single integer bitmask"""
+    __slots__ = ('size', 'bits')
+
+    def __init__(self, size: int, positions: Iterable[Tuple[int, int]] = (), bits: int = 0):
+        self.size = size
+        self.bits = bits
+        for position in positions:
+            self.add(position)
+
+    def __contains__(self, position) -> bool:
+        try:
+            x, y = position
+        except (TypeError, ValueError):
+            return False
+        if 0 <= x < self.size and 0 <= y < self.size:
+            return bool((self.bits >> (y * self.size + x)) & 1)
+        return False
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        bits = self.bits
+        if bits.bit_count() > 8:
+            # Scanning the binary digits beats peeling off bits once the mask is dense
+            digits = bin(bits)[:1:-1]
+            return iter([position for position, digit in zip(_get_positions(self.size), digits) if digit == '1'])
+        return self._iter_bits(bits)
+
+    def _iter_bits(self, bits: int) -> Iterator[Tuple[int, int]]:
+        size = self.size
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            yield (index % size, index // size)
+            bits ^= low
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __repr__(self) -> str:
+        return f"CellMask({set(self)})"
+
+    @classmethod
+    def _from_iterable(cls, iterable) -> set:
+        # Set operations with other kinds of sets give plain sets
+        return set(iterable)
+
+    def _same_grid(self, other) -> bool:
+        return isinstance(other, CellMask) and other.size == self.size
+
+    def __and__(self, other):
+        if self._same_grid(other):
+            return CellMask(self.size, bits=self.bits & other.bits)
+        return super().__and__(other)
+
+    def __or__(self, other):
+        if self._same_grid(other):
+            return CellMask(self.size, bits=self.bits | other.bits)
+        return super().__or__(other)
+
+    def __sub__(self, other):
+        if self._same_grid(other):
+            return CellMask(self.size, bits=self.bits & ~other.bits)
+        return super().__sub__(other)
+
+    def __xor__(self, other):
+        if self._same_grid(other):
+            return CellMask(self.size, bits=self.bits ^ other.bits)
+        return super().__xor__(other)
+
+    def add(self, position: Tuple[int, int]):
+        x, y = position
+        self.bits |= 1 << (y * self.size + x)
+
+    def discard(self, position: Tuple[int, int]):
+        x, y = position
+        if 0 <= x < self.size and 0 <= y < self.size:
+            self.bits &= ~(1 << (y * self.size + x))
+
+    def remove(self, position: Tuple[int, int]):
+        if position not in self:
+            raise KeyError(position)
+        self.discard(position)
+
+    def clear(self):
+        self.bits = 0
+
+    def copy(self) -> 'CellMask':
+        return CellMask(self.size, bits=self.bits)
+
+
+class BitboardCell:
+    """Read/write view of a single cell of a BitboardWumpusBoard"""
+    __slots__ = ('_board', 'x', 'y', '_bit')
+
+    def __init__(self, board: 'BitboardWumpusBoard', x: int, y: int):
+        self._board = board
+        self.x = x
+        self.y = y
+        self._bit = 1 << (y * board.size + x)
+
+    def _get(self, attr: str) -> bool:
+        return bool(getattr(self._board, attr) & self._bit)
+
+    def _set(self, attr: str, value: bool):
+        if value:
+            setattr(self._board, attr, getattr(self._board, attr) | self._bit)
+        else:
+            setattr(self._board, attr, getattr(self._board, attr) & ~self._bit)
+
+    wumpus = property(lambda self: self._get('wumpus_mask'), lambda self, v: self._set('wumpus_mask', v))
+    pit = property(lambda self: self._get('pit_mask'), lambda self, v: self._set('pit_mask', v))
+    gold = property(lambda self: self._get('gold_mask'), lambda self, v: self._set('gold_mask', v))
+    breeze = property(lambda self: self._get('breeze_mask'), lambda self, v: self._set('breeze_mask', v))
+    stench = property(lambda self: self._get('stench_mask'), lambda self, v: self._set('stench_mask', v))
+    glitter = property(lambda self: self._get('glitter_mask'), lambda self, v: self._set('glitter_mask', v))
+
+    @property
+    def visited(self) -> bool:
+        return bool(self._board.visited_cells.bits & self._bit)
+
+    @visited.setter
+    def visited(self, value: bool):
+        if value:
+            self._board.visited_cells.bits |= self._bit
+        else:
+            self._board.visited_cells.bits &= ~self._bit
+
+    @property
+    def safe(self) -> bool:
+        return bool(self._board.safe_cells.bits & self._bit)
+
+    @safe.setter
+    def safe(self, value: bool):
+        if value:
+            self._board.safe_cells.bits |= self._bit
+        else:
+            self._board.safe_cells.bits &= ~self._bit
+
+    @property
+    def agent(self) -> bool:
+        return self._board.agent.x == self.x and self._board.agent.y == self.y
+
+    @agent.setter
+    def agent(self, value: bool):
+        # The agent flag is derived from the agent position
+        pass
+
+    def __str__(self):
+        return f"Cell({self.x}, {self.y})"
+
+
+class BitboardWumpusBoard:
+    """Wumpus World board storing cell properties as integer bitmasks"""
+
+    def __init__(self, size: int = 10):
+        self.size = size
+        self.agent = AgentState(x=0, y=size - 1)
+        self.wumpus_alive = True
+        self.game_over = False
+        self.game_won = False
+
+        self.wumpus_mask = 0
+        self.pit_mask = 0
+        self.gold_mask = 0
+        self.glitter_mask = 0
+        self.breeze_mask = 0
+        self.stench_mask = 0
+        self.visited_cells = CellMask(size)
+        self.safe_cells = CellMask(size)
+        self.danger_cells = CellMask(size)
+
+        self.initialize_board()
+
+    def initialize_board(self):
+        """Initialize the board with empty cells"""
+        self.clear_environment()
+
+        start_bit = self._bit(self.agent.x, self.agent.y)
+        self.visited_cells.bits |= start_bit
+        self.safe_cells.bits |= start_bit
+
+    def _bit(self, x: int, y: int) -> int:
+        return 1 << (y * self.size + x)
+
+    @property
+    def board(self) -> List[List[BitboardCell]]:
+        """Row-major grid of cell views, for callers that index the board directly"""
+        return [[BitboardCell(self, x, y) for x in range(self.size)] for y in range(self.size)]
+
+    def get_cell(self, x: int, y: int) -> Optional[BitboardCell]:
+        """Get cell at given coordinates"""
+        if self.is_valid_position(x, y):
+            return BitboardCell(self, x, y)
+        return None
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        """Check if position is within board bounds"""
+        return 0 <= x < self.size and 0 <= y < self.size
+
+    def get_adjacent_positions(self, x: int, y: int) -> List[Tuple[int, int]]:
+        """Get all valid adjacent positions"""
+        adjacent = []
+        for dx, dy in ((0, 1), (0, -1), (1, 0), (-1, 0)):
+            new_x, new_y = x + dx, y + dy
+            if 0 <= new_x < self.size and 0 <= new_y < self.size:
+                adjacent.append((new_x, new_y))
+        return adjacent
+
+    def place_wumpus(self, x: int, y: int) -> bool:
+        """Place wumpus at given position"""
+        if not self.is_valid_position(x, y):
+            return False
+
+        # Can't place wumpus at agent starting position
+        if x == 0 and y == self.size - 1:
+            return False
+
+        bit = self._bit(x, y)
+        if not (self.pit_mask | self.gold_mask) & bit:
+            self.wumpus_mask |= bit
+            self.wumpus_alive = True
+            self.stench_mask |= neighbour_mask(self.size, x, y)
+            return True
+        return False
+
+    def remove_wumpus(self, x: int, y: int) -> bool:
+        """Remove (or kill) the wumpus at given position"""
+        if not self.is_valid_position(x, y) or not self.wumpus_mask & self._bit(x, y):
+            return False
+
+        self.wumpus_mask &= ~self._bit(x, y)
+        self.wumpus_alive = self.wumpus_mask != 0
+        self.stench_mask = self._clear_percepts(self.stench_mask, self.wumpus_mask, x, y)
+        return True
+
+    def place_gold(self, x: int, y: int) -> bool:
+        """Place gold at given position"""
+        if not self.is_valid_position(x, y):
+            return False
+
+        bit = self._bit(x, y)
+        if not (self.wumpus_mask | self.pit_mask) & bit:
+            self.gold_mask |= bit
+            self.glitter_mask |= bit
+            return True
+        return False
+
+    def place_pit(self, x: int, y: int) -> bool:
+        """Place pit at given position"""
+        if not self.is_valid_position(x, y):
+            return False
+
+        # Can't place pit at agent starting position
+        if x == 0 and y == self.size - 1:
+            return False
+
+        bit = self._bit(x, y)
+        if not (self.wumpus_mask | self.gold_mask) & bit:
+            self.pit_mask |= bit
+            self.breeze_mask |= neighbour_mask(self.size, x, y)
+            return True
+        return False
+
+    def remove_pit(self, x: int, y: int) -> bool:
+        """Remove the pit at given position"""
+        if not self.is_valid_position(x, y) or not self.pit_mask & self._bit(x, y):
+            return False
+
+        self.pit_mask &= ~self._bit(x, y)
+        self.breeze_mask = self._clear_percepts(self.breeze_mask, self.pit_mask, x, y)
+        return True
+
+    def _clear_percepts(self, percept_mask: int, hazard_mask: int, x: int, y: int) -> int:
+        """
+        Percept mask after the hazard at (x, y) is gone: only its neighbours are
+        rechecked, and each keeps the percept if another hazard is next to it
+        """
+        neighbours = _get_tables(self.size)[3]
+        affected = neighbours[y * self.size + x]
+        percept_mask &= ~affected
+        while affected:
+            low = affected & -affected
+            if neighbours[low.bit_length() - 1] & hazard_mask:
+                percept_mask |= low
+            affected ^= low
+        return percept_mask
+
+    def generate_breezes(self):
+        """Generate breezes around all pits"""
+        self.breeze_mask = spread_mask(self.size, self.pit_mask)
+
+    def generate_stenches(self):
+        """Generate stenches around the wumpus"""
+        self.wumpus_alive = self.wumpus_mask != 0
+        self.stench_mask = spread_mask(self.size, self.wumpus_mask)
+
+    def move_agent(self, direction: str) -> bool:
+        """Move agent in given direction"""
+        if self.game_over:
+            return False
+
+        new_x, new_y = self.agent.x, self.agent.y
+
+        if direction == 'right':
+            new_x += 1
+        elif direction == 'left':
+            new_x -= 1
+        elif direction == 'up':
+            new_y -= 1
+        elif direction == 'down':
+            new_y += 1
+
+        if not (0 <= new_x < self.size and 0 <= new_y < self.size):
+            return False
+
+        self.agent.x = new_x
+        self.agent.y = new_y
+
+        bit = 1 << (new_y * self.size + new_x)
+        self.visited_cells.bits |= bit
+
+        # Check for hazards
+        if (self.pit_mask | self.wumpus_mask) & bit:
+            self.agent.alive = False
+            self.game_over = True
+            return True
+
+        # Check for gold
+        if self.gold_mask & bit and not self.agent.has_gold:
+            self.agent.has_gold = True
+            self.gold_mask &= ~bit
+            self.glitter_mask &= ~bit
+
+        return True
+
+    def turn_agent(self, direction: str):
+        """Turn agent to face given direction"""
+        if direction in ['right', 'up', 'left', 'down']:
+            self.agent.direction = direction
+        else:
+            print(f"Invalid direction: {direction}")
+
+    def shoot_arrow(self, direction: str) -> bool:
+        """Shoot arrow in given direction"""
+        if self.agent.arrows <= 0:
+            return False
+
+        self.agent.arrows -= 1
+
+        arrow_x, arrow_y = self.agent.x, self.agent.y
+
+        while True:
+            if direction == 'right':
+                arrow_x += 1
+            elif direction == 'left':
+                arrow_x -= 1
+            elif direction == 'up':
+                arrow_y -= 1
+            elif direction == 'down':
+                arrow_y += 1
+            else:
+                return False
+
+            if not (0 <= arrow_x < self.size and 0 <= arrow_y < self.size):
+                break
+
+            if self.wumpus_mask & self._bit(arrow_x, arrow_y):
+                # Kill this wumpus; stenches and wumpus_alive follow the remaining mask
+                self.remove_wumpus(arrow_x, arrow_y)
+                return True
+
+        return False
+
+    def get_percepts(self) -> Dict[str, bool]:
+        """Get current percepts at agent position"""
+        bit = 1 << (self.agent.y * self.size + self.agent.x)
+
+        return {
+            'breeze': bool(self.breeze_mask & bit),
+            'stench': bool(self.stench_mask & bit),
+            'glitter': bool(self.glitter_mask & bit),
+            'bump': False,  # Will be set by movement logic
+            'scream': False  # Will be set by arrow logic
+        }
+
+    def is_game_won(self) -> bool:
+        """Check if game is won (agent has gold and is at starting position)"""
+        return (self.agent.has_gold and
+                self.agent.x == 0 and
+                self.agent.y == self.size - 1 and
+                self.agent.alive)
+
+    def get_board_state(self) -> Dict:
+        """Get current board state as dictionary"""
+        size = self.size
+        wumpus = self.wumpus_mask
+        pit = self.pit_mask
+        gold = self.gold_mask
+        breeze = self.breeze_mask
+        stench = self.stench_mask
+        glitter = self.glitter_mask
+        visited = self.visited_cells.bits
+        safe = self.safe_cells.bits
+        agent_x, agent_y = self.agent.x, self.agent.y
+
+        board_data = []
+        for y in range(size):
+            row = []
+            for x in range(size):
+                index = y * size + x
+                row.append({
+                    'x': x,
+                    'y': y,
+                    'wumpus': bool((wumpus >> index) & 1),
+                    'pit': bool((pit >> index) & 1),
+                    'gold': bool((gold >> index) & 1),
+                    'agent': x == agent_x and y == agent_y,
+                    'breeze': bool((breeze >> index) & 1),
+                    'stench': bool((stench >> index) & 1),
+                    'glitter': bool((glitter >> index) & 1),
+                    'visited': bool((visited >> index) & 1),
+                    'safe': bool((safe >> index) & 1)
+                })
+            board_data.append(row)
+
+        adjacent_cells = []
+        for x, y in self.get_adjacent_positions(agent_x, agent_y):
+            adjacent_cells.append({
+                'x': x,
+                'y': y,
+                'safe': not ((pit | wumpus) >> (y * size + x)) & 1
+            })
+
+        return {
+            'board': board_data,
+            'agent': {
+                'x': agent_x,
+                'y': agent_y,
+                'direction': self.agent.direction,
+                'arrows': self.agent.arrows,
+                'has_gold': self.agent.has_gold,
+                'alive': self.agent.alive
+            },
+            'wumpus_alive': self.wumpus_alive,
+            'game_over': self.game_over,
+            'game_won': self.is_game_won(),
+            'visited_cells': [[x, y] for x, y in self.visited_cells],
+            'safe_cells': [[x, y] for x, y in self.safe_cells],
+            'adjacent_cells': adjacent_cells
+        }
+
+    def clear_environment(self):
+        """Remove all hazards, gold and percepts from the board"""
+        self.wumpus_mask = 0
+        self.pit_mask = 0
+        self.gold_mask = 0
+        self.glitter_mask = 0
+        self.breeze_mask = 0
+        self.stench_mask = 0
+
+    def load_environment(self, environment: Dict) -> bool:
+        """Simple environment loading for backward compatibility"""
+        try:
+            self.clear_environment()
+
+            if 'wumpus' in environment:
+                wumpus_data = environment['wumpus']
+                if isinstance(wumpus_data, dict):
+                    self.place_wumpus(wumpus_data['x'], wumpus_data['y'])
+                elif isinstance(wumpus_data, list):
+                    for wumpus_pos in wumpus_data:
+                        self.place_wumpus(wumpus_pos['x'], wumpus_pos['y'])
+
+            if 'gold' in environment:
+                gold_pos = environment['gold']
+                self.place_gold(gold_pos['x'], gold_pos['y'])
+
+            if 'pits' in environment:
+                for pit_pos in environment['pits']:
+                    self.place_pit(pit_pos['x'], pit_pos['y'])
+
+            return True
+
+        except Exception as e:
+            print(f"Error loading environment: {e}")
+            return False
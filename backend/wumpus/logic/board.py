@@ -42,7 +42,7 @@ class WumpusBoard:
     def __init__(self, size: int = 10):  # Updated to match 10x10 board
         self.size = size
         self.board: List[List[Cell]] = []
-        self.agent = AgentState()
+        self.agent = AgentState(x=0, y=size - 1)
         self.wumpus_alive = True
         self.game_over = False
         self.game_won = False
@@ -50,6 +50,12 @@ class WumpusBoard:
         self.safe_cells: Set[Tuple[int, int]] = set()
         self.danger_cells: Set[Tuple[int, int]] = set()
         
+        # Number of adjacent pits / live wumpuses per cell, so percepts can be
+        # updated in O(1) when a single hazard is placed or removed
+        self.breeze_counts: List[List[int]] = []
+        self.stench_counts: List[List[int]] = []
+        self.wumpus_count = 0
+        
         self.initialize_board()
         
     def initialize_board(self):
@@ -62,6 +68,10 @@ class WumpusBoard:
                 row.append(cell)
             self.board.append(row)
         
+        self.breeze_counts = [[0] * self.size for _ in range(self.size)]
+        self.stench_counts = [[0] * self.size for _ in range(self.size)]
+        self.wumpus_count = 0
+        
         # Place agent at starting position
         self.board[self.agent.y][self.agent.x].agent = True
         self.board[self.agent.y][self.agent.x].visited = True
@@ -101,11 +111,26 @@ class WumpusBoard:
         
         cell = self.get_cell(x, y)
         if cell and not cell.pit and not cell.gold:
-            cell.wumpus = True
-            self.generate_stenches()
+            if not cell.wumpus:
+                cell.wumpus = True
+                self.wumpus_count += 1
+                self.wumpus_alive = True
+                self._update_percept_counts(x, y, self.stench_counts, 'stench', 1)
             return True
         return False
     
+    def remove_wumpus(self, x: int, y: int) -> bool:
+        """Remove (or kill) the wumpus at given position"""
+        cell = self.get_cell(x, y)
+        if not cell or not cell.wumpus:
+            return False
+        
+        cell.wumpus = False
+        self.wumpus_count -= 1
+        self.wumpus_alive = self.wumpus_count > 0
+        self._update_percept_counts(x, y, self.stench_counts, 'stench', -1)
+        return True
+    
     def place_gold(self, x: int, y: int) -> bool:
         """Place gold at given position"""
         if not self.is_valid_position(x, y):
@@ -129,40 +154,56 @@ class WumpusBoard:
         
         cell = self.get_cell(x, y)
         if cell and not cell.wumpus and not cell.gold:
-            cell.pit = True
-            self.generate_breezes()
+            if not cell.pit:
+                cell.pit = True
+                self._update_percept_counts(x, y, self.breeze_counts, 'breeze', 1)
             return True
         return False
     
+    def remove_pit(self, x: int, y: int) -> bool:
+        """Remove the pit at given position"""
+        cell = self.get_cell(x, y)
+        if not cell or not cell.pit:
+            return False
+        
+        cell.pit = False
+        self._update_percept_counts(x, y, self.breeze_counts, 'breeze', -1)
+        return True
+    
+    def _update_percept_counts(self, x: int, y: int, counts: List[List[int]], percept: str, delta: int):
+        """Adjust the hazard counts around (x, y) and refresh the matching percept flags"""
+        for adj_x, adj_y in self.get_adjacent_positions(x, y):
+            counts[adj_y][adj_x] += delta
+            setattr(self.board[adj_y][adj_x], percept, counts[adj_y][adj_x] > 0)
+    
     def generate_breezes(self):
-        """Generate breezes around all pits"""
-        # First, clear existing breezes
+        """Regenerate breezes around all pits (for cells whose pit flag was set directly)"""
+        self.breeze_counts = [[0] * self.size for _ in range(self.size)]
         for y in range(self.size):
             for x in range(self.size):
-                if not self.board[y][x].pit:
-                    self.board[y][x].breeze = False
+                if self.board[y][x].pit:
+                    for adj_x, adj_y in self.get_adjacent_positions(x, y):
+                        self.breeze_counts[adj_y][adj_x] += 1
         
-        # Generate new breezes
         for y in range(self.size):
             for x in range(self.size):
-                if self.board[y][x].pit:
-                    for adj_x, adj_y in self.get_adjacent_positions(x, y):
-                        self.board[adj_y][adj_x].breeze = True
+                self.board[y][x].breeze = self.breeze_counts[y][x] > 0
     
     def generate_stenches(self):
-        """Generate stenches around the wumpus"""
-        # First, clear existing stenches
+        """Regenerate stenches around the wumpus (for cells whose wumpus flag was set directly)"""
+        self.stench_counts = [[0] * self.size for _ in range(self.size)]
+        self.wumpus_count = 0
         for y in range(self.size):
             for x in range(self.size):
-                self.board[y][x].stench = False
-        
-        # Generate new stenches if wumpus is alive
-        if self.wumpus_alive:
-            for y in range(self.size):
-                for x in range(self.size):
-                    if self.board[y][x].wumpus:
-                        for adj_x, adj_y in self.get_adjacent_positions(x, y):
-                            self.board[adj_y][adj_x].stench = True
+                if self.board[y][x].wumpus:
+                    self.wumpus_count += 1
+                    for adj_x, adj_y in self.get_adjacent_positions(x, y):
+                        self.stench_counts[adj_y][adj_x] += 1
+        
+        self.wumpus_alive = self.wumpus_count > 0
+        for y in range(self.size):
+            for x in range(self.size):
+                self.board[y][x].stench = self.stench_counts[y][x] > 0
     
     def move_agent(self, direction: str) -> bool:
         """Move agent in given direction"""
@@ -255,21 +296,8 @@ class WumpusBoard:
             
             # Check for wumpus
             if self.board[arrow_y][arrow_x].wumpus:
-                # Kill this wumpus
-                self.board[arrow_y][arrow_x].wumpus = False
-                
-                # Check if any wumpus are still alive
-                any_wumpus_alive = False
-                for y in range(self.size):
-                    for x in range(self.size):
-                        if self.board[y][x].wumpus:
-                            any_wumpus_alive = True
-                            break
-                    if any_wumpus_alive:
-                        break
-                
-                self.wumpus_alive = any_wumpus_alive
-                self.generate_stenches()  # Update stenches based on remaining wumpus
+                # Kill this wumpus; stenches and wumpus_alive follow the counts
+                self.remove_wumpus(arrow_x, arrow_y)
                 return True
         
         return False
@@ -344,19 +372,26 @@ class WumpusBoard:
             'adjacent_cells': adjacent_cells  # Added for adjacent cell safety
         }
     
+    def clear_environment(self):
+        """Remove all hazards, gold and percepts from the board"""
+        for y in range(self.size):
+            for x in range(self.size):
+                cell = self.board[y][x]
+                cell.wumpus = False
+                cell.pit = False
+                cell.gold = False
+                cell.breeze = False
+                cell.stench = False
+                cell.glitter = False
+        
+        self.breeze_counts = [[0] * self.size for _ in range(self.size)]
+        self.stench_counts = [[0] * self.size for _ in range(self.size)]
+        self.wumpus_count = 0
+    
     def load_environment(self, environment: Dict) -> bool:
         """Simple environment loading for backward compatibility"""
         try:
-            # Clear existing environment
-            for y in range(self.size):
-                for x in range(self.size):
-                    cell = self.board[y][x]
-                    cell.wumpus = False
-                    cell.pit = False
-                    cell.gold = False
-                    cell.breeze = False
-                    cell.stench = False
-                    cell.glitter = False
+            self.clear_environment()
             
             # Place wumpus
             if 'wumpus' in environment:
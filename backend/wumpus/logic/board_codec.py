@@ -0,0 +1,196 @@
+"""
+Packed Board Codec for Wumpus World
+Encodes a board as a small header followed by one fixed-width bitfield per
+cell, packed back to back into bytes. Works with both WumpusBoard and
+BitboardWumpusBoard, and is roughly 1/100th the size of get_board_state.
+"""
+
+import base64
+import struct
+from typing import Dict, Iterator, Tuple
+
+from .board import WumpusBoard
+
+MAGIC = b'WB'
+FORMAT_VERSION = 1
+
+# Magic, format version, size, agent x, agent y, direction, arrows, status flags
+HEADER = struct.Struct('>2sBBBBBBB')
+
+# Bit order of the per-cell field
+CELL_FLAGS = ('wumpus', 'pit', 'gold', 'agent', 'breeze', 'stench', 'glitter', 'visited', 'safe', 'danger')
+CELL_BITS = len(CELL_FLAGS)
+
+DIRECTIONS = ('up', 'right', 'down', 'left')
+
+# Bit order of the status byte
+STATUS_FLAGS = ('has_gold', 'alive', 'wumpus_alive', 'game_over', 'game_won')
+
+
+def get_flag_masks(board) -> Dict[str, int]:
+    """Get one bitmask per cell flag, bit y * size + x set for each cell that has it"""
+    size = board.size
+    agent_bit = 1 << (board.agent.y * size + board.agent.x)
+
+    if hasattr(board, 'wumpus_mask'):
+        # Bitboards already store every flag as a mask
+        return {
+            'wumpus': board.wumpus_mask,
+            'pit': board.pit_mask,
+            'gold': board.gold_mask,
+            'agent': agent_bit,
+            'breeze': board.breeze_mask,
+            'stench': board.stench_mask,
+            'glitter': board.glitter_mask,
+            'visited': board.visited_cells.bits,
+            'safe': board.safe_cells.bits,
+            'danger': board.danger_cells.bits
+        }
+
+    masks = dict.fromkeys(CELL_FLAGS, 0)
+    for y, row in enumerate(board.board):
+        for x, cell in enumerate(row):
+            bit = 1 << (y * size + x)
+            for name in ('wumpus', 'pit', 'gold', 'agent', 'breeze', 'stench', 'glitter', 'visited'):
+                if getattr(cell, name):
+                    masks[name] |= bit
+            if cell.safe:
+                masks['safe'] |= bit
+    for name, positions in (('visited', board.visited_cells), ('safe', board.safe_cells),
+                            ('danger', board.danger_cells)):
+        for x, y in positions:
+            masks[name] |= 1 << (y * size + x)
+    return masks
+
+
+def iter_positions(size: int, mask: int) -> Iterator[Tuple[int, int]]:
+    """Yield the (x, y) position of every bit set in mask"""
+    while mask:
+        low = mask & -mask
+        index = low.bit_length() - 1
+        yield (index % size, index // size)
+        mask ^= low
+
+
+def encode_board(board) -> bytes:
+    """Pack a board into bytes"""
+    size = board.size
+    agent = board.agent
+    status = {
+        'has_gold': agent.has_gold,
+        'alive': agent.alive,
+        'wumpus_alive': board.wumpus_alive,
+        'game_over': board.game_over,
+        'game_won': board.game_won
+    }
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, size, agent.x, agent.y, DIRECTIONS.index(agent.direction),
+                         agent.arrows, sum(bool(status[name]) << bit for bit, name in enumerate(STATUS_FLAGS)))
+
+    # Only set bits are visited, so the cost follows the number of flags rather than cells
+    flag_masks = get_flag_masks(board)
+    packed = 0
+    for bit, name in enumerate(CELL_FLAGS):
+        mask = flag_masks[name]
+        while mask:
+            low = mask & -mask
+            packed |= 1 << ((low.bit_length() - 1) * CELL_BITS + bit)
+            mask ^= low
+
+    return header + packed.to_bytes((size * size * CELL_BITS + 7) // 8, 'little')
+
+
+def decode_flag_masks(data: bytes) -> Tuple[Dict, Dict[str, int]]:
+    """
+    Unpack bytes from encode_board into (header fields, flag masks) without
+    building a board. Raises ValueError for data that is not a packed board.
+    """
+    if len(data) < HEADER.size:
+        raise ValueError("Packed board is too short")
+    magic, version, size, x, y, direction, arrows, status = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError("Unsupported packed board format")
+    if len(data) != HEADER.size + (size * size * CELL_BITS + 7) // 8:
+        raise ValueError("Packed board has the wrong length")
+    if not (x < size and y < size and direction < len(DIRECTIONS)):
+        raise ValueError("Packed board has an invalid agent state")
+
+    header = {
+        'size': size,
+        'x': x,
+        'y': y,
+        'direction': DIRECTIONS[direction],
+        'arrows': arrows
+    }
+    for bit, name in enumerate(STATUS_FLAGS):
+        header[name] = bool((status >> bit) & 1)
+
+    packed = int.from_bytes(data[HEADER.size:], 'little')
+    masks = dict.fromkeys(CELL_FLAGS, 0)
+    while packed:
+        low = packed & -packed
+        index, bit = divmod(low.bit_length() - 1, CELL_BITS)
+        if index >= size * size:
+            raise ValueError("Packed board has bits set past its last cell")
+        masks[CELL_FLAGS[bit]] |= 1 << index
+        packed ^= low
+
+    return header, masks
+
+
+def decode_board(data: bytes, board_class=WumpusBoard):
+    """Rebuild a board of the given class from encode_board output"""
+    header, masks = decode_flag_masks(data)
+    size = header['size']
+    board = board_class(size)
+
+    if hasattr(board, 'wumpus_mask'):
+        board.wumpus_mask = masks['wumpus']
+        board.pit_mask = masks['pit']
+        board.gold_mask = masks['gold']
+        board.breeze_mask = masks['breeze']
+        board.stench_mask = masks['stench']
+        board.glitter_mask = masks['glitter']
+        board.visited_cells.bits = masks['visited']
+        board.safe_cells.bits = masks['safe']
+        board.danger_cells.bits = masks['danger']
+    else:
+        # The new board's cells are empty apart from the agent's start; most flags are sparse
+        start = board.board[board.agent.y][board.agent.x]
+        start.agent = start.visited = False
+        for name in ('wumpus', 'pit', 'gold', 'agent', 'breeze', 'stench', 'glitter', 'visited'):
+            for x, y in iter_positions(size, masks[name]):
+                setattr(board.board[y][x], name, True)
+
+        # Percept counts are rebuilt from the hazards without touching the stored percepts
+        board.breeze_counts = [[0] * size for _ in range(size)]
+        board.stench_counts = [[0] * size for _ in range(size)]
+        for name, counts in (('pit', board.breeze_counts), ('wumpus', board.stench_counts)):
+            for x, y in iter_positions(size, masks[name]):
+                for adj_x, adj_y in board.get_adjacent_positions(x, y):
+                    counts[adj_y][adj_x] += 1
+        board.wumpus_count = masks['wumpus'].bit_count()
+
+        board.visited_cells = set(iter_positions(size, masks['visited']))
+        board.safe_cells = set(iter_positions(size, masks['safe']))
+        board.danger_cells = set(iter_positions(size, masks['danger']))
+
+    board.agent.x = header['x']
+    board.agent.y = header['y']
+    board.agent.direction = header['direction']
+    board.agent.arrows = header['arrows']
+    board.agent.has_gold = header['has_gold']
+    board.agent.alive = header['alive']
+    board.wumpus_alive = header['wumpus_alive']
+    board.game_over = header['game_over']
+    board.game_won = header['game_won']
+    return board
+
+
+def encode_board_base64(board) -> str:
+    """Pack a board into a base64 string for JSON payloads"""
+    return base64.b64encode(encode_board(board)).decode('ascii')
+
+
+def decode_board_base64(text: str, board_class=WumpusBoard):
+    """Rebuild a board from encode_board_base64 output"""
+    return decode_board(base64.b64decode(text, validate=True), board_class)
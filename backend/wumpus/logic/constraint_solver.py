@@ -0,0 +1,310 @@
+"""
+Constraint Solver for Wumpus World
+Propositional reasoning over the clauses produced by breeze and stench percepts.
+Each clause states that at least one of its cells holds a hazard.
+"""
+
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+Position = Tuple[int, int]
+Clause = FrozenSet[Position]
+
+
+def unit_propagate(clauses: List[Clause], assignment: Dict[Position, bool]) -> Optional[Dict[Position, bool]]:
+    """
+    Repeatedly assign the last open cell of any clause that is not yet satisfied.
+    Returns the extended assignment, or None if some clause can no longer be satisfied.
+    """
+    assignment = dict(assignment)
+    changed = True
+    while changed:
+        changed = False
+        for clause in clauses:
+            open_cells = []
+            satisfied = False
+            for pos in clause:
+                value = assignment.get(pos)
+                if value is True:
+                    satisfied = True
+                    break
+                if value is None:
+                    open_cells.append(pos)
+            if satisfied:
+                continue
+            if not open_cells:
+                return None
+            if len(open_cells) == 1:
+                assignment[open_cells[0]] = True
+                changed = True
+    return assignment
+
+
+def dpll(clauses: List[Clause], assignment: Dict[Position, bool]) -> Optional[Dict[Position, bool]]:
+    """Find a satisfying assignment extending the given one, or None if there is none"""
+    assignment = unit_propagate(clauses, assignment)
+    if assignment is None:
+        return None
+
+    # Branch on the most constrained open cell of an unsatisfied clause
+    counts: Dict[Position, int] = {}
+    for clause in clauses:
+        if any(assignment.get(pos) is True for pos in clause):
+            continue
+        for pos in clause:
+            if pos not in assignment:
+                counts[pos] = counts.get(pos, 0) + 1
+
+    if not counts:
+        return assignment
+
+    branch = max(counts, key=counts.get)
+    for value in (True, False):
+        trial = dict(assignment)
+        trial[branch] = value
+        model = dpll(clauses, trial)
+        if model is not None:
+            return model
+    return None
+
+
+def find_backbone(clauses: Iterable[Clause],
+                  assignment: Dict[Position, bool] = None) -> Optional[Tuple[Set[Position], Set[Position]]]:
+    """
+    Find the cells whose value is the same in every model of the clauses.
+    Returns (cells that must hold a hazard, cells that cannot), or None if the
+    clauses are inconsistent with the given assignment.
+    """
+    clauses = [clause for clause in clauses if clause]
+    assignment = dict(assignment or {})
+
+    model = dpll(clauses, assignment)
+    if model is None:
+        return None
+
+    variables = set()
+    for clause in clauses:
+        variables.update(clause)
+
+    # Values already witnessed by some model need no further search
+    seen_true = {pos for pos in variables if model.get(pos) is True}
+    seen_false = variables - seen_true
+
+    must_true: Set[Position] = set()
+    must_false: Set[Position] = set()
+    for pos in variables:
+        if pos in assignment:
+            (must_true if assignment[pos] else must_false).add(pos)
+            continue
+        if pos in seen_true and pos in seen_false:
+            continue
+
+        value = pos in seen_true
+        trial = dict(assignment)
+        trial[pos] = not value
+        witness = dpll(clauses, trial)
+        if witness is None:
+            (must_true if value else must_false).add(pos)
+            continue
+        for other in variables:
+            if witness.get(other) is True:
+                seen_true.add(other)
+            else:
+                seen_false.add(other)
+
+    return must_true, must_false
+
+
+def split_components(clauses: Iterable[Clause]) -> List[List[Clause]]:
+    """Partition clauses into groups that share no cells, so each group can be solved on its own"""
+    parent: Dict[Position, Position] = {}
+
+    def find(pos: Position) -> Position:
+        root = pos
+        while parent[root] != root:
+            root = parent[root]
+        while parent[pos] != root:
+            parent[pos], pos = root, parent[pos]
+        return root
+
+    clauses = [clause for clause in set(clauses) if clause]
+    for clause in clauses:
+        cells = iter(clause)
+        first = next(cells)
+        parent.setdefault(first, first)
+        root = find(first)
+        for pos in cells:
+            parent.setdefault(pos, pos)
+            other = find(pos)
+            if other != root:
+                parent[other] = root
+
+    groups: Dict[Position, List[Clause]] = {}
+    for clause in clauses:
+        groups.setdefault(find(next(iter(clause))), []).append(clause)
+
+    # Sort for a stable order between calls
+    return sorted(groups.values(), key=lambda group: min(min(clause) for clause in group))
+
+
+def _binomial_row(n: int) -> Tuple[int, ...]:
+    """Number of ways to choose m hazards among n unconstrained cells, for m = 0..n"""
+    row = [1]
+    for k in range(n):
+        row.append(row[-1] * (n - k) // (k + 1))
+    return tuple(row)
+
+
+def _multiply(a: Tuple[int, ...], b: Tuple[int, ...]) -> Tuple[int, ...]:
+    result = [0] * (len(a) + len(b) - 1)
+    for i, x in enumerate(a):
+        if x:
+            for j, y in enumerate(b):
+                result[i + j] += x * y
+    return tuple(result)
+
+
+def _add(a: Tuple[int, ...], b: Tuple[int, ...]) -> Tuple[int, ...]:
+    if len(a) < len(b):
+        a, b = b, a
+    return tuple(x + (b[i] if i < len(b) else 0) for i, x in enumerate(a))
+
+
+def _cells(clauses: Iterable[Clause]) -> Set[Position]:
+    cells: Set[Position] = set()
+    for clause in clauses:
+        cells.update(clause)
+    return cells
+
+
+def count_models(clauses: FrozenSet[Clause], memo: Dict[FrozenSet[Clause], Tuple[int, ...]] = None) -> Tuple[int, ...]:
+    """
+    Count the models of the clauses by number of hazards.
+    Entry m of the result is the number of assignments to the cells of the
+    clauses that place exactly m hazards and satisfy every clause.
+    """
+    if memo is None:
+        memo = {}
+    if not clauses:
+        return (1,)
+    if clauses in memo:
+        return memo[clauses]
+
+    components = split_components(clauses)
+    if len(components) > 1:
+        result: Tuple[int, ...] = (1,)
+        for component in components:
+            result = _multiply(result, count_models(frozenset(component), memo))
+        memo[clauses] = result
+        return result
+
+    cells = _cells(clauses)
+    counts: Dict[Position, int] = {}
+    for clause in clauses:
+        for pos in clause:
+            counts[pos] = counts.get(pos, 0) + 1
+    branch = max(sorted(counts), key=counts.get)
+
+    # Branch cell holds a hazard: every clause containing it is satisfied
+    rest = frozenset(clause for clause in clauses if branch not in clause)
+    with_hazard = _multiply(count_models(rest, memo), _binomial_row(len(cells) - 1 - len(_cells(rest))))
+    result = (0,) + with_hazard
+
+    # Branch cell is empty: it drops out of every clause
+    reduced = frozenset(clause - {branch} if branch in clause else clause for clause in clauses)
+    if frozenset() not in reduced:
+        without_hazard = _multiply(count_models(reduced, memo), _binomial_row(len(cells) - 1 - len(_cells(reduced))))
+        result = _add(result, without_hazard)
+
+    memo[clauses] = result
+    return result
+
+
+def _weight(counts: Tuple[int, ...], cells: int, density: float) -> float:
+    """Prior probability mass of the models described by counts, over the given number of cells"""
+    return sum(count * density ** m * (1.0 - density) ** (cells - m) for m, count in enumerate(counts))
+
+
+def hazard_marginals(clauses: Iterable[Clause], density: float,
+                     memo: Dict[FrozenSet[Clause], Tuple[int, ...]] = None) -> Dict[Position, float]:
+    """
+    Exact probability that each cell of the clauses holds a hazard, given that
+    every clause holds and each cell independently holds one with the prior density
+    """
+    clauses = frozenset(clause for clause in clauses if clause)
+    if memo is None:
+        memo = {}
+    cells = _cells(clauses)
+    total = _weight(count_models(clauses, memo), len(cells), density)
+    if total <= 0.0:
+        return {}
+
+    marginals: Dict[Position, float] = {}
+    for pos in cells:
+        rest = frozenset(clause for clause in clauses if pos not in clause)
+        with_hazard = _multiply(count_models(rest, memo), _binomial_row(len(cells) - 1 - len(_cells(rest))))
+        marginals[pos] = density * _weight(with_hazard, len(cells) - 1, density) / total
+    return marginals
+
+
+def min_hazards(counts: Tuple[int, ...]) -> Optional[int]:
+    """Fewest hazards placed by any model described by counts, or None if there is no model"""
+    for m, count in enumerate(counts):
+        if count:
+            return m
+    return None
+
+
+def combine_counts(parts: Iterable[Tuple[int, ...]], free_cells: int = 0, limit: int = None) -> Tuple[int, ...]:
+    """
+    Model counts by number of hazards of independent parts taken together with
+    free_cells unconstrained cells, leaving out models with more than limit hazards
+    """
+    result = _binomial_row(free_cells)
+    for part in parts:
+        result = _multiply(result, part)
+        if limit is not None:
+            result = result[:limit + 1]
+    return result[:limit + 1] if limit is not None else result
+
+
+def _odds_weight(counts: Tuple[int, ...], odds: float, limit: int) -> float:
+    """Prior mass of the models with at most limit hazards, up to a factor shared by every model"""
+    return sum(count * odds ** m for m, count in enumerate(counts[:limit + 1]))
+
+
+def bounded_hazard_marginals(clauses: Iterable[Clause], density: float, limit: int,
+                             outside: Tuple[int, ...] = (1,),
+                             memo: Dict[FrozenSet[Clause], Tuple[int, ...]] = None) -> Dict[Position, float]:
+    """
+    Like hazard_marginals, but only models with at most limit hazards in total
+    count. outside holds the model counts of every other cell that may hold a
+    hazard (see combine_counts); those cells share the limit with the clauses.
+    """
+    clauses = frozenset(clause for clause in clauses if clause)
+    if memo is None:
+        memo = {}
+    cells = _cells(clauses)
+    odds = density / (1.0 - density)
+    total = _odds_weight(_multiply(count_models(clauses, memo), outside), odds, limit)
+    if total <= 0.0:
+        return {}
+
+    marginals: Dict[Position, float] = {}
+    for pos in cells:
+        rest = frozenset(clause for clause in clauses if pos not in clause)
+        with_hazard = (0,) + _multiply(count_models(rest, memo), _binomial_row(len(cells) - 1 - len(_cells(rest))))
+        marginals[pos] = _odds_weight(_multiply(with_hazard, outside), odds, limit) / total
+    return marginals
+
+
+def bounded_free_probability(density: float, limit: int, outside: Tuple[int, ...] = (1,)) -> float:
+    """
+    Probability that a cell no clause mentions holds a hazard, when at most
+    limit hazards exist and outside counts the models of every other cell
+    """
+    if limit <= 0:
+        return 0.0
+    odds = density / (1.0 - density)
+    with_hazard = _odds_weight((0,) + tuple(outside), odds, limit)
+    total = _odds_weight(outside, odds, limit) + with_hazard
+    return with_hazard / total if total > 0.0 else 0.0
@@ -0,0 +1,103 @@
+"""
+Environment Generator for Wumpus World
+Builds random environments from an explicitly seeded RNG so that benchmark
+corpora can be reproduced exactly across runs and machines
+"""
+
+import random
+from typing import Dict, List, Optional, Tuple
+from .bitboard import spread_mask
+
+# Largest board the generator builds; its candidate lists grow with size squared
+MAX_BOARD_SIZE = 50
+
+# Share of cells that hold a pit on generated boards by default
+DEFAULT_PIT_DENSITY = 0.06
+
+
+def default_wumpus_density(size: int) -> float:
+    """Share of cells holding a wumpus on generated boards, which have exactly one"""
+    return 1 / (size * size)
+
+
+class EnvironmentGenerator:
+    """Seeded generator of random environments with reachable gold"""
+
+    def __init__(self, size: int = 10, pit_density: float = DEFAULT_PIT_DENSITY, seed: Optional[int] = None,
+                 max_attempts: int = 100):
+        if not 3 <= size <= MAX_BOARD_SIZE:
+            raise ValueError(f"Board size must be between 3 and {MAX_BOARD_SIZE}")
+        if not 0.0 <= pit_density < 1.0:
+            raise ValueError("Pit density must be between 0 and 1")
+
+        self.size = size
+        self.pit_density = pit_density
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.max_attempts = max_attempts
+        self.agent_start = (0, size - 1)
+
+        # Candidate cells are computed once and sampled from for every environment
+        start_x, start_y = self.agent_start
+        cells = [(x, y) for y in range(size) for x in range(size)]
+
+        # Any cell but the start can hold the gold
+        self.gold_cells = [pos for pos in cells if pos != self.agent_start]
+
+        # The wumpus is never next to (or diagonal to) the start
+        self.wumpus_cells = [(x, y) for x, y in cells
+                             if abs(x - start_x) > 1 or abs(y - start_y) > 1]
+
+        # Pits keep the start and the cells next to it free
+        self.pit_cells = [(x, y) for x, y in cells
+                          if abs(x - start_x) + abs(y - start_y) > 1]
+
+        self.num_pits = min(round(pit_density * size * size), len(self.pit_cells) - 2)
+
+    def generate(self) -> Dict:
+        """Generate one environment in the format accepted by load_environment"""
+        rng = self.rng
+
+        for _ in range(self.max_attempts):
+            wumpus = rng.choice(self.wumpus_cells)
+            gold = rng.choice(self.gold_cells)
+            while gold == wumpus:
+                gold = rng.choice(self.gold_cells)
+
+            # Two extra samples cover drawn pits that collide with the wumpus and the gold
+            pits = [pos for pos in rng.sample(self.pit_cells, self.num_pits + 2)
+                    if pos != wumpus and pos != gold][:self.num_pits]
+
+            if self.is_gold_reachable(gold, [wumpus] + pits):
+                return {
+                    'wumpus': {'x': wumpus[0], 'y': wumpus[1]},
+                    'gold': {'x': gold[0], 'y': gold[1]},
+                    'pits': [{'x': x, 'y': y} for x, y in pits]
+                }
+
+        raise ValueError(f"Could not place reachable gold after {self.max_attempts} attempts; "
+                         f"pit density {self.pit_density} is too high")
+
+    def generate_batch(self, count: int) -> List[Dict]:
+        """Generate a list of environments from the same seeded stream"""
+        return [self.generate() for _ in range(count)]
+
+    def is_gold_reachable(self, gold: Tuple[int, int], blocked: List[Tuple[int, int]]) -> bool:
+        """Check that a hazard-free path leads from the start to the gold"""
+        size = self.size
+        blocked_mask = 0
+        for x, y in blocked:
+            blocked_mask |= 1 << (y * size + x)
+        open_mask = ((1 << (size * size)) - 1) & ~blocked_mask
+
+        start_x, start_y = self.agent_start
+        gold_bit = 1 << (gold[1] * size + gold[0])
+        reached = 1 << (start_y * size + start_x)
+
+        # Flood fill one ring of neighbours at a time
+        while not reached & gold_bit:
+            grown = (reached | spread_mask(size, reached)) & open_mask
+            if grown == reached:
+                return False
+            reached = grown
+        return True
@@ -0,0 +1,201 @@
+"""
+Environment Pool for Wumpus World
+Keeps pre-built board templates ready so new games do not parse environment
+files or generate random boards on the request path. A template is the packed
+encoding of a validated starting board; every game gets its own board decoded
+from it, so templates are never changed and can be shared by all threads.
+"""
+
+import os
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Deque, Dict, Optional, Tuple
+
+from .board import WumpusBoard
+from .board_codec import decode_board, encode_board
+from .environment_generator import DEFAULT_PIT_DENSITY, EnvironmentGenerator
+
+DEFAULT_ENVIRONMENT_FILE = Path(__file__).parent / "wumpus.txt"
+
+
+@dataclass(frozen=True)
+class BoardTemplate:
+    """Immutable starting board, stored in the packed board encoding"""
+    name: str
+    size: int
+    data: bytes
+    # Packed flags of every cell, the starting point of a game's change history
+    cell_states: Tuple[int, ...] = field(default=(), compare=False)
+    # Environment dict the board was built from, for random templates; read-only
+    environment: Optional[Dict] = field(default=None, compare=False)
+
+    def create_board(self, board_class=WumpusBoard):
+        """Build a fresh board of the given class from the template"""
+        return decode_board(self.data, board_class)
+
+
+def new_headless_game(size: int = 10):
+    # Imported here, game.py itself builds its default board from the pool
+    from .game import WumpusGame
+
+    game = WumpusGame(size)
+    game.set_headless(True)
+    return game
+
+
+def template_from_game(game, name: str, environment: Optional[Dict] = None) -> BoardTemplate:
+    """Snapshot the current board of a game as a template"""
+    return BoardTemplate(name=name, size=game.board.size, data=encode_board(game.board),
+                         cell_states=tuple(game.cell_states), environment=environment)
+
+
+def template_from_text_file(file_path) -> Optional[BoardTemplate]:
+    """Parse and validate an environment file into a template; None if it is invalid"""
+    game = new_headless_game()
+    if not game.load_environment_from_text_file(file_path):
+        return None
+    return template_from_game(game, Path(file_path).name)
+
+
+def template_from_environment(environment: Dict, size: int = 10, name: str = 'random') -> Optional[BoardTemplate]:
+    """Build a template from an environment dict; None if it does not load"""
+    game = new_headless_game(size)
+    if not game.load_environment(environment):
+        return None
+    return template_from_game(game, name, environment)
+
+
+class EnvironmentPool:
+    """
+    Thread-safe cache of file templates plus a queue of pre-generated random
+    templates. The random queue is topped up by a background thread, and a
+    request that finds it empty generates its template inline.
+    """
+
+    def __init__(self, random_pool_size: int = 32, size: int = 10, pit_density: float = DEFAULT_PIT_DENSITY):
+        self.random_pool_size = random_pool_size
+        self.size = size
+        self.pit_density = pit_density
+
+        # Resolved path -> (modification time, template); a changed file is parsed again
+        self.file_templates: Dict[str, Tuple[int, BoardTemplate]] = {}
+        self.random_templates: Deque[BoardTemplate] = deque()
+        self.generator = EnvironmentGenerator(size=size, pit_density=pit_density)
+        self.lock = threading.Lock()
+        self.generator_lock = threading.Lock()
+        self.refilling = False
+        self.warmed = False
+
+        self.metrics = {
+            'file_hits': 0,
+            'file_loads': 0,
+            'random_hits': 0,
+            'random_misses': 0,
+            'random_generated': 0
+        }
+
+    def get_file_template(self, file_path=None) -> Optional[BoardTemplate]:
+        """Get the template of an environment file, parsing it only when it changed"""
+        path = os.path.abspath(file_path or DEFAULT_ENVIRONMENT_FILE)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            print(f"Error: File {path} not found")
+            return None
+
+        with self.lock:
+            cached = self.file_templates.get(path)
+            if cached is not None and cached[0] == mtime:
+                self.metrics['file_hits'] += 1
+                return cached[1]
+
+        template = template_from_text_file(path)
+        if template is None:
+            return None
+        with self.lock:
+            self.file_templates[path] = (mtime, template)
+            self.metrics['file_loads'] += 1
+        return template
+
+    def get_default_template(self) -> Optional[BoardTemplate]:
+        """Get the template of the default wumpus.txt environment"""
+        return self.get_file_template(DEFAULT_ENVIRONMENT_FILE)
+
+    def generate_random_template(self) -> BoardTemplate:
+        with self.generator_lock:
+            environment = self.generator.generate()
+        with self.lock:
+            self.metrics['random_generated'] += 1
+        return template_from_environment(environment, self.size)
+
+    def take_random_template(self) -> BoardTemplate:
+        """Take a pre-generated random template, generating one if the pool is empty"""
+        with self.lock:
+            template = self.random_templates.popleft() if self.random_templates else None
+            self.metrics['random_hits' if template is not None else 'random_misses'] += 1
+        self.start_refill()
+        return template if template is not None else self.generate_random_template()
+
+    def start_refill(self):
+        """Top the random pool up on a background thread, unless one is already running"""
+        with self.lock:
+            if self.refilling or len(self.random_templates) >= self.random_pool_size:
+                return
+            self.refilling = True
+        threading.Thread(target=self.refill, name='wumpus-environment-pool', daemon=True).start()
+
+    def refill(self):
+        try:
+            while True:
+                with self.lock:
+                    if len(self.random_templates) >= self.random_pool_size:
+                        return
+                template = self.generate_random_template()
+                with self.lock:
+                    self.random_templates.append(template)
+        except Exception as e:
+            print(f"Error refilling environment pool: {e}")
+        finally:
+            with self.lock:
+                self.refilling = False
+
+    def warm(self):
+        """Parse the default environment now and start filling the random pool; only the first call does this"""
+        with self.lock:
+            if self.warmed:
+                return
+            self.warmed = True
+        self.get_default_template()
+        self.start_refill()
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            return {
+                **self.metrics,
+                'file_templates': len(self.file_templates),
+                'random_ready': len(self.random_templates),
+                'random_pool_size': self.random_pool_size
+            }
+
+
+_pool: Optional[EnvironmentPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_environment_pool() -> EnvironmentPool:
+    """Get the process-wide environment pool"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = EnvironmentPool()
+        return _pool
+
+
+def configure_environment_pool(**options) -> EnvironmentPool:
+    """Replace the process-wide environment pool with one built from options"""
+    global _pool
+    with _pool_lock:
+        _pool = EnvironmentPool(**options)
+        return _pool
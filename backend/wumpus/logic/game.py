@@ -4,20 +4,44 @@ import os
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from .board import WumpusBoard
+from .environment_generator import DEFAULT_PIT_DENSITY
+from .environment_pool import BoardTemplate, get_environment_pool
 from .move import Move, MoveResult
 from .logical_inference import LogicalInference
 
 
 class WumpusGame:
   
-    def __init__(self, board_size: int = 10):
-        self.board = WumpusBoard(board_size)
+    def __init__(self, board_size: int = 10, board_class=WumpusBoard, template: BoardTemplate = None,
+                 wumpus_limit: Optional[int] = None, pit_density: float = DEFAULT_PIT_DENSITY,
+                 wumpus_density: Optional[float] = None):
+        if wumpus_limit is not None and wumpus_limit < 0:
+            raise ValueError("wumpus_limit must not be negative")
+        self.board_class = board_class
+        # Most wumpuses the AI is told the cave holds; None leaves their number unknown
+        self.wumpus_limit = wumpus_limit
+        # Prior hazard densities of the AI (None = one wumpus per board)
+        self.pit_density = pit_density
+        self.wumpus_density = wumpus_density
+        # A pooled template replaces the empty board, so a new game needs no loading
+        self.board = template.create_board(board_class) if template else board_class(board_size)
         self.move_history: List[Move] = []
         self.score = 0
         self.max_moves = 1000
-        self.inference_engine = LogicalInference(self.board)
+        self.headless = False  # Skip all printing and per-move board serialisation
+        self.inference_engine = self.create_inference_engine()
         self.game_id = self.generate_game_id()
         
+        # Versioned change history for delta responses: every cell's packed flags
+        # and every state field remember the version at which they last changed
+        self.state_version = 0
+        self.history_start = 0
+        self.cell_states: List[int] = []
+        self.cell_versions: List[int] = []
+        self.field_values: Dict[str, object] = {}
+        self.field_versions: Dict[str, int] = {}
+        self.reset_state_history(template.cell_states if template else None)
+        
         # Scoring system
         self.scoring = {
             'move': -1,
@@ -27,25 +51,57 @@ class WumpusGame:
             'win': 1000
         }
     
+    def create_inference_engine(self) -> LogicalInference:
+        """Create an inference engine for the current board"""
+        engine = LogicalInference(self.board, wumpus_limit=self.wumpus_limit, pit_density=self.pit_density,
+                                  wumpus_density=self.wumpus_density)
+        engine.debug = not self.headless
+        return engine
+    
+    def set_headless(self, headless: bool):
+        """Turn headless simulation mode on or off"""
+        self.headless = headless
+        self.inference_engine.debug = not headless
+    
     def generate_game_id(self) -> str:
         """Generate unique game ID"""
         return f"game_{random.randint(1000, 9999)}"
     
-    def make_move(self, action: str, direction: str = None) -> MoveResult:
-        """Make a move with support for direct movement actions"""
+    def make_move(self, action: str, direction: str = None, include_state: bool = True) -> MoveResult:
+        """
+        Make a move with support for direct movement actions.
+        The full game state is attached to the result only if include_state is set
+        """
+        start_pos = (self.board.agent.x, self.board.agent.y)
+        result = self.execute_move(action, direction)
+        
+        # Only the cells the agent left and entered change, unless the action
+        # reaches into the environment
+        if action in ('shoot', 'grab'):
+            self.record_state_changes()
+        else:
+            self.record_state_changes([start_pos, (self.board.agent.x, self.board.agent.y)])
+        
+        if include_state and not self.headless:
+            result.game_state = self.get_game_state()
+        return result
+    
+    def execute_move(self, action: str, direction: str = None) -> MoveResult:
+        """Apply one action to the board, score and knowledge base"""
         if self.board.game_over:
-            return MoveResult(False, "Game is over", self.get_game_state())
+            return MoveResult(False, "Game is over", self.get_move_state())
         
         if len(self.move_history) >= self.max_moves:
             self.board.game_over = True
-            return MoveResult(False, "Maximum moves reached", self.get_game_state())
+            return MoveResult(False, "Maximum moves reached", self.get_move_state())
         
         # Handle direct movement actions
         if action.startswith('move_'):
             direction = action.split('_')[1]
             result = self.move_agent(direction)
             # Print knowledge after direct movement
-            self.inference_engine.print_knowledge_state()  # <-- ADDED
+            if not self.headless:
+                self.inference_engine.print_knowledge_state()  # <-- ADDED
             return result
         
         # Create move object
@@ -80,7 +136,7 @@ class WumpusGame:
             message = "Climbed out" if success else "Can only climb out from starting position"
         
         else:
-            return MoveResult(False, "Invalid action", self.get_game_state())
+            return MoveResult(False, "Invalid action", self.get_move_state())
         
         # Update score
         self.update_score(action, success)
@@ -94,7 +150,8 @@ class WumpusGame:
         self.inference_engine.update_knowledge(move)
         
         # PRINT KNOWLEDGE STATE AFTER UPDATING (NEW)
-        self.inference_engine.print_knowledge_state()  # <-- ADDED
+        if not self.headless:
+            self.inference_engine.print_knowledge_state()  # <-- ADDED
         
         # Check game status
         if self.board.is_game_won():
@@ -103,7 +160,7 @@ class WumpusGame:
             self.score += self.scoring['win']
             message += " - Game won!"
         
-        return MoveResult(success, message, self.get_game_state())
+        return MoveResult(success, message, self.get_move_state())
     
     def move_forward(self) -> bool:
         """Move agent forward in current direction"""
@@ -170,6 +227,7 @@ class WumpusGame:
         
         return {
             'game_id': self.game_id,
+            'state_version': self.state_version,
             'board': board_state['board'],
             'agent': board_state['agent'],
             'wumpus_alive': board_state['wumpus_alive'],
@@ -183,6 +241,120 @@ class WumpusGame:
             'visited_cells': list(self.board.visited_cells)
         }
     
+    def get_move_state(self) -> Dict:
+        """Compact game state attached to a move result; make_move adds the full state when asked"""
+        return {
+            'game_id': self.game_id,
+            'state_version': self.state_version,
+            'game_over': self.board.game_over,
+            'game_won': self.board.game_won,
+            'score': self.score,
+            'moves_made': len(self.move_history)
+        }
+    
+    def pack_cell(self, x: int, y: int) -> int:
+        """Pack the flags of a cell (wumpus, pit, gold, agent, breeze, stench, glitter, visited, safe) into one integer"""
+        cell = self.board.get_cell(x, y)
+        return (cell.wumpus | cell.pit << 1 | cell.gold << 2 | cell.agent << 3 |
+                cell.breeze << 4 | cell.stench << 5 | cell.glitter << 6 | cell.visited << 7 |
+                (cell.safe or (x, y) in self.board.safe_cells) << 8)
+    
+    def get_state_fields(self) -> Dict[str, object]:
+        """Every non-cell value of the game state, keyed by name (agent fields as 'agent.<name>')"""
+        agent = self.board.agent
+        return {
+            'agent.x': agent.x,
+            'agent.y': agent.y,
+            'agent.direction': agent.direction,
+            'agent.arrows': agent.arrows,
+            'agent.has_gold': agent.has_gold,
+            'agent.alive': agent.alive,
+            'wumpus_alive': self.board.wumpus_alive,
+            'game_over': self.board.game_over,
+            'game_won': self.board.is_game_won(),
+            'score': self.score,
+            'moves_made': len(self.move_history),
+            'max_moves': self.max_moves,
+            'percepts': self.board.get_percepts() if not self.board.game_over else {}
+        }
+    
+    def reset_state_history(self, cell_states: Tuple[int, ...] = None):
+        """
+        Start a new change history; clients behind it get a full snapshot.
+        cell_states are the already packed cells of the board, if known.
+        """
+        self.state_version += 1
+        self.history_start = self.state_version
+        size = self.board.size
+        if cell_states:
+            self.cell_states = list(cell_states)
+        else:
+            self.cell_states = [self.pack_cell(x, y) for y in range(size) for x in range(size)]
+        self.cell_versions = [self.state_version] * (size * size)
+        self.field_values = self.get_state_fields()
+        self.field_versions = {name: self.state_version for name in self.field_values}
+    
+    def record_state_changes(self, positions: List[Tuple[int, int]] = None):
+        """Compare the given cells (all if None) and every state field with their last recorded values"""
+        version = self.state_version + 1
+        changed = False
+        size = self.board.size
+        
+        if positions is None:
+            positions = [(x, y) for y in range(size) for x in range(size)]
+        for x, y in positions:
+            index = y * size + x
+            packed = self.pack_cell(x, y)
+            if packed != self.cell_states[index]:
+                self.cell_states[index] = packed
+                self.cell_versions[index] = version
+                changed = True
+        
+        for name, value in self.get_state_fields().items():
+            if self.field_values.get(name) != value:
+                self.field_values[name] = value
+                self.field_versions[name] = version
+                changed = True
+        
+        if changed:
+            self.state_version = version
+    
+    def get_state_delta(self, since_version: Optional[int], game_id: str = None) -> Dict:
+        """
+        Get the cells and fields that changed after since_version. A full snapshot is
+        returned instead if the client's version is not part of this game's history
+        """
+        if (since_version is None or game_id not in (None, self.game_id) or
+                not self.history_start <= since_version <= self.state_version):
+            return {
+                'full': True,
+                'state_version': self.state_version,
+                'game_state': self.get_game_state()
+            }
+        
+        size = self.board.size
+        cells = [self.get_cell_data(index % size, index // size)
+                 for index, version in enumerate(self.cell_versions) if version > since_version]
+        
+        agent = {}
+        fields = {}
+        for name, version in self.field_versions.items():
+            if version > since_version:
+                if name.startswith('agent.'):
+                    agent[name[len('agent.'):]] = self.field_values[name]
+                else:
+                    fields[name] = self.field_values[name]
+        
+        return {
+            'full': False,
+            'game_id': self.game_id,
+            'since_version': since_version,
+            'state_version': self.state_version,
+            'cells': cells,
+            'agent': agent,
+            'fields': fields
+        }
+    
     def get_possible_actions(self) -> List[str]:
         """Get list of possible actions"""
         if self.board.game_over:
@@ -211,18 +383,20 @@ class WumpusGame:
     
     def reset_game(self):
         """Reset game to initial state"""
-        self.board = WumpusBoard(self.board.size)
+        self.board = self.board_class(self.board.size)
         self.move_history = []
         self.score = 0
-        self.inference_engine = LogicalInference(self.board)
+        self.inference_engine = self.create_inference_engine()
         self.game_id = self.generate_game_id()
+        self.reset_state_history()
     
     def load_environment(self, environment: Dict) -> bool:
         """Load custom environment"""
         success = self.board.load_environment(environment)
         if success:
             # Reset inference engine with new environment
-            self.inference_engine = LogicalInference(self.board)
+            self.inference_engine = self.create_inference_engine()
+        self.reset_state_history()
         return success
     
     def load_environment_from_text_file(self, file_path: str = None) -> bool:
@@ -260,15 +434,7 @@ class WumpusGame:
                 return False
             
             # Clear existing board
-            for y in range(self.board.size):
-                for x in range(self.board.size):
-                    cell = self.board.board[y][x]
-                    cell.wumpus = False
-                    cell.pit = False
-                    cell.gold = False
-                    cell.breeze = False
-                    cell.stench = False
-                    cell.glitter = False
+            self.board.clear_environment()
             
             # Load directly from text
             for y, line in enumerate(clean_lines):
@@ -277,7 +443,7 @@ class WumpusGame:
                     return False
                 
                 for x, char in enumerate(line):
-                    cell = self.board.board[y][x]
+                    cell = self.board.get_cell(x, y)
                     
                     if char == 'W':
                         cell.wumpus = True
@@ -291,16 +457,37 @@ class WumpusGame:
             self.board.generate_breezes()
             self.board.generate_stenches()
             
-            print("Environment loaded successfully from file")
+            # Reset inference engine with new environment
+            self.inference_engine = self.create_inference_engine()
+            self.reset_state_history()
+            
+            if not self.headless:
+                print("Environment loaded successfully from file")
             return True
             
         except Exception as e:
             print(f"Error loading from text lines: {e}")
             return False
     
+    def load_template(self, template: BoardTemplate) -> bool:
+        """Start the game on a fresh board built from a pooled template"""
+        try:
+            self.board = template.create_board(self.board_class)
+        except ValueError as e:
+            print(f"Error loading board template {template.name}: {e}")
+            return False
+        self.inference_engine = self.create_inference_engine()
+        self.reset_state_history(template.cell_states)
+        return True
+    
     def load_default_environment(self) -> bool:
-        """Load the default environment from wumpus.txt file"""
-        return self.load_environment_from_text_file()
+        """Load the default environment from wumpus.txt, parsed once per change of the file"""
+        template = get_environment_pool().get_default_template()
+        if template is None or not self.load_template(template):
+            return False
+        if not self.headless:
+            print("Environment loaded successfully from file")
+        return True
     
     def get_ai_suggestion(self) -> Optional[str]:
         """Get AI suggestion for the next move"""
@@ -314,6 +501,106 @@ class WumpusGame:
             print(f"Error getting AI suggestion: {e}")
             return None
 
+    def get_cell_data(self, x: int, y: int) -> Dict:
+        """Serialise one cell the same way get_game_state does"""
+        cell = self.board.get_cell(x, y)
+        return {
+            'x': x,
+            'y': y,
+            'wumpus': cell.wumpus,
+            'pit': cell.pit,
+            'gold': cell.gold,
+            'agent': cell.agent,
+            'breeze': cell.breeze,
+            'stench': cell.stench,
+            'glitter': cell.glitter,
+            'visited': cell.visited,
+            'safe': cell.safe or (x, y) in self.board.safe_cells
+        }
+    
+    def run_ai_steps(self, max_steps: int = 1, until: str = None) -> Dict:
+        """
+        Let the AI play up to max_steps actions, stopping early when the game ends,
+        the AI has no suggestion, or the until condition ('new_cell', 'percept',
+        'gold') is met. Each step reports only the cells that action changed.
+        """
+        board = self.board
+        steps = []
+        stopped = 'steps'
+        
+        # Per-step serialisation and knowledge dumps are skipped for the whole batch
+        headless = self.headless
+        self.set_headless(True)
+        try:
+            while len(steps) < max_steps:
+                if board.game_over:
+                    stopped = 'game_over'
+                    break
+                
+                action = self.get_ai_suggestion()
+                if action is None:
+                    stopped = 'no_suggestion'
+                    break
+                
+                since_version = self.state_version
+                visited_before = len(board.visited_cells)
+                result = self.make_move(action, include_state=False)
+                delta = self.get_state_delta(since_version)
+                new_cell = len(board.visited_cells) > visited_before
+                
+                percepts = board.get_percepts() if not board.game_over else {}
+                steps.append({
+                    'action': action,
+                    'success': result.success,
+                    'message': result.message,
+                    'agent': {
+                        'x': board.agent.x,
+                        'y': board.agent.y,
+                        'direction': board.agent.direction,
+                        'arrows': board.agent.arrows,
+                        'has_gold': board.agent.has_gold,
+                        'alive': board.agent.alive
+                    },
+                    'score': self.score,
+                    'moves_made': len(self.move_history),
+                    'percepts': percepts,
+                    'wumpus_alive': board.wumpus_alive,
+                    'game_over': board.game_over,
+                    'game_won': board.game_won,
+                    'since_version': since_version,
+                    'state_version': self.state_version,
+                    'cells': delta['cells']
+                })
+                
+                if ((until == 'new_cell' and new_cell) or
+                        (until == 'percept' and any(percepts.get(name) for name in ('breeze', 'stench', 'glitter'))) or
+                        (until == 'gold' and action == 'grab' and result.success)):
+                    stopped = until
+                    break
+            else:
+                if board.game_over:
+                    stopped = 'game_over'
+        finally:
+            self.set_headless(headless)
+        
+        return {
+            'game_id': self.game_id,
+            'state_version': self.state_version,
+            'steps': steps,
+            'stopped': stopped
+        }
+
+    def get_ai_plan(self) -> List[str]:
+        """Get the AI's full action sequence towards its next goal"""
+        if self.board.game_over:
+            return []
+        
+        try:
+            return self.inference_engine.get_action_plan()
+        except Exception as e:
+            print(f"Error getting AI plan: {e}")
+            return []
+
     def move_agent(self, direction: str) -> MoveResult:
         """Move agent in specified direction"""
         old_x, old_y = self.board.agent.x, self.board.agent.y
@@ -331,20 +618,20 @@ class WumpusGame:
         
         # Check if movement is valid
         if new_x == old_x and new_y == old_y:
-            return MoveResult(False, "Cannot move outside the board", self.get_game_state())
+            return MoveResult(False, "Cannot move outside the board", self.get_move_state())
         
         # Move agent
         self.board.agent.x = new_x
         self.board.agent.y = new_y
         
         # Mark cell as visited
-        self.board.board[new_y][new_x].visited = True
+        cell = self.board.get_cell(new_x, new_y)
+        cell.visited = True
         
         # Update score
         self.score += self.scoring['move']
         
         # Check for hazards
-        cell = self.board.board[new_y][new_x]
         message = f"Moved {direction}"
         
         if cell.pit:
@@ -377,7 +664,7 @@ class WumpusGame:
         # Update inference engine
         self.inference_engine.update_knowledge(move)
         
-        return MoveResult(True, message, self.get_game_state())
+        return MoveResult(True, message, self.get_move_state())
 
     def get_safe_cells(self) -> List[Tuple[int, int]]:
         """Get list of cells that are known to be safe"""
@@ -0,0 +1,106 @@
+"""
+Knowledge Base for Wumpus World
+Stores what the agent knows about each cell as one bitmask per fact (bit
+y * size + x) instead of a dict of facts per position. Cells that are known
+but not yet visited are kept in an index set, so planning only looks at the
+cells it can choose between.
+"""
+
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Every fact a cell can have
+FACTS = ('visited', 'safe', 'breeze', 'stench', 'glitter', 'possible_pit', 'possible_wumpus',
+         'pit', 'wumpus', 'dangerous', 'safe_from_pit', 'safe_from_wumpus')
+
+
+class KnowledgeBase:
+    """Fixed-size per-cell facts, one bitmask for facts known true and one for facts known false"""
+
+    def __init__(self, size: int):
+        self.size = size
+        self.known = 0
+        self.true_bits: Dict[str, int] = dict.fromkeys(FACTS, 0)
+        self.false_bits: Dict[str, int] = dict.fromkeys(FACTS, 0)
+        self.confidence: List[float] = [1.0] * (size * size)
+        # Known cells whose 'visited' fact is not set
+        self.unvisited: Set[Tuple[int, int]] = set()
+
+    def add(self, position: Tuple[int, int], facts: Dict[str, bool], confidence: float = 1.0):
+        """Record facts about a cell; its confidence only ever goes down"""
+        x, y = position
+        index = y * self.size + x
+        bit = 1 << index
+
+        if self.known & bit:
+            self.confidence[index] = min(self.confidence[index], confidence)
+        else:
+            self.known |= bit
+            self.confidence[index] = confidence
+
+        for name, value in facts.items():
+            if name not in self.true_bits:
+                raise ValueError(f"Unknown fact: {name}")
+            if value:
+                self.true_bits[name] |= bit
+                self.false_bits[name] &= ~bit
+            else:
+                self.false_bits[name] |= bit
+                self.true_bits[name] &= ~bit
+
+        if self.true_bits['visited'] & bit:
+            self.unvisited.discard(position)
+        else:
+            self.unvisited.add(position)
+
+    @property
+    def unvisited_bits(self) -> int:
+        """Mask of the cells in the unvisited index"""
+        return self.known & ~self.true_bits['visited']
+
+    def get(self, position: Tuple[int, int], name: str) -> Optional[bool]:
+        """The recorded value of a fact, or None if it was never recorded"""
+        bit = 1 << (position[1] * self.size + position[0])
+        if self.true_bits[name] & bit:
+            return True
+        if self.false_bits[name] & bit:
+            return False
+        return None
+
+    def facts(self, position: Tuple[int, int]) -> Dict[str, bool]:
+        """Every recorded fact of a cell"""
+        return self.cell_facts(1 << (position[1] * self.size + position[0]),
+                               [(name, self.true_bits[name], self.false_bits[name]) for name in FACTS])
+
+    def all_facts(self) -> Dict[Tuple[int, int], Dict[str, bool]]:
+        """Recorded facts of every known cell"""
+        masks = [(name, self.true_bits[name], self.false_bits[name]) for name in FACTS]
+        return {(x, y): self.cell_facts(1 << (y * self.size + x), masks) for x, y in self}
+
+    @staticmethod
+    def cell_facts(bit: int, masks: List[Tuple[str, int, int]]) -> Dict[str, bool]:
+        facts = {}
+        for name, true_bits, false_bits in masks:
+            if true_bits & bit:
+                facts[name] = True
+            elif false_bits & bit:
+                facts[name] = False
+        return facts
+
+    def get_confidence(self, position: Tuple[int, int]) -> float:
+        return self.confidence[position[1] * self.size + position[0]]
+
+    def __contains__(self, position) -> bool:
+        x, y = position
+        return 0 <= x < self.size and 0 <= y < self.size and bool((self.known >> (y * self.size + x)) & 1)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Known cells in row-major order"""
+        bits = self.known
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            yield (index % self.size, index // self.size)
+            bits ^= low
+
+    def __len__(self) -> int:
+        return self.known.bit_count()
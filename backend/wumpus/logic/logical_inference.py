@@ -3,14 +3,20 @@ Fixed Logical Inference Engine for Wumpus World
 FIXED: Prevents agent from moving to cells that are not completely safe
 """
 
-from typing import Dict, List, Tuple, Set, Optional
+from typing import Dict, FrozenSet, List, Tuple, Set, Optional
 from dataclasses import dataclass
-import itertools
+import heapq
+from .bitboard import CellMask
+from .environment_generator import DEFAULT_PIT_DENSITY, default_wumpus_density
+from .constraint_solver import (bounded_free_probability, bounded_hazard_marginals, combine_counts,
+                                count_models, find_backbone, hazard_marginals, min_hazards,
+                                split_components)
+from .knowledge_base import KnowledgeBase
 
 
 @dataclass
 class Knowledge:
-    """Knowledge base entry"""
+    """Knowledge base entry, as returned by LogicalInference.knowledge_base"""
     position: Tuple[int, int]
     facts: Dict[str, bool]
     confidence: float = 1.0
@@ -22,24 +28,75 @@ class Knowledge:
 class LogicalInference:
     """Logical inference engine with proper constraint satisfaction"""
     debug = True
+    
+    # Clockwise order, matching WumpusGame.turn_right
+    DIRECTIONS = ['up', 'right', 'down', 'left']
+    MOVE_OFFSETS = {'up': (0, -1), 'right': (1, 0), 'down': (0, 1), 'left': (-1, 0)}
 
-    def __init__(self, board):
+    def __init__(self, board, wumpus_limit: Optional[int] = None, pit_density: float = DEFAULT_PIT_DENSITY,
+                 wumpus_density: Optional[float] = None):
+        if wumpus_density is None:
+            wumpus_density = default_wumpus_density(board.size)
+        if not (0.0 < pit_density < 1.0 and 0.0 < wumpus_density < 1.0):
+            raise ValueError("Hazard densities must be between 0 and 1")
         self.board = board
-        self.knowledge_base: Dict[Tuple[int, int], Knowledge] = {}
-        self.safe_cells: Set[Tuple[int, int]] = set()
-        self.dangerous_cells: Set[Tuple[int, int]] = set()
-        self.pit_cells: Set[Tuple[int, int]] = set()
-        self.wumpus_cells: Set[Tuple[int, int]] = set()
-        self.possible_wumpus: Set[Tuple[int, int]] = set()
-        self.possible_pits: Set[Tuple[int, int]] = set()
-        self.frontier: Set[Tuple[int, int]] = set()
-        
-        self.safe_from_pits: Set[Tuple[int, int]] = set()
-        self.safe_from_wumpus: Set[Tuple[int, int]] = set()
+        self.knowledge = KnowledgeBase(board.size)
+        
+        # Cell sets are bitmasks, so safety can be classified for the whole board at once
+        size = board.size
+        self.safe_cells = CellMask(size)
+        self.dangerous_cells = CellMask(size)
+        self.pit_cells = CellMask(size)
+        self.wumpus_cells = CellMask(size)
+        self.possible_wumpus = CellMask(size)
+        self.possible_pits = CellMask(size)
+        self.frontier = CellMask(size)
+        
+        self.safe_from_pits = CellMask(size)
+        self.safe_from_wumpus = CellMask(size)
+        
+        # Cells known to be completely safe, as of safety_version
+        self.safe_mask = 0
+        self.safety_version = -1
         
         self.breeze_constraints: Set[Tuple[Tuple[int, int], Tuple[Tuple[int, int], ...]]] = set()
         self.stench_constraints: Set[Tuple[Tuple[int, int], Tuple[Tuple[int, int], ...]]] = set()
         
+        # Most wumpuses the world started with (None if unknown), how many have
+        # been shot since, and the arrows left when the last shot was seen
+        self.wumpus_limit = wumpus_limit
+        self.wumpus_kills = 0
+        self.arrows = board.agent.arrows
+        
+        # Solved constraint components, keyed by their clauses and known hazards
+        self.component_cache: Dict[Tuple, Optional[Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]]] = {}
+        self.component_cache_limit = 4096
+        
+        # Incremental mode: only the new cell's neighbourhood and the constraint
+        # components it touches are revisited after each move
+        self.incremental = True
+        self.expanded_cells: Set[Tuple[int, int]] = set()
+        self.constraint_index: Dict[str, Dict[Tuple[int, int], Set[Tuple]]] = {'pit': {}, 'wumpus': {}}
+        self.dirty_cells: Dict[str, Set[Tuple[int, int]]] = {'pit': set(), 'wumpus': set()}
+        
+        # Prior hazard density for cells no percept constrains, and the exact
+        # per-cell marginals derived from it (cleared when new percepts arrive).
+        # The defaults match the boards EnvironmentGenerator builds
+        self.pit_density = pit_density
+        self.wumpus_density = wumpus_density
+        self.probability_cache: Dict[str, Dict[Tuple[int, int], float]] = {'pit': {}, 'wumpus': {}}
+        self.model_count_cache: Dict = {}
+        
+        # Single-source searches shared by every target within one decision step
+        self.search_cache: Dict[Tuple, Tuple[Dict, Dict]] = {}
+        
+        # Bumped whenever the safe/dangerous knowledge changes; the current plan
+        # is reused while the version and the agent's pose stay as expected
+        self.knowledge_version = 0
+        self.current_plan: List[str] = []
+        self.plan_version = -1
+        self.plan_pose: Optional[Tuple] = None
+        
         start_pos = (0, board.size - 1)
         self.safe_cells.add(start_pos)
         self.safe_from_pits.add(start_pos)
@@ -48,13 +105,24 @@ class LogicalInference:
         
         self.debug = True
     
+    def __getstate__(self):
+        """Leave the derived caches out of pickled state; they are rebuilt on demand"""
+        state = self.__dict__.copy()
+        state['component_cache'] = {}
+        state['probability_cache'] = {'pit': {}, 'wumpus': {}}
+        state['model_count_cache'] = {}
+        state['search_cache'] = {}
+        return state
+    
+    @property
+    def knowledge_base(self) -> Dict[Tuple[int, int], Knowledge]:
+        """Snapshot of the knowledge base as one Knowledge entry per known cell; changes to it are not kept"""
+        return {pos: Knowledge(pos, facts, self.knowledge.get_confidence(pos))
+                for pos, facts in self.knowledge.all_facts().items()}
+    
     def add_knowledge(self, position: Tuple[int, int], facts: Dict[str, bool], confidence: float = 1.0):
         """Add knowledge about a position"""
-        if position not in self.knowledge_base:
-            self.knowledge_base[position] = Knowledge(position, {}, confidence)
-        
-        self.knowledge_base[position].facts.update(facts)
-        self.knowledge_base[position].confidence = min(self.knowledge_base[position].confidence, confidence)
+        self.knowledge.add(position, facts, confidence)
         
         if self.debug:
             #print(f"logical_inference.add_knowledge() ->  ")
@@ -62,10 +130,25 @@ class LogicalInference:
             pass
     def update_knowledge(self, move):
         """Update knowledge base after a move"""
+        self.advance_plan(move)
+        
+        # A fired arrow tells something even when it misses
+        if move and move.action == 'shoot' and self.board.agent.arrows < self.arrows:
+            self.arrows = self.board.agent.arrows
+            self.observe_shot((move.from_x, move.from_y), self.board.agent.direction, bool(move.result))
+        
         if not move or not hasattr(move, 'result') or not move.result:
             return
         
         current_pos = (self.board.agent.x, self.board.agent.y)
+        
+        # Turning in place reveals nothing once this cell has been processed
+        if move.action in ('turn_left', 'turn_right') and current_pos in self.expanded_cells:
+            return
+        
+        if move.action == 'shoot' or current_pos not in self.expanded_cells:
+            self.knowledge_version += 1
+        
         percepts = getattr(move, 'percepts', {})
         
         if not percepts:
@@ -76,7 +159,11 @@ class LogicalInference:
             #print(f"Updating knowledge for position {current_pos} with percepts: {percepts}")
             #print(f"Agent direction: {self.board.agent.direction}")
             pass
-
+        
+        self.observe(current_pos, percepts)
+    
+    def observe(self, current_pos: Tuple[int, int], percepts: Dict[str, bool]):
+        """Record the percepts sensed at the agent's cell and draw every inference they allow"""
         self.safe_cells.add(current_pos)
         self.safe_from_pits.add(current_pos)
         self.safe_from_wumpus.add(current_pos)
@@ -90,18 +177,30 @@ class LogicalInference:
         }
         
         self.add_knowledge(current_pos, facts)
+        self.probability_cache = {'pit': {}, 'wumpus': {}}
+        self.search_cache.clear()
+        self.dirty_cells['pit'].add(current_pos)
+        self.dirty_cells['wumpus'].add(current_pos)
         
-        self.update_frontier()
+        self.update_frontier(current_pos)
         
         self.apply_logical_rules(current_pos, percepts)
         
         self.solve_constraints()
     
-    def update_frontier(self):
+    def update_frontier(self, position: Optional[Tuple[int, int]] = None):
         """Update frontier cells (unvisited adjacent cells)"""
-        self.frontier.clear()
+        if not self.incremental or position is None:
+            self.frontier.clear()
+            self.expanded_cells.clear()
+            sources = list(self.board.visited_cells)
+        else:
+            # Only newly visited cells can add to (or leave) the frontier
+            self.frontier.discard(position)
+            sources = [pos for pos in ((0, self.board.size - 1), position) if pos not in self.expanded_cells]
         
-        for visited_pos in self.board.visited_cells:
+        for visited_pos in sources:
+            self.expanded_cells.add(visited_pos)
             x, y = visited_pos
             for dx, dy in [(0, 1), (0, -1), (1, 0), (-1, 0)]:
                 adj_x, adj_y = x + dx, y + dy
@@ -111,12 +210,6 @@ class LogicalInference:
                     adj_pos not in self.board.visited_cells and
                     adj_pos not in self.dangerous_cells):
                     self.frontier.add(adj_pos)
-                    if self.debug:
-                        #print(f"logical_inference.update_frontier() -> {adj_pos} - added to frontier")
-                        pass
-        if self.debug:
-            pass
-            #print(f"-------------------------------------Current frontier-----------------------: {self.frontier}")
 
     def apply_logical_rules(self, position: Tuple[int, int], percepts: Dict[str, bool]):
         """Apply logical inference rules"""
@@ -135,24 +228,14 @@ class LogicalInference:
             pass
             for adj_pos in adjacent_cells:
                 if adj_pos not in self.board.visited_cells:
-                    self.safe_from_pits.add(adj_pos)
-                    self.add_knowledge(adj_pos, {'safe_from_pit': True})
-                    self.possible_pits.discard(adj_pos)
-                    if self.debug:
-                        pass
-                        #print(f"No breeze detected - marking {adj_pos} as safe from pits")
+                    self.mark_safe_from_pits(adj_pos)
         
         # Rule 2: If no stench, adjacent cells are safe from wumpus
         if not percepts.get('stench', False):
             #print(f"   Rule 2 -> ")
             for adj_pos in adjacent_cells:
                 if adj_pos not in self.board.visited_cells:
-                    self.safe_from_wumpus.add(adj_pos)
-                    self.add_knowledge(adj_pos, {'safe_from_wumpus': True})
-                    self.possible_wumpus.discard(adj_pos)
-                    if self.debug:
-                        pass
-                        #print(f"No stench detected - marking {adj_pos} as safe from wumpus")
+                    self.mark_safe_from_wumpus(adj_pos)
         
         # Rule 3: If breeze, add constraint that at least one adjacent cell has a pit
         if percepts.get('breeze', False):
@@ -173,6 +256,7 @@ class LogicalInference:
                         self.add_knowledge(adj_pos, {'possible_pit': True}, 0.5)
                     
                     self.breeze_constraints.add(constraint)
+                    self.index_constraint('pit', constraint)
                 else:
                     if self.debug:
                         #print(f"Breeze constraint already exists for {position}")
@@ -196,6 +280,7 @@ class LogicalInference:
                         self.add_knowledge(adj_pos, {'possible_wumpus': True}, 0.5)
                     
                     self.stench_constraints.add(constraint)
+                    self.index_constraint('wumpus', constraint)
                 else:
                     if self.debug:
                         #print(f"Stench constraint already exists for {position}")
@@ -223,173 +308,317 @@ class LogicalInference:
             pass
             #print(f"Solving {len(self.breeze_constraints)} pit constraints")
         
-        all_possible_pits = set()
-        for _, adjacent_cells in self.breeze_constraints:
-            all_possible_pits.update(adjacent_cells)
-
-        #print(f"---------Breeze Constraints--------- : {self.breeze_constraints}")
-        #print(f"------Possible pit locations before filtering ---- : {all_possible_pits}")
-        
-        all_possible_pits = {pos for pos in all_possible_pits if pos not in self.safe_from_pits}
-        #print(f"------Possible pit locations after filtering ---- : {all_possible_pits}")
-        
-        if not all_possible_pits:
-            return
-        
-        valid_assignments = []
-        
-        # For efficiency, limit the search space
-        max_pits = min(len(all_possible_pits), 3)  # Reasonable limit
-        
-        for num_pits in range(1, max_pits + 1):
-            for pit_combination in itertools.combinations(all_possible_pits, num_pits):
-                if self.is_valid_pit_assignment(set(pit_combination)):
-                    valid_assignments.append(set(pit_combination))
-        
-        if self.debug:
-            #print(f"Found {len(valid_assignments)} valid pit assignments")
-            pass
+        # Each breeze constraint is a clause: at least one of its cells not
+        # already known to be pit-free holds a pit
+        clauses = [self.constraint_clause('pit', constraint)
+                   for constraint in self.collect_affected_constraints('pit')]
         
-        # Find cells that must be pits (in all valid assignments)
-        if valid_assignments:
-            definite_pits = set.intersection(*valid_assignments)
-            for pit_pos in definite_pits:
-                self.pit_cells.add(pit_pos)
-                self.dangerous_cells.add(pit_pos)
-                self.add_knowledge(pit_pos, {'pit': True, 'dangerous': True})
+        for component in split_components(clauses):
+            backbone = self.solve_component('pit', component, self.pit_cells)
+            if backbone is None:
                 if self.debug:
-                    pass
-                    #print(f"Definite pit found at {pit_pos}")
+                    print("Breeze constraints are inconsistent with the known pits")
+                continue
             
-            # Find cells that cannot be pits (not in any valid assignment)
-            all_in_assignments = set.union(*valid_assignments) if valid_assignments else set()
-            safe_from_pits = all_possible_pits - all_in_assignments
-            for safe_pos in safe_from_pits:
-                self.safe_from_pits.add(safe_pos)
-                self.add_knowledge(safe_pos, {'safe_from_pit': True})
-                self.possible_pits.discard(safe_pos)
-                if self.debug:
-                    pass
-                    #print(f"Cell {safe_pos} is safe from pits")
+            definite_pits, definite_safe = backbone
+            for pit_pos in definite_pits:
+                self.mark_pit(pit_pos)
+            
+            for safe_pos in definite_safe:
+                self.mark_safe_from_pits(safe_pos)
     
     def solve_wumpus_constraints(self):
         """Solve wumpus location constraints"""
         #print("logical_inference.solve_wumpus_constraints() -> ")
-        if not self.stench_constraints or not self.board.wumpus_alive:
+        if not self.board.wumpus_alive:
             return
         
-        if self.debug:
-            #print(f"Solving {len(self.stench_constraints)} wumpus constraints")
-            pass
+        clauses = [self.constraint_clause('wumpus', constraint)
+                   for constraint in self.collect_affected_constraints('wumpus')]
+        
+        for component in split_components(clauses):
+            backbone = self.solve_component('wumpus', component, self.wumpus_cells)
+            if backbone is None:
+                if self.debug:
+                    print("Stench constraints are inconsistent with the known wumpus")
+                continue
+            
+            definite_wumpus, definite_safe = backbone
+            for wumpus_pos in definite_wumpus:
+                self.mark_wumpus(wumpus_pos)
+            
+            for safe_pos in definite_safe:
+                self.mark_safe_from_wumpus(safe_pos)
         
-        # Get all possible wumpus locations
-        all_possible_wumpus = set()
-        for _, adjacent_cells in self.stench_constraints:
-            all_possible_wumpus.update(adjacent_cells)
+        # Several wumpuses may share the stenches, so only a known bound on
+        # their number ties the components together
+        if self.wumpus_limit is not None:
+            self.apply_wumpus_limit()
+    
+    def remaining_wumpus_budget(self) -> Optional[int]:
+        """Most live wumpuses that can still be in unknown cells, or None if unbounded"""
+        if self.wumpus_limit is None:
+            return None
+        return self.wumpus_limit - self.wumpus_kills - len(self.wumpus_cells)
+    
+    def live_wumpus_clauses(self) -> Tuple[List[FrozenSet[Tuple[int, int]]], CellMask]:
+        """
+        Get the stench clauses no known wumpus explains, and the cells that may
+        hold a wumpus without being part of any of them
+        """
+        size = self.board.size
+        clauses = []
+        cells = CellMask(size, bits=self.possible_wumpus.bits)
+        for constraint in self.stench_constraints:
+            clause = self.constraint_clause('wumpus', constraint)
+            cells |= clause
+            if clause and self.wumpus_cells.isdisjoint(clause):
+                clauses.append(clause)
+        constrained = CellMask(size, set().union(*clauses))
+        known = constrained.bits | self.wumpus_cells.bits | self.safe_from_wumpus.bits
+        return clauses, CellMask(size, bits=cells.bits & ~known)
+    
+    def apply_wumpus_limit(self):
+        """
+        A cell holds no wumpus if every way of putting one there needs more
+        wumpuses than may be left, and holds one if every way of leaving it
+        empty does. The fewest wumpuses each component needs are summed to
+        find the slack left for any single component.
+        """
+        budget = self.remaining_wumpus_budget()
+        clauses, free = self.live_wumpus_clauses()
+        components = [frozenset(component) for component in split_components(clauses)]
+        
+        if len(self.model_count_cache) >= self.component_cache_limit:
+            self.model_count_cache.clear()
+        memo = self.model_count_cache
+        minima = [min_hazards(count_models(component, memo)) for component in components]
+        if budget < 0 or None in minima or sum(minima) > budget:
+            if self.debug:
+                print("Stench constraints need more wumpuses than can be alive")
+            return
         
-        # Remove cells that are already known to be safe from wumpus
-        all_possible_wumpus = {pos for pos in all_possible_wumpus if pos not in self.safe_from_wumpus}
+        slack = budget - sum(minima)
+        if slack == 0:
+            for pos in free:
+                self.mark_safe_from_wumpus(pos)
         
-        if not all_possible_wumpus:
+        for component, minimum in zip(components, minima):
+            for pos in set().union(*component):
+                rest = frozenset(clause for clause in component if pos not in clause)
+                if 1 + min_hazards(count_models(rest, memo)) - minimum > slack:
+                    self.mark_safe_from_wumpus(pos)
+                    continue
+                reduced = frozenset(clause - {pos} for clause in component)
+                without = None if frozenset() in reduced else min_hazards(count_models(reduced, memo))
+                if without is None or without - minimum > slack:
+                    self.mark_wumpus(pos)
+    
+    def observe_shot(self, origin: Tuple[int, int], direction: str, hit: bool):
+        """
+        Learn from an arrow fired from origin. A miss means no wumpus is alive
+        anywhere on its line. A hit killed the first wumpus on the line, so
+        stenches that wumpus may have caused no longer say anything.
+        """
+        self.knowledge_version += 1
+        self.probability_cache = {'pit': {}, 'wumpus': {}}
+        
+        line = []
+        dx, dy = self.MOVE_OFFSETS[direction]
+        x, y = origin[0] + dx, origin[1] + dy
+        while self.board.is_valid_position(x, y):
+            line.append((x, y))
+            x, y = x + dx, y + dy
+        
+        if not hit:
+            for pos in line:
+                self.mark_safe_from_wumpus(pos)
             return
         
-        # Since there's only one wumpus, try each possible location
-        valid_wumpus_positions = []
+        # The victim is the first cell of the line that may hold a wumpus, up to the first known one
+        victims = []
+        for pos in line:
+            if pos in self.safe_from_wumpus:
+                continue
+            victims.append(pos)
+            if pos in self.wumpus_cells:
+                break
+        
+        # A known wumpus behind cells that may also hold one stays in wumpus_cells,
+        # where it already counts against the limit whether or not it was the victim
+        if len(victims) < 2 or victims[-1] not in self.wumpus_cells:
+            self.wumpus_kills += 1
+        
+        stale = {constraint for pos in victims for constraint in self.constraint_index['wumpus'].get(pos, ())}
+        if not self.board.wumpus_alive:
+            # That was the last one
+            stale = set(self.stench_constraints)
+            victims = list(self.wumpus_cells | self.possible_wumpus)
+        
+        for constraint in stale:
+            self.drop_constraint('wumpus', constraint)
+        if len(victims) == 1 or not self.board.wumpus_alive:
+            for pos in victims:
+                self.forget_wumpus(pos)
+    
+    def forget_wumpus(self, position: Tuple[int, int]):
+        """Record that a cell no longer holds a live wumpus"""
+        if position in self.wumpus_cells:
+            self.wumpus_cells.discard(position)
+            if position not in self.pit_cells:
+                self.dangerous_cells.discard(position)
+            self.add_knowledge(position, {'wumpus': False})
+            if position not in self.board.visited_cells:
+                self.frontier.add(position)
+        self.mark_safe_from_wumpus(position)
+    
+    def mark_pit(self, position: Tuple[int, int]):
+        """Record a cell that definitely holds a pit"""
+        if position not in self.dangerous_cells:
+            self.knowledge_version += 1
+        self.pit_cells.add(position)
+        self.dangerous_cells.add(position)
+        self.frontier.discard(position)
+        self.add_knowledge(position, {'pit': True, 'dangerous': True})
+    
+    def mark_safe_from_pits(self, position: Tuple[int, int]):
+        """Record a cell that definitely holds no pit"""
+        if position not in self.safe_from_pits:
+            self.safe_from_pits.add(position)
+            self.dirty_cells['pit'].add(position)
+            self.knowledge_version += 1
+        self.add_knowledge(position, {'safe_from_pit': True})
+        self.possible_pits.discard(position)
+    
+    def mark_wumpus(self, position: Tuple[int, int]):
+        """Record a cell that definitely holds a wumpus"""
+        if position not in self.dangerous_cells:
+            self.knowledge_version += 1
+        self.wumpus_cells.add(position)
+        self.dangerous_cells.add(position)
+        self.frontier.discard(position)
+        self.add_knowledge(position, {'wumpus': True, 'dangerous': True})
+    
+    def mark_safe_from_wumpus(self, position: Tuple[int, int]):
+        """Record a cell that definitely holds no wumpus"""
+        if position not in self.safe_from_wumpus:
+            self.safe_from_wumpus.add(position)
+            self.dirty_cells['wumpus'].add(position)
+            self.knowledge_version += 1
+        self.add_knowledge(position, {'safe_from_wumpus': True})
+        self.possible_wumpus.discard(position)
+    
+    def index_constraint(self, kind: str, constraint: Tuple):
+        """Register a new constraint under each of its cells and mark them for re-solving"""
+        index = self.constraint_index[kind]
+        for pos in constraint[1]:
+            index.setdefault(pos, set()).add(constraint)
+            self.dirty_cells[kind].add(pos)
+        self.knowledge_version += 1
+    
+    def drop_constraint(self, kind: str, constraint: Tuple):
+        """Forget a constraint that may no longer hold and mark its cells for re-solving"""
+        (self.breeze_constraints if kind == 'pit' else self.stench_constraints).discard(constraint)
+        index = self.constraint_index[kind]
+        for pos in constraint[1]:
+            constraints = index.get(pos)
+            if constraints is not None:
+                constraints.discard(constraint)
+                if not constraints:
+                    del index[pos]
+            self.dirty_cells[kind].add(pos)
+        self.knowledge_version += 1
+    
+    def constraint_clause(self, kind: str, constraint: Tuple) -> FrozenSet[Tuple[int, int]]:
+        """Cells of a constraint that may still hold the hazard"""
+        safe = self.safe_from_pits if kind == 'pit' else self.safe_from_wumpus
+        return frozenset(pos for pos in constraint[1] if pos not in safe)
+    
+    def collect_affected_constraints(self, kind: str) -> List[Tuple]:
+        """
+        Get the constraints in every component that touches a cell changed since
+        the last solve; untouched components keep their earlier conclusions
+        """
+        dirty = self.dirty_cells[kind]
+        self.dirty_cells[kind] = set()
         
-        for wumpus_pos in all_possible_wumpus:
-            if self.is_valid_wumpus_assignment(wumpus_pos):
-                valid_wumpus_positions.append(wumpus_pos)
+        if not self.incremental:
+            return list(self.breeze_constraints if kind == 'pit' else self.stench_constraints)
         
-        if self.debug:
-            print(f"Valid wumpus positions: {valid_wumpus_positions}")
-        
-        # If only one valid position, that's where the wumpus is
-        if len(valid_wumpus_positions) == 1:
-            wumpus_pos = valid_wumpus_positions[0]
-            self.wumpus_cells.add(wumpus_pos)
-            self.dangerous_cells.add(wumpus_pos)
-            self.add_knowledge(wumpus_pos, {'wumpus': True, 'dangerous': True})
-            if self.debug:
-                print(f"Definite wumpus found at {wumpus_pos}")
-            
-            # Mark other possible positions as safe from wumpus
-            for pos in all_possible_wumpus:
-                if pos != wumpus_pos:
-                    self.safe_from_wumpus.add(pos)
-                    self.add_knowledge(pos, {'safe_from_wumpus': True})
-                    self.possible_wumpus.discard(pos)
-    
-    def is_valid_pit_assignment(self, pit_positions: Set[Tuple[int, int]]) -> bool:
-        """Check if a pit assignment satisfies all breeze constraints"""
-        for breeze_pos, adjacent_cells in self.breeze_constraints:
-            # At least one adjacent cell must have a pit
-            if not any(pos in pit_positions for pos in adjacent_cells):
-                return False
-        
-        return True
-    
-    def is_valid_wumpus_assignment(self, wumpus_pos: Tuple[int, int]) -> bool:
-        """Check if a wumpus assignment satisfies all stench constraints"""
-        for stench_pos, adjacent_cells in self.stench_constraints:
-            # The wumpus must be in one of the adjacent cells
-            if wumpus_pos not in adjacent_cells:
-                return False
-        
-        return True
+        return self.find_connected_constraints(kind, dirty)
+    
+    def find_connected_constraints(self, kind: str, cells: Set[Tuple[int, int]]) -> List[Tuple]:
+        """Get every constraint linked to the given cells through cells that may still hold the hazard"""
+        index = self.constraint_index[kind]
+        safe = self.safe_from_pits if kind == 'pit' else self.safe_from_wumpus
+        connected = set()
+        seen = set(cells)
+        pending = list(cells)
+        while pending:
+            pos = pending.pop()
+            for constraint in index.get(pos, ()):
+                if constraint in connected:
+                    continue
+                connected.add(constraint)
+                for other in constraint[1]:
+                    if other not in seen and other not in safe:
+                        seen.add(other)
+                        pending.append(other)
+        return list(connected)
+    
+    def solve_component(self, kind: str, clauses: List[FrozenSet[Tuple[int, int]]],
+                        known_hazards: Set[Tuple[int, int]]) -> Optional[Tuple[Set[Tuple[int, int]], Set[Tuple[int, int]]]]:
+        """Solve one independent group of clauses, reusing the cached result if it was solved before"""
+        cells = set().union(*clauses)
+        known = {pos: True for pos in cells if pos in known_hazards}
+        key = (kind, frozenset(clauses), frozenset(known))
+        
+        if key not in self.component_cache:
+            if len(self.component_cache) >= self.component_cache_limit:
+                self.component_cache.clear()
+            self.component_cache[key] = find_backbone(clauses, known)
+        return self.component_cache[key]
+    
+    def classify_cells(self) -> int:
+        """
+        Get the mask of cells known to be completely safe: safe from pits and
+        from wumpuses, and neither dangerous nor a possible hazard. The mask is
+        recomputed only after the knowledge has changed.
+        """
+        if self.safety_version != self.knowledge_version:
+            unsafe = self.dangerous_cells.bits | self.possible_pits.bits | self.possible_wumpus.bits
+            self.safe_mask = self.safe_from_pits.bits & self.safe_from_wumpus.bits & ~unsafe
+            self.safety_version = self.knowledge_version
+        return self.safe_mask
     
     def update_safe_cells(self):
         """Update safe cells based on current knowledge"""
-        #print("logical_inference.update_safe_cells() -> ")
-        #print(f"Safe from pits: {self.safe_from_pits}")
-        #print(f"Safe from wumpus: {self.safe_from_wumpus}")
-        
-        # A cell is only safe if it's safe from BOTH pits AND wumpus
-        for pos in self.frontier:
-            if (pos not in self.dangerous_cells and 
-                pos in self.safe_from_pits and 
-                pos in self.safe_from_wumpus):
-                if pos not in self.safe_cells:
-                    self.safe_cells.add(pos)
-                    self.add_knowledge(pos, {'safe': True})
-                    if self.debug:
-                        pass
-                        #print(f"Cell {pos} is TRULY SAFE (safe from both pits and wumpus)")
-            else:
-                # Remove from safe cells if it's not completely safe
-                if pos in self.safe_cells:
-                    self.safe_cells.remove(pos)
-                    if self.debug:
-                        pit_safe = pos in self.safe_from_pits
-                        wumpus_safe = pos in self.safe_from_wumpus
-                        #print(f"Cell {pos} REMOVED from safe cells - pit_safe: {pit_safe}, wumpus_safe: {wumpus_safe}")
-                else:
-                    if self.debug:
-                        pit_safe = pos in self.safe_from_pits
-                        wumpus_safe = pos in self.safe_from_wumpus
-                        #print(f"Cell {pos} is NOT completely safe - pit_safe: {pit_safe}, wumpus_safe: {wumpus_safe}")
+        # A frontier cell is only safe if it's safe from BOTH pits AND wumpus
+        safe = self.classify_cells()
+        frontier = self.frontier.bits
+        newly_safe = frontier & safe & ~self.safe_cells.bits
+        no_longer_safe = frontier & ~safe & self.safe_cells.bits
+        if not (newly_safe or no_longer_safe):
+            return
         
-        #print(f"----------------------------------------------------------------------   Current safe cells: ---{self.safe_cells}")
+        self.safe_cells.bits = (self.safe_cells.bits | newly_safe) & ~no_longer_safe
+        self.knowledge_version += 1
+        for pos in CellMask(self.board.size, bits=newly_safe):
+            self.add_knowledge(pos, {'safe': True})
     
     def is_cell_completely_safe(self, position: Tuple[int, int]) -> bool:
         """
         FIXED: Check if a cell is completely safe (safe from both pits and wumpus)
         This is the key fix to prevent moving to unsafe cells
         """
-        # If already visited, it's safe
-        if position in self.board.visited_cells:
+        if self.classify_cells() & self.cell_bit(position):
             return True
-            
-        # If it's in dangerous cells, it's not safe
-        if position in self.dangerous_cells:
-            return False
-            
-        # If it's a possible pit or wumpus location, it's not safe
-        if position in self.possible_pits or position in self.possible_wumpus:
-            return False
-            
-        # Must be safe from both pits and wumpus
-        return (position in self.safe_from_pits and 
-                position in self.safe_from_wumpus)
+        # If already visited, it's safe
+        return position in self.board.visited_cells
+    
+    def cell_bit(self, position: Tuple[int, int]) -> int:
+        """Bit of a cell in the engine's masks"""
+        return 1 << (position[1] * self.board.size + position[0])
     
     def manhattan_distance(self, pos1: Tuple[int, int], pos2: Tuple[int, int]) -> int:
         """Calculate Manhattan distance between two positions"""
@@ -397,144 +626,240 @@ class LogicalInference:
 
     def get_safest_move(self) -> Optional[str]:
         """Get safest move with optimized gold retrieval"""
+        plan = self.get_action_plan()
+        return plan[0] if plan else None
+
+    def get_action_plan(self) -> List[str]:
+        """
+        Get the full action sequence (turns included) towards the next goal.
+        The plan is kept and reused for as long as the agent follows it and
+        no percept changes what is known to be safe or dangerous.
+        """
+        # The starting cell is sensed before any move is made
+        agent = self.board.agent
+        if agent.alive and (agent.x, agent.y) not in self.expanded_cells:
+            self.knowledge_version += 1
+            self.observe((agent.x, agent.y), self.board.get_percepts())
+        
+        pose = self.get_agent_pose()
+        if self.current_plan and self.plan_version == self.knowledge_version and self.plan_pose == pose:
+            return list(self.current_plan)
+        
+        plan = self.compute_action_plan()
+        # Planning can itself record new safe cells, so stamp the version afterwards
+        self.current_plan = list(plan)
+        self.plan_version = self.knowledge_version
+        self.plan_pose = pose
+        return plan
+
+    def get_agent_pose(self) -> Tuple:
+        """Everything about the agent that a plan depends on"""
+        agent = self.board.agent
+        return (agent.x, agent.y, agent.direction, agent.has_gold, agent.arrows)
+
+    def advance_plan(self, move):
+        """Drop the executed step from the current plan, or discard the plan if it was not followed"""
+        if (self.current_plan and move and getattr(move, 'result', False) and
+                move.action == self.current_plan[0]):
+            self.current_plan.pop(0)
+            self.plan_pose = self.get_agent_pose()
+        else:
+            self.current_plan = []
+
+    def compute_action_plan(self) -> List[str]:
+        """Plan from scratch towards the next goal"""
         agent_pos = (self.board.agent.x, self.board.agent.y)
+        self.search_cache.clear()
         
         # 1. Priority actions (gold/climb)
         if self.board.get_percepts().get('glitter', False):
-            return 'grab'
+            return ['grab']
         
         # Special case: if holding gold, focus exclusively on going home
         if self.board.agent.has_gold:
             home_pos = (0, self.board.size - 1)
             if agent_pos == home_pos:
-                return 'climb'
+                return ['climb']
             
-            # Find safest path home using strict A*
-            path = self.a_star_search(agent_pos, home_pos)
-            if path:
-                return self.get_move_from_path(agent_pos, path)
+            # Find safest route home over known-safe cells
+            plan = self.plan_actions(agent_pos, self.board.agent.direction, {home_pos})
+            if plan:
+                return plan
             
             # If no safe path exists, try riskier path home
-            risky_path = self.risky_a_star_search(agent_pos, home_pos)
-            if risky_path:
-                # Shoot any blocking Wumpus first
-                next_pos = risky_path[1]
-                if (self.is_facing(next_pos) and
-                    self.calculate_wumpus_probability(next_pos) > 0.5 and
-                    self.board.agent.arrows > 0):
-                    return 'shoot'
-                return self.get_move_from_path(agent_pos, risky_path)
-            
-            return None
+            return self.with_blocking_shot(self.plan_actions(agent_pos, self.board.agent.direction, {home_pos}, risky=True))
 
         # 2. Normal exploration logic (when not holding gold)
-        unvisited = [
-            pos for pos, knowledge in self.knowledge_base.items()
-            if not knowledge.facts.get('visited', False)
-        ]
+        unvisited = list(self.knowledge.unvisited)
         
         safe_unvisited = [pos for pos in unvisited if self.is_cell_completely_safe(pos)]
         risky_unvisited = [pos for pos in unvisited if not self.is_cell_completely_safe(pos)]
 
-        # 3. Try A* to safe targets first
+        # 3. Go to the safe target that takes the fewest actions to reach;
+        #    one search over (x, y, direction) covers every candidate
         if safe_unvisited:
-            safe_unvisited.sort(key=lambda pos: (self.manhattan_distance(agent_pos, pos)))
-            ''',
-                -len([p for p in self.board.get_adjacent_positions(*pos) 
-                    if p not in self.board.visited_cells])
-            ))'''
-            for target in safe_unvisited:
-                path = self.a_star_search(agent_pos, target)
-                if path:
-                    return self.get_move_from_path(agent_pos, path)
+            plan = self.plan_actions(agent_pos, self.board.agent.direction, set(safe_unvisited))
+            if plan:
+                return plan
 
         # 4. Backtrack if needed
         if not safe_unvisited and not self.all_unvisited_are_risky():
             backtrack_target = self.find_backtrack_target()
             if backtrack_target:
-                path = self.a_star_search(agent_pos, backtrack_target)
-                if path:
-                    return self.get_move_from_path(agent_pos, path)
+                plan = self.plan_actions(agent_pos, self.board.agent.direction, {backtrack_target})
+                if plan:
+                    return plan
 
         # 5. Only consider risky moves if ALL unvisited are risky
         if risky_unvisited and self.all_unvisited_are_risky():
-            risky_unvisited.sort(key=lambda pos: (
-                self.calculate_risk(pos),
-                self.manhattan_distance(agent_pos, pos)
-            ))
-            for target in risky_unvisited:
-                path = self.risky_a_star_search(agent_pos, target)
-                if path:
-                    next_pos = path[1]
-                    if (self.is_facing(next_pos) and
-                        self.calculate_wumpus_probability(next_pos) > 0.5 and
-                        self.board.agent.arrows > 0):
-                        return 'shoot'
-                    return self.get_move_from_path(agent_pos, path)
+            cost, _ = self.search_from(agent_pos, risky=True)
+            reachable = [pos for pos in risky_unvisited if pos in cost]
+            if reachable:
+                target = min(reachable, key=lambda pos: (
+                    self.calculate_risk(pos),
+                    self.manhattan_distance(agent_pos, pos),
+                    pos
+                ))
+                return self.with_blocking_shot(self.plan_actions(agent_pos, self.board.agent.direction, {target}, risky=True))
 
-        return None
+        return []
+
+    def with_blocking_shot(self, plan: List[str]) -> List[str]:
+        """Shoot first if the plan walks straight into a likely wumpus"""
+        if plan and plan[0] == 'forward' and self.board.agent.arrows > 0:
+            dx, dy = self.MOVE_OFFSETS[self.board.agent.direction]
+            next_pos = (self.board.agent.x + dx, self.board.agent.y + dy)
+            if self.calculate_wumpus_probability(next_pos) > 0.5:
+                return ['shoot']
+        return plan
+
+    def plan_actions(self, start: Tuple[int, int], direction: str, targets: Set[Tuple[int, int]],
+                     risky: bool = False) -> List[str]:
+        """
+        Cheapest action sequence from the agent's pose to any of the targets.
+        Searches over (x, y, direction) so turns are counted like any other action.
+        """
+        targets = set(targets) - {start}
+        if not targets or direction not in self.DIRECTIONS:
+            return []
+        
+        start_state = (start, direction)
+        cost = {start_state: 0}
+        came_from = {}
+        counter = 0
+        open_heap = [(0, counter, start_state)]
+        
+        while open_heap:
+            current_cost, _, state = heapq.heappop(open_heap)
+            if current_cost > cost[state]:
+                continue
+            
+            (x, y), facing = state
+            if (x, y) in targets:
+                actions = []
+                while state in came_from:
+                    state, action = came_from[state]
+                    actions.append(action)
+                actions.reverse()
+                return actions
+            
+            index = self.DIRECTIONS.index(facing)
+            successors = [
+                ('turn_left', ((x, y), self.DIRECTIONS[(index - 1) % 4]), 1),
+                ('turn_right', ((x, y), self.DIRECTIONS[(index + 1) % 4]), 1)
+            ]
+            dx, dy = self.MOVE_OFFSETS[facing]
+            ahead = (x + dx, y + dy)
+            if self.board.is_valid_position(*ahead):
+                step = self.step_cost(ahead, risky)
+                if step is not None:
+                    successors.append(('forward', (ahead, facing), step))
+            
+            for action, next_state, step in successors:
+                new_cost = current_cost + step
+                if next_state not in cost or new_cost < cost[next_state]:
+                    cost[next_state] = new_cost
+                    came_from[next_state] = (state, action)
+                    counter += 1
+                    heapq.heappush(open_heap, (new_cost, counter, next_state))
+        
+        return []
 
     def a_star_search(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Safe A* that only uses known-safe cells"""
-        open_set = {start}
+        return self._a_star(start, goal, risky=False)
+
+    def risky_a_star_search(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
+        """Risk-aware A* with danger penalties"""
+        return self._a_star(start, goal, risky=True)
+
+    def step_cost(self, position: Tuple[int, int], risky: bool) -> Optional[float]:
+        """Cost of entering a cell, or None if the search may not enter it"""
+        if not risky:
+            return 1 if self.is_cell_completely_safe(position) else None
+        if self.dangerous_cells.bits & self.cell_bit(position):
+            return None
+        # Higher cost for riskier cells
+        return 1 + (10 * self.calculate_risk(position))
+
+    def _a_star(self, start: Tuple[int, int], goal: Tuple[int, int], risky: bool) -> List[Tuple[int, int]]:
+        """Heap-based A* towards a single goal"""
         came_from = {}
         g_score = {start: 0}
-        f_score = {start: self.manhattan_distance(start, goal)}
+        open_heap = [(self.manhattan_distance(start, goal), 0, start)]
         
-        while open_set:
-            current = min(open_set, key=lambda pos: f_score[pos])
+        while open_heap:
+            _, current_g, current = heapq.heappop(open_heap)
+            if current_g > g_score[current]:
+                continue  # Stale heap entry
             if current == goal:
                 return self.reconstruct_path(came_from, current)
             
-            open_set.remove(current)
-            
             for neighbor in self.board.get_adjacent_positions(*current):
-                if not self.is_cell_completely_safe(neighbor):
+                cost = self.step_cost(neighbor, risky)
+                if cost is None:
                     continue
-                    
-                tentative_g = g_score[current] + 1
                 
+                tentative_g = current_g + cost
                 if neighbor not in g_score or tentative_g < g_score[neighbor]:
                     came_from[neighbor] = current
                     g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + self.manhattan_distance(neighbor, goal)
-                    if neighbor not in open_set:
-                        open_set.add(neighbor)
+                    heapq.heappush(open_heap, (tentative_g + self.manhattan_distance(neighbor, goal), tentative_g, neighbor))
         
         return []
 
-    def risky_a_star_search(self, start: Tuple[int, int], goal: Tuple[int, int]) -> List[Tuple[int, int]]:
-        """Risk-aware A* with danger penalties"""
-        open_set = {start}
+    def search_from(self, start: Tuple[int, int], risky: bool = False) -> Tuple[Dict[Tuple[int, int], float], Dict[Tuple[int, int], Tuple[int, int]]]:
+        """
+        Dijkstra from start to every reachable cell, returning (cost, came_from).
+        Results are cached for the current decision step so several targets
+        share one search.
+        """
+        key = (start, risky)
+        if key in self.search_cache:
+            return self.search_cache[key]
+        
         came_from = {}
-        g_score = {start: 0}
-        f_score = {start: self.manhattan_distance(start, goal)}
+        cost = {start: 0}
+        open_heap = [(0, start)]
         
-        while open_set:
-            current = min(open_set, key=lambda pos: f_score[pos])
-            if current == goal:
-                return self.reconstruct_path(came_from, current)
-            
-            open_set.remove(current)
+        while open_heap:
+            current_cost, current = heapq.heappop(open_heap)
+            if current_cost > cost[current]:
+                continue
             
             for neighbor in self.board.get_adjacent_positions(*current):
-                if neighbor in self.dangerous_cells:
+                step = self.step_cost(neighbor, risky)
+                if step is None:
                     continue
-                    
-                # Higher cost for riskier cells
-                risk = self.calculate_risk(neighbor)
-                cost = 1 + (10 * risk)
                 
-                tentative_g = g_score[current] + cost
-                
-                if neighbor not in g_score or tentative_g < g_score[neighbor]:
+                new_cost = current_cost + step
+                if neighbor not in cost or new_cost < cost[neighbor]:
+                    cost[neighbor] = new_cost
                     came_from[neighbor] = current
-                    g_score[neighbor] = tentative_g
-                    f_score[neighbor] = tentative_g + self.manhattan_distance(neighbor, goal)
-                    if neighbor not in open_set:
-                        open_set.add(neighbor)
+                    heapq.heappush(open_heap, (new_cost, neighbor))
         
-        return []
+        self.search_cache[key] = (cost, came_from)
+        return cost, came_from
 
     def reconstruct_path(self, came_from: dict, current: Tuple[int, int]) -> List[Tuple[int, int]]:
         """Reconstruct path from A* search results"""
@@ -547,11 +872,10 @@ class LogicalInference:
 
     def all_unvisited_are_risky(self) -> bool:
         """Check if ALL unvisited cells are risky"""
-        return all(
-            not self.is_cell_completely_safe(pos)
-            for pos, knowledge in self.knowledge_base.items()
-            if not knowledge.facts.get('visited', False)
-        )
+        if self.knowledge.unvisited_bits & self.classify_cells():
+            return False
+        # Cells the board visited before the knowledge base recorded it are safe too
+        return not any(pos in self.board.visited_cells for pos in self.knowledge.unvisited)
 
     def find_backtrack_target(self) -> Optional[Tuple[int, int]]:
         """Find best position to backtrack to"""
@@ -635,11 +959,10 @@ class LogicalInference:
     
     def calculate_risk(self, position: Tuple[int, int]) -> float:
         """Calculate risk score for a position (0 = safe, 1 = definitely dangerous)"""
-        if position in self.safe_cells and position not in self.board.visited_cells:
-            return 0.0
-        if position in self.safe_cells:
-            return 0.1
-        if position in self.dangerous_cells:
+        bit = self.cell_bit(position)
+        if self.safe_cells.bits & bit:
+            return 0.1 if position in self.board.visited_cells else 0.0
+        if self.dangerous_cells.bits & bit:
             return 1.0
         
         # Calculate probability based on constraints
@@ -653,69 +976,98 @@ class LogicalInference:
     def calculate_pit_probability(self, position: Tuple[int, int]) -> float:
         """Calculate probability that a position contains a pit"""
         # 1. Check definitive knowledge first
-        if position in self.pit_cells:
+        bit = self.cell_bit(position)
+        if self.pit_cells.bits & bit:
             return 1.0
-        if position in self.safe_from_pits:
+        if self.safe_from_pits.bits & bit or position in self.board.visited_cells:
             return 0.0
         
         # 2. Check for adjacent cells without breeze (NEW CRITICAL CHECK)
         for adj_pos in self.board.get_adjacent_positions(*position):
             adj_cell = self.board.get_cell(*adj_pos)
             if adj_cell.visited and not adj_cell.breeze:
-                self.safe_from_pits.add(position)  # Mark as definitely safe
+                self.mark_safe_from_pits(position)  # Mark as definitely safe
                 return 0.0
         
-        # 3. Original constraint-based probability calculation
-        relevant_constraints = sum(1 for _, cells in self.breeze_constraints 
-                                if position in cells)
-        total_constraints = len(self.breeze_constraints)
-        
-        if total_constraints == 0:
-            return 0.1  # Base probability for unexplored cells
-        
-        return min(0.8, relevant_constraints / total_constraints * 0.5)
+        # 3. Exact model count over the breeze constraints around this cell
+        return self.hazard_probability('pit', position)
     
     def calculate_wumpus_probability(self, position: Tuple[int, int]) -> float:
         """Calculate probability that a position contains the wumpus with negative evidence checks"""
         # 1. Check definitive knowledge first
         if not self.board.wumpus_alive:
             return 0.0
-        if position in self.wumpus_cells:
+        bit = self.cell_bit(position)
+        if self.wumpus_cells.bits & bit:
             return 1.0
-        if position in self.safe_from_wumpus:
+        if self.safe_from_wumpus.bits & bit or position in self.board.visited_cells:
             return 0.0
         
         # 2. Check for adjacent cells without stench (NEW CRITICAL CHECK)
         for adj_pos in self.board.get_adjacent_positions(*position):
             adj_cell = self.board.get_cell(*adj_pos)
             if adj_cell.visited and not adj_cell.stench:
-                self.safe_from_wumpus.add(position)  # Mark as definitely safe
+                self.mark_safe_from_wumpus(position)  # Mark as definitely safe
                 return 0.0
         
-        # 3. Check if all adjacent stenches are explained by other possible wumpus locations
-        if position in self.possible_wumpus:
-            can_explain_all = True
-            for stench_pos, _ in self.stench_constraints:
-                if position in self.board.get_adjacent_positions(*stench_pos):
-                    other_explanations = [p for p in self.possible_wumpus 
-                                        if p != position and 
-                                        p in self.board.get_adjacent_positions(*stench_pos)]
-                    if not other_explanations:
-                        can_explain_all = False
-                        break
-            
-            if not can_explain_all:
-                return 0.0  # This cell can't explain all required stenches
-        
-        # 4. Original constraint-based probability calculation
-        relevant_constraints = sum(1 for _, cells in self.stench_constraints 
-                                if position in cells)
-        total_possible = len(self.possible_wumpus)
-        
-        if relevant_constraints == 0:
-            return 0.1  # Base probability
-        
-        return min(0.8, relevant_constraints / (total_possible + 1) * 0.7)
+        # 3. Exact model count over the stench constraints around this cell
+        return self.hazard_probability('wumpus', position)
+    
+    def hazard_probability(self, kind: str, position: Tuple[int, int]) -> float:
+        """
+        Probability that a cell holds the hazard, by weighted model counting over
+        the constraint component containing it. The marginals of the whole
+        component are cached until the next percept arrives.
+        """
+        cache = self.probability_cache[kind]
+        if position in cache:
+            return cache[position]
+        
+        density = self.pit_density if kind == 'pit' else self.wumpus_density
+        known_hazards = self.pit_cells if kind == 'pit' else self.wumpus_cells
+        
+        # Clauses already satisfied by a known hazard carry no information
+        clauses = []
+        for constraint in self.find_connected_constraints(kind, {position}):
+            clause = self.constraint_clause(kind, constraint)
+            if clause and not clause & known_hazards:
+                clauses.append(clause)
+        
+        if len(self.model_count_cache) >= self.component_cache_limit:
+            self.model_count_cache.clear()
+        if kind == 'wumpus' and self.wumpus_limit is not None:
+            return self.bounded_wumpus_probability(position, clauses)
+        cache.update(hazard_marginals(clauses, density, self.model_count_cache))
+        return cache.setdefault(position, density)
+    
+    def bounded_wumpus_probability(self, position: Tuple[int, int], clauses: List[FrozenSet[Tuple[int, int]]]) -> float:
+        """
+        hazard_probability for wumpuses when their number is bounded: every
+        other component and every unconstrained cell competes for the same
+        remaining wumpuses, so their model counts are convolved in
+        """
+        cache = self.probability_cache['wumpus']
+        memo = self.model_count_cache
+        budget = self.remaining_wumpus_budget()
+        if budget <= 0:
+            return cache.setdefault(position, 0.0)
+        
+        live_clauses, _ = self.live_wumpus_clauses()
+        component = set(clauses)
+        others = [frozenset(group) for group in split_components(clause for clause in live_clauses
+                                                                 if clause not in component)]
+        
+        # Cells that may hold a wumpus but appear in no live clause
+        constrained = CellMask(self.board.size, set().union(*live_clauses))
+        unknown = self.board.size * self.board.size - len(self.safe_from_wumpus | self.wumpus_cells | constrained)
+        
+        if clauses:
+            outside = combine_counts((count_models(group, memo) for group in others), unknown, budget)
+            cache.update(bounded_hazard_marginals(clauses, self.wumpus_density, budget, outside, memo))
+            return cache.setdefault(position, 0.0)
+        
+        outside = combine_counts((count_models(group, memo) for group in others), max(0, unknown - 1), budget)
+        return cache.setdefault(position, bounded_free_probability(self.wumpus_density, budget, outside))
     
     def print_knowledge_state(self):
         """Print current knowledge state for debugging"""
@@ -737,15 +1089,15 @@ class LogicalInference:
         
 
     def print_knowledge_base(self):
-        """Prints the raw knowledge_base dictionary with detailed cell knowledge"""
+        """Prints the knowledge base with detailed cell knowledge"""
         print("\n=== KNOWLEDGE BASE DUMP ===")
         print(f"{'Position':<8} | {'Facts':<85} | {'Confidence'}")
         print("-" * 70)
         
-        for position, knowledge in self.knowledge_base.items():
+        for position, facts in self.knowledge.all_facts().items():
             x, y = position
-            facts_str = ", ".join([f"{k}:{v}" for k, v in knowledge.facts.items()])
-            print(f"({x},{y})    | {facts_str:<45} | {knowledge.confidence:.2f}")
+            facts_str = ", ".join([f"{k}:{v}" for k, v in facts.items()])
+            print(f"({x},{y})    | {facts_str:<45} | {self.knowledge.get_confidence(position):.2f}")
         
         print("=" * 70 + "\n")
 
@@ -5,6 +5,8 @@ Handles user input and manual game control
 
 from typing import Dict, List, Optional
 from .game import WumpusGame
+from .environment_generator import EnvironmentGenerator
+from .environment_pool import get_environment_pool
 from .move import Move, MoveResult
 
 
@@ -324,42 +326,16 @@ class ManualPlayer:
             'game_state': self.game.get_game_state()
         }
     
-    def generate_random_environment(self) -> Dict:
+    def generate_random_environment(self, seed: Optional[int] = None) -> Dict:
         """Generate and load a random environment"""
         try:
-            import random
-            
-            # Generate random environment
-            environment = {
-                'wumpus': {'x': random.randint(1, 8), 'y': random.randint(1, 8)},
-                'gold': {'x': random.randint(1, 8), 'y': random.randint(1, 8)},
-                'pits': []
-            }
-            
-            # Make sure wumpus and gold don't overlap
-            while environment['gold']['x'] == environment['wumpus']['x'] and environment['gold']['y'] == environment['wumpus']['y']:
-                environment['gold'] = {'x': random.randint(1, 8), 'y': random.randint(1, 8)}
-            
-            # Add random pits
-            occupied_positions = {
-                (environment['wumpus']['x'], environment['wumpus']['y']),
-                (environment['gold']['x'], environment['gold']['y']),
-                (0, 9)  # Agent starting position
-            }
-            
-            num_pits = random.randint(3, 6)
-            for _ in range(num_pits):
-                attempts = 0
-                while attempts < 20:  # Prevent infinite loop
-                    pit_x = random.randint(0, 9)
-                    pit_y = random.randint(0, 9)
-                    
-                    if (pit_x, pit_y) not in occupied_positions:
-                        environment['pits'].append({'x': pit_x, 'y': pit_y})
-                        occupied_positions.add((pit_x, pit_y))
-                        break
-                    
-                    attempts += 1
+            # Generate random environment; unseeded ones come pre-generated from the pool
+            pool = get_environment_pool()
+            if seed is None and self.game.board.size == pool.size:
+                environment = pool.take_random_template().environment
+            else:
+                generator = EnvironmentGenerator(size=self.game.board.size, seed=seed)
+                environment = generator.generate()
             
             # Load the environment
             success = self.game.load_environment(environment)
@@ -0,0 +1,258 @@
+"""
+Game Event Push for Wumpus World
+Publish/subscribe of game events per session. Views publish move results, AI
+steps and state resets as they happen; WebSocket connections and Server-Sent
+Event streams subscribe and forward them to the browser, so observers no
+longer poll. Events reach the subscribers of the publishing process at once
+and those of other processes through the event log of the shared game backend.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional, Set
+
+from django.conf import settings
+
+from .game_store import GameStateBackend, create_game_backend
+
+# Events read from the shared log at once, and events relayed between expiry runs
+RELAY_BATCH_SIZE = 500
+EXPIRE_EVENTS_EVERY = 200
+
+
+class Subscription:
+    """
+    Bounded queue of events for one observer of a session. Subscriptions made
+    with an event loop are read with get_async, the others with get. When the
+    queue is full the oldest event is dropped; clients notice the gap in state
+    versions and reload the full state.
+    """
+
+    def __init__(self, broker: 'GameEventBroker', session_id: str, max_queued: int,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.broker = broker
+        self.session_id = session_id
+        self.loop = loop
+        self.queue = asyncio.Queue(max_queued) if loop else queue.Queue(max_queued)
+        self.dropped = 0
+
+    def deliver(self, event: Dict):
+        """Queue an event; safe to call from any thread"""
+        if self.loop is None:
+            self.put(event)
+            return
+        try:
+            self.loop.call_soon_threadsafe(self.put, event)
+        except RuntimeError:
+            # The subscriber's event loop is gone
+            self.close()
+
+    def put(self, event: Dict):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except (asyncio.QueueFull, queue.Full):
+                try:
+                    self.queue.get_nowait()
+                    self.dropped += 1
+                except (asyncio.QueueEmpty, queue.Empty):
+                    pass
+
+    def get(self, timeout: float = None) -> Optional[Dict]:
+        """Wait for the next event; None after timeout seconds"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    async def get_async(self, timeout: float = None) -> Optional[Dict]:
+        """Wait for the next event from the subscriber's event loop; None after timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class EventRelay:
+    """
+    Carries events between the brokers of different server processes. Every
+    process appends the events it publishes to the shared backend's event log;
+    a process with subscribers polls the log for the events of the others.
+    """
+
+    def __init__(self, broker: 'GameEventBroker', backend: GameStateBackend, poll_interval: float = 0.25,
+                 max_age: float = 60.0):
+        self.broker = broker
+        self.backend = backend
+        self.poll_interval = poll_interval
+        self.max_age = max_age
+        # Tells this process's own events apart in the shared log
+        self.origin = uuid.uuid4().hex
+        self.thread: Optional[threading.Thread] = None
+        self.lock = threading.Lock()
+        self.metrics = {
+            'sent': 0,
+            'received': 0,
+            'errors': 0
+        }
+
+    def send(self, session_id: str, event: Dict):
+        """Append an event to the shared log for the other processes"""
+        try:
+            self.backend.append_event(session_id, json.dumps({'origin': self.origin, 'event': event}).encode())
+        except Exception as e:
+            print(f"Error relaying event for {session_id}: {e}")
+            with self.lock:
+                self.metrics['errors'] += 1
+            return
+
+        with self.lock:
+            self.metrics['sent'] += 1
+            expire = self.metrics['sent'] % EXPIRE_EVENTS_EVERY == 0
+        if expire:
+            self.backend.expire_events(self.max_age)
+
+    def start(self):
+        """Start polling the shared log, unless a poller is already running"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.poll, name='wumpus-event-relay', daemon=True)
+        self.thread.start()
+
+    def poll(self):
+        """Deliver the events of other processes to local subscribers as they appear"""
+        last_id = None
+        while True:
+            try:
+                if last_id is None:
+                    # Only events published from now on are relayed
+                    last_id = self.backend.last_event_id()
+                events = self.backend.read_events(last_id, RELAY_BATCH_SIZE)
+                received = 0
+                for last_id, session_id, data in events:
+                    message = json.loads(data)
+                    if message['origin'] != self.origin:
+                        self.broker.deliver(session_id, message['event'])
+                        received += 1
+                with self.lock:
+                    self.metrics['received'] += received
+            except Exception as e:
+                print(f"Error polling relayed events: {e}")
+                with self.lock:
+                    self.metrics['errors'] += 1
+                events = []
+            # A full batch means more events are waiting
+            if len(events) < RELAY_BATCH_SIZE:
+                time.sleep(self.poll_interval)
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            return dict(self.metrics, polling=self.thread is not None)
+
+
+class GameEventBroker:
+    """Fan-out of game events to the subscribers of each session"""
+
+    def __init__(self, max_queued: int = 100):
+        self.max_queued = max_queued
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.lock = threading.Lock()
+        # Set when other processes may publish to or subscribe to the same sessions
+        self.relay: Optional[EventRelay] = None
+        self.metrics = {
+            'published': 0,
+            'delivered': 0
+        }
+
+    def subscribe(self, session_id: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        subscription = Subscription(self, session_id, self.max_queued, loop)
+        with self.lock:
+            self.subscribers.setdefault(session_id, set()).add(subscription)
+        if self.relay is not None:
+            self.relay.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            subscribers = self.subscribers.get(subscription.session_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.subscribers[subscription.session_id]
+
+    def publish(self, session_id: str, event: Dict):
+        """Send an event to every subscriber of a session, in this and other processes"""
+        with self.lock:
+            self.metrics['published'] += 1
+        self.deliver(session_id, event)
+        if self.relay is not None:
+            self.relay.send(session_id, event)
+
+    def deliver(self, session_id: str, event: Dict):
+        """Send an event to the subscribers of a session in this process"""
+        with self.lock:
+            subscribers: List[Subscription] = list(self.subscribers.get(session_id, ()))
+            self.metrics['delivered'] += len(subscribers)
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+    def get_metrics(self) -> Dict:
+        with self.lock:
+            metrics = {
+                **self.metrics,
+                'sessions': len(self.subscribers),
+                'subscribers': sum(len(subscribers) for subscribers in self.subscribers.values())
+            }
+        if self.relay is not None:
+            metrics['relay'] = self.relay.get_metrics()
+        return metrics
+
+
+_broker: Optional[GameEventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker() -> GameEventBroker:
+    """Get the process-wide event broker, configured from settings"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = GameEventBroker(max_queued=getattr(settings, 'WUMPUS_PUSH_MAX_QUEUED', 100))
+            backend = create_game_backend()
+            if not backend.process_local:
+                _broker.relay = EventRelay(_broker, backend,
+                                           poll_interval=getattr(settings, 'WUMPUS_PUSH_POLL_INTERVAL', 0.25),
+                                           max_age=getattr(settings, 'WUMPUS_PUSH_EVENT_TTL', 60.0))
+        return _broker
+
+
+def publish_move(session_id: str, game, action: str, result, since_version: int):
+    """Publish the outcome of a move as the delta from since_version"""
+    get_event_broker().publish(session_id, {
+        'type': 'move',
+        'action': action,
+        'success': result.success,
+        'message': result.message,
+        'delta': game.get_state_delta(since_version)
+    })
+
+
+def publish_ai_steps(session_id: str, steps: List[Dict]):
+    """Publish the steps of run_ai_steps one event each"""
+    broker = get_event_broker()
+    for step in steps:
+        broker.publish(session_id, {'type': 'ai_step', 'step': step})
+
+
+def publish_state(session_id: str, game):
+    """Publish the full game state, after a reset or a new environment"""
+    get_event_broker().publish(session_id, {'type': 'state', 'game_state': game.get_game_state()})
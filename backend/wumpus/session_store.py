@@ -0,0 +1,181 @@
+"""
+Session Store for Wumpus World
+Keeps the live game objects of each session in memory with LRU and idle-TTL
+eviction. Evicted objects are snapshotted so the next request for the same
+session restores them instead of starting a new game.
+"""
+
+import pickle
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Callable, Dict, Iterator
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+
+class SessionStore(MutableMapping):
+    """Bounded mapping of session id -> live object, with snapshots of evicted entries"""
+
+    def __init__(self, name: str, max_entries: int = 1000, idle_ttl: float = 1800.0,
+                 max_snapshot_bytes: int = 64 * 1024 * 1024, clock: Callable[[], float] = time.monotonic):
+        self.name = name
+        self.max_entries = max(1, max_entries)
+        self.idle_ttl = idle_ttl
+        self.max_snapshot_bytes = max_snapshot_bytes
+        self.clock = clock
+
+        # Live objects, least recently used first
+        self.live: "OrderedDict[str, Any]" = OrderedDict()
+        self.last_access: Dict[str, float] = {}
+        self.snapshots: "OrderedDict[str, bytes]" = OrderedDict()
+        self.snapshot_bytes = 0
+        self.lock = threading.RLock()
+
+        self.metrics = {
+            'hits': 0,
+            'misses': 0,
+            'restores': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'snapshots_dropped': 0
+        }
+
+    def __contains__(self, session_id) -> bool:
+        with self.lock:
+            self.expire_idle()
+            if session_id in self.live or session_id in self.snapshots:
+                return True
+            self.metrics['misses'] += 1
+            return False
+
+    def __getitem__(self, session_id: str) -> Any:
+        with self.lock:
+            self.expire_idle()
+            if session_id in self.live:
+                self.metrics['hits'] += 1
+                self.touch(session_id)
+                return self.live[session_id]
+
+            snapshot = self.pop_snapshot(session_id)
+            if snapshot is None:
+                raise KeyError(session_id)
+
+            self.metrics['restores'] += 1
+            value = self.restore(snapshot)
+            self.insert(session_id, value)
+            return value
+
+    def __setitem__(self, session_id: str, value: Any):
+        with self.lock:
+            self.expire_idle()
+            self.pop_snapshot(session_id)
+            self.insert(session_id, value)
+
+    def __delitem__(self, session_id: str):
+        with self.lock:
+            found = self.pop_snapshot(session_id) is not None
+            if session_id in self.live:
+                del self.live[session_id]
+                del self.last_access[session_id]
+                found = True
+            if not found:
+                raise KeyError(session_id)
+
+    def __iter__(self) -> Iterator[str]:
+        with self.lock:
+            return iter(list(self.live) + [key for key in self.snapshots if key not in self.live])
+
+    def __len__(self) -> int:
+        with self.lock:
+            return len(self.live) + len(self.snapshots)
+
+    def touch(self, session_id: str):
+        """Mark a live session as most recently used"""
+        self.live.move_to_end(session_id)
+        self.last_access[session_id] = self.clock()
+
+    def insert(self, session_id: str, value: Any):
+        """Add a live session, evicting the least recently used ones beyond the limit"""
+        self.live[session_id] = value
+        self.touch(session_id)
+        while len(self.live) > self.max_entries:
+            oldest = next(iter(self.live))
+            self.evict(oldest)
+            self.metrics['evictions'] += 1
+
+    def expire_idle(self):
+        """Evict sessions idle for longer than the TTL; they sit at the front of the LRU order"""
+        if not self.idle_ttl:
+            return
+        cutoff = self.clock() - self.idle_ttl
+        while self.live:
+            oldest = next(iter(self.live))
+            if self.last_access[oldest] > cutoff:
+                break
+            self.evict(oldest)
+            self.metrics['expirations'] += 1
+
+    def evict(self, session_id: str):
+        """Move a live session into the snapshot area"""
+        value = self.live.pop(session_id)
+        del self.last_access[session_id]
+        try:
+            snapshot = self.snapshot(value)
+        except Exception as e:
+            print(f"Error snapshotting session {session_id}: {e}")
+            return
+
+        self.pop_snapshot(session_id)
+        self.snapshots[session_id] = snapshot
+        self.snapshot_bytes += len(snapshot)
+        # Oldest snapshots go first once their total size is over the budget
+        while self.snapshot_bytes > self.max_snapshot_bytes:
+            _, dropped = self.snapshots.popitem(last=False)
+            self.snapshot_bytes -= len(dropped)
+            self.metrics['snapshots_dropped'] += 1
+
+    def pop_snapshot(self, session_id: str):
+        """Remove and return the snapshot of a session, or None if it has none"""
+        snapshot = self.snapshots.pop(session_id, None)
+        if snapshot is not None:
+            self.snapshot_bytes -= len(snapshot)
+        return snapshot
+
+    def snapshot(self, value: Any) -> bytes:
+        """Serialise an evicted object"""
+        return zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+    def restore(self, snapshot: bytes) -> Any:
+        """Rebuild an object from its snapshot"""
+        return pickle.loads(zlib.decompress(snapshot))
+
+    def get_metrics(self) -> Dict:
+        """Get hit, miss and eviction counters along with the current sizes"""
+        with self.lock:
+            lookups = self.metrics['hits'] + self.metrics['restores'] + self.metrics['misses']
+            return {
+                'name': self.name,
+                **self.metrics,
+                'hit_rate': self.metrics['hits'] / lookups if lookups else 0.0,
+                'live': len(self.live),
+                'snapshots': len(self.snapshots),
+                'snapshot_bytes': self.snapshot_bytes,
+                'max_snapshot_bytes': self.max_snapshot_bytes,
+                'max_entries': self.max_entries,
+                'idle_ttl': self.idle_ttl
+            }
+
+
+def create_session_store(name: str) -> SessionStore:
+    """Create the session store configured in settings"""
+    store_class = import_string(getattr(settings, 'WUMPUS_SESSION_STORE', 'wumpus.session_store.SessionStore'))
+    return store_class(
+        name,
+        max_entries=getattr(settings, 'WUMPUS_SESSION_MAX_GAMES', 1000),
+        idle_ttl=getattr(settings, 'WUMPUS_SESSION_IDLE_TTL', 1800.0),
+        max_snapshot_bytes=getattr(settings, 'WUMPUS_SESSION_MAX_SNAPSHOT_BYTES', 64 * 1024 * 1024)
+    )
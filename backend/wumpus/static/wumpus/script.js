@@ -7,6 +7,11 @@ class WumpusWorldUI {
         this.aiPlaying = false;
         this.aiInterval = null;
         this.moveDelay = 1500; // Delay between AI moves in milliseconds
+        this.aiBatchSize = 10; // AI moves fetched per request during auto-play
+        this.aiQueue = []; // Moves already played by the server, waiting to be shown
+        this.aiFetching = false;
+        this.socket = null; // WebSocket push channel, when the server runs under ASGI
+        this.eventSource = null; // Server-Sent Events fallback
         this.csrfToken = null;
         this.showEnvironment = false; // Show environment elements by default
         
@@ -16,7 +21,93 @@ class WumpusWorldUI {
 
     async initializeCSRF() {
         await this.ensureCSRFToken();
-        this.loadGameState();
+        await this.loadGameState();
+        this.connectPush();
+    }
+
+    connectPush() {
+        // Prefer a WebSocket; servers without one get a Server-Sent Events stream
+        if (!window.WebSocket) {
+            this.connectEventSource();
+            return;
+        }
+        const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+        const socket = new WebSocket(`${protocol}//${window.location.host}/ws/game/?session_id=${encodeURIComponent(this.sessionId)}`);
+        let opened = false;
+        socket.onopen = () => {
+            opened = true;
+            this.socket = socket;
+        };
+        socket.onmessage = (message) => this.handlePushEvent(JSON.parse(message.data));
+        socket.onclose = () => {
+            this.socket = null;
+            if (!opened) {
+                this.connectEventSource();
+            } else if (this.aiPlaying && !this.aiInterval) {
+                this.pauseAI();
+            }
+        };
+    }
+
+    connectEventSource() {
+        if (!window.EventSource || this.eventSource) return;
+        this.eventSource = new EventSource(`/api/events/?session_id=${encodeURIComponent(this.sessionId)}`);
+        this.eventSource.onmessage = (message) => this.handlePushEvent(JSON.parse(message.data));
+    }
+
+    sendCommand(command) {
+        if (!this.socket || this.socket.readyState !== WebSocket.OPEN) {
+            return false;
+        }
+        this.socket.send(JSON.stringify(command));
+        return true;
+    }
+
+    handlePushEvent(event) {
+        switch (event.type) {
+            case 'state':
+                this.gameState = event.game_state;
+                this.renderBoard();
+                this.updateGameInfo();
+                break;
+            case 'move':
+                if (event.delta.full) {
+                    this.handlePushEvent({ type: 'state', game_state: event.delta.game_state });
+                    break;
+                }
+                this.applyPushedChange(event.delta.since_version, event.delta.state_version, () => {
+                    this.applyStateDelta(event.delta);
+                    this.renderBoard();
+                    this.updateGameInfo();
+                    this.updateLastMove(event.action, event.message);
+                });
+                break;
+            case 'ai_step':
+                this.applyPushedChange(event.step.since_version, event.step.state_version,
+                    () => this.applyAIStep(event.step));
+                break;
+            case 'stopped':
+                if (this.aiPlaying) {
+                    this.pauseAI();
+                }
+                break;
+            case 'error':
+                this.showMessage(event.message, 'error');
+                break;
+        }
+    }
+
+    applyPushedChange(sinceVersion, stateVersion, apply) {
+        // Changes this client already applied from its own responses are skipped;
+        // a gap means events were missed, so the full state is reloaded
+        if (!this.gameState || stateVersion <= this.gameState.state_version) {
+            return;
+        }
+        if (sinceVersion === this.gameState.state_version) {
+            apply();
+        } else {
+            this.loadGameState();
+        }
     }
 
     async ensureCSRFToken() {
@@ -431,6 +522,12 @@ class WumpusWorldUI {
             { x: 0, y: 9 };
 
         try {
+            // With a state to patch, ask only for what changed since its version
+            const request = { session_id: this.sessionId, action: action };
+            if (this.gameState?.state_version) {
+                request.since_version = this.gameState.state_version;
+                request.game_id = this.gameState.game_id;
+            }
             const response = await fetch('/api/make-move/', {
                 method: 'POST',
                 headers: {
@@ -438,15 +535,16 @@ class WumpusWorldUI {
                     'X-CSRFToken': this.getCSRFToken(),
                 },
                 credentials: 'include',
-                body: JSON.stringify({
-                    session_id: this.sessionId,
-                    action: action
-                })
+                body: JSON.stringify(request)
             });
             const data = await response.json();
+            if (data.delta) {
+                this.applyStateDelta(data.delta);
+            }
             if (data.success) {
-                const oldGameState = this.gameState;
-                this.gameState = data.game_state;
+                if (data.game_state) {
+                    this.gameState = data.game_state;
+                }
                 console.log('Game state updated:', this.gameState.agent); // Debug log
                 
                 // Current position after move
@@ -507,105 +605,119 @@ class WumpusWorldUI {
         return cookieValue ? cookieValue.pop() : '';
     }
 
-    async makeAIMove() {
-        if (this.gameMode !== 'ai' || !this.gameState || this.gameState.game_over) {
+    async fetchAISteps(steps) {
+        // One request lets the server pick and play several AI moves
+        const response = await fetch('/api/ai-step/', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json',
+                'X-CSRFToken': this.getCSRFToken(),
+            },
+            credentials: 'include',
+            body: JSON.stringify({
+                session_id: this.sessionId,
+                steps: steps
+            })
+        });
+        const data = await response.json();
+        if (!data.success) {
+            this.showMessage('AI could not determine a safe move', 'warning');
+            this.updateAISuggestion('No suggestion');
+            
+            const aiSuggestionElement = document.getElementById('ai-suggestion');
+            if (aiSuggestionElement) {
+                aiSuggestionElement.textContent = 'AI could not determine a safe move';
+            }
+            return [];
+        }
+        return data.steps;
+    }
+
+    applyStateDelta(delta) {
+        if (delta.full || !this.gameState) {
+            this.gameState = delta.game_state;
             return;
         }
 
+        delta.cells.forEach(cell => {
+            this.gameState.board[cell.y][cell.x] = cell;
+            if (cell.visited && !this.isCellVisible(cell.x, cell.y)) {
+                this.gameState.visited_cells.push([cell.x, cell.y]);
+            }
+        });
+        this.gameState.agent = { ...this.gameState.agent, ...delta.agent };
+        Object.assign(this.gameState, delta.fields);
+        this.gameState.state_version = delta.state_version;
+    }
+
+    applyAIStep(step) {
         // Store previous position for move tracking
         const previousPos = this.gameState?.agent ? 
             { x: this.gameState.agent.x, y: this.gameState.agent.y } : 
             { x: 0, y: 9 };
 
-        try {
-            const hintResponse = await fetch('/api/ai-hint/', {
-                method: 'POST',
-                headers: {
-                    'Content-Type': 'application/json',
-                    'X-CSRFToken': this.getCSRFToken(),
-                },
-                credentials: 'include',
-                body: JSON.stringify({
-                    session_id: this.sessionId
-                })
-            });
-            const hintData = await hintResponse.json();
-            if (hintData.success && hintData.suggestion) {
-                // Update AI suggestion display
-                this.updateAISuggestion(hintData.suggestion);
-                
-                // Make the suggested move
-                const moveResponse = await fetch('/api/make-move/', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                        'X-CSRFToken': this.getCSRFToken(),
-                    },
-                    credentials: 'include',
-                    body: JSON.stringify({
-                        session_id: this.sessionId,
-                        action: hintData.suggestion
-                    })
-                });
-                const moveData = await moveResponse.json();
-                if (moveData.success) {
-                    this.gameState = moveData.game_state;
-                    console.log('AI move - Game state updated:', this.gameState.agent); // Debug log
-                    
-                    // Current position after move
-                    const currentPos = this.gameState?.agent ? 
-                        { x: this.gameState.agent.x, y: this.gameState.agent.y } : 
-                        { x: 0, y: 9 };
-                    
-                    this.renderBoard();
-                    this.updateGameInfo();
-                    this.showMessage(`AI made move: ${hintData.suggestion}`, 'info');
-                    
-                    // Update last move information for AI
-                    this.updateLastMove(hintData.suggestion, moveData.message);
-                    
-                    // Add AI move to history with position tracking
-                    this.addMoveToHistory({
-                        action: hintData.suggestion,
-                        success: true,
-                        result: moveData.message,
-                        isAI: true,
-                        fromPos: previousPos,
-                        toPos: currentPos,
-                        gameState: this.gameState
-                    });
-                    
-                    // Update AI info display
-                    const aiSuggestionElement = document.getElementById('ai-suggestion');
-                    if (aiSuggestionElement) {
-                        aiSuggestionElement.textContent = `AI made move: ${hintData.suggestion}`;
-                    }
-                } else {
-                    this.showMessage(`AI move failed: ${moveData.message}`, 'error');
-                    
-                    // Update failed AI move
-                    this.updateLastMove(hintData.suggestion, moveData.message);
-                    
-                    // Add failed AI move to history
-                    this.addMoveToHistory({
-                        action: hintData.suggestion,
-                        success: false,
-                        result: moveData.message,
-                        isAI: true,
-                        fromPos: previousPos,
-                        toPos: previousPos, // Same position for failed moves
-                        gameState: this.gameState
-                    });
-                }
-            } else {
-                this.showMessage('AI could not determine a safe move', 'warning');
-                this.updateAISuggestion('No suggestion');
-                
-                const aiSuggestionElement = document.getElementById('ai-suggestion');
-                if (aiSuggestionElement) {
-                    aiSuggestionElement.textContent = 'AI could not determine a safe move';
-                }
+        // Apply only what the step changed
+        step.cells.forEach(cell => {
+            this.gameState.board[cell.y][cell.x] = cell;
+            if (cell.visited && !this.isCellVisible(cell.x, cell.y)) {
+                this.gameState.visited_cells.push([cell.x, cell.y]);
             }
+        });
+        this.gameState.agent = step.agent;
+        this.gameState.score = step.score;
+        this.gameState.moves_made = step.moves_made;
+        this.gameState.percepts = step.percepts;
+        this.gameState.wumpus_alive = step.wumpus_alive;
+        this.gameState.game_over = step.game_over;
+        this.gameState.game_won = step.game_won;
+        this.gameState.state_version = step.state_version;
+
+        const currentPos = { x: step.agent.x, y: step.agent.y };
+
+        this.updateAISuggestion(step.action);
+        this.renderBoard();
+        this.updateGameInfo();
+        this.updateLastMove(step.action, step.message);
+
+        if (step.success) {
+            this.showMessage(`AI made move: ${step.action}`, 'info');
+        } else {
+            this.showMessage(`AI move failed: ${step.message}`, 'error');
+        }
+
+        // Add AI move to history with position tracking
+        this.addMoveToHistory({
+            action: step.action,
+            success: step.success,
+            result: step.message,
+            isAI: true,
+            fromPos: previousPos,
+            toPos: step.success ? currentPos : previousPos,
+            gameState: this.gameState
+        });
+
+        // Update AI info display
+        const aiSuggestionElement = document.getElementById('ai-suggestion');
+        if (aiSuggestionElement) {
+            aiSuggestionElement.textContent = `AI made move: ${step.action}`;
+        }
+    }
+
+    flushAISteps() {
+        // Moves the server already played must still be shown
+        while (this.aiQueue.length) {
+            this.applyAIStep(this.aiQueue.shift());
+        }
+    }
+
+    async makeAIMove() {
+        if (this.gameMode !== 'ai' || !this.gameState || this.gameState.game_over) {
+            return;
+        }
+
+        try {
+            const steps = await this.fetchAISteps(1);
+            steps.forEach(step => this.applyAIStep(step));
         } catch (error) {
             console.error('Error making AI move:', error);
             this.showMessage('Error making AI move', 'error');
@@ -617,26 +729,56 @@ class WumpusWorldUI {
             return;
         }
         this.aiPlaying = true;
+        this.aiQueue = [];
         this.showMessage('AI Auto-play started', 'info');
         const autoPlayBtn = document.querySelector('button[onclick="autoPlay()"]');
         const pauseBtn = document.querySelector('button[onclick="pauseAI()"]');
         if (autoPlayBtn) autoPlayBtn.disabled = true;
         if (pauseBtn) pauseBtn.disabled = false;
+        // With a socket the server plays and pushes each move as it is made
+        if (this.sendCommand({ type: 'auto_play', delay: this.moveDelay / 1000 })) {
+            return;
+        }
         this.aiInterval = setInterval(async () => {
             if (!this.aiPlaying || !this.gameState || this.gameState.game_over) {
                 this.pauseAI();
                 return;
             }
-            await this.makeAIMove();
+            if (this.aiFetching) {
+                return;
+            }
+            // Fetch a batch of moves, then replay one per tick
+            if (!this.aiQueue.length) {
+                this.aiFetching = true;
+                try {
+                    this.aiQueue = await this.fetchAISteps(this.aiBatchSize);
+                } catch (error) {
+                    console.error('Error making AI move:', error);
+                    this.showMessage('Error making AI move', 'error');
+                } finally {
+                    this.aiFetching = false;
+                }
+                if (!this.aiPlaying) {
+                    this.flushAISteps();
+                    return;
+                }
+                if (!this.aiQueue.length) {
+                    this.pauseAI();
+                    return;
+                }
+            }
+            this.applyAIStep(this.aiQueue.shift());
         }, this.moveDelay);
     }
 
     pauseAI() {
         this.aiPlaying = false;
+        this.sendCommand({ type: 'pause' });
         if (this.aiInterval) {
             clearInterval(this.aiInterval);
             this.aiInterval = null;
         }
+        this.flushAISteps();
         
         // Reset AI info text when paused
         const aiSuggestionElement = document.getElementById('ai-suggestion');
@@ -0,0 +1,341 @@
+import os
+import random
+import tempfile
+from itertools import product
+
+from django.test import SimpleTestCase
+
+from wumpus.game_store import (GameConflictError, MemoryGameBackend, SharedGameStore, SQLiteGameBackend,
+                               serialize_game)
+from wumpus.logic.bitboard import BitboardWumpusBoard, spread_mask
+from wumpus.logic.board import WumpusBoard
+from wumpus.logic.board_codec import decode_board, encode_board
+from wumpus.logic.constraint_solver import (bounded_hazard_marginals, combine_counts, find_backbone,
+                                            hazard_marginals)
+from wumpus.logic.environment_generator import DEFAULT_PIT_DENSITY, EnvironmentGenerator
+from wumpus.logic.game import WumpusGame
+from wumpus.session_store import SessionStore
+
+
+def build_game(wumpuses, wumpus_limit=None, board_class=WumpusBoard) -> WumpusGame:
+    """Headless game on an empty 10x10 cave with the agent at (0, 9) and gold at (9, 0)"""
+    rows = [['-'] * 10 for _ in range(10)]
+    for x, y in wumpuses:
+        rows[y][x] = 'W'
+    rows[0][9] = 'G'
+    rows[9][0] = 'A'
+
+    game = WumpusGame(board_class=board_class, wumpus_limit=wumpus_limit)
+    game.set_headless(True)
+    assert game._load_from_text_lines([''.join(row) + '\n' for row in rows])
+    return game
+
+
+def walk(game: WumpusGame, directions):
+    for direction in directions:
+        result = game.make_move(f'move_{direction}')
+        assert result.success, result.message
+
+
+def random_clauses(rng: random.Random):
+    """A few small clauses over the cells of a 3x3 corner"""
+    cells = [(x, y) for x in range(3) for y in range(3)]
+    return [frozenset(rng.sample(cells, rng.randint(1, 3))) for _ in range(rng.randint(1, 4))]
+
+
+def enumerate_models(clauses, extra_cells=0, assignment=None):
+    """Yield (model, hazard count) for every assignment of the clause cells plus extra free cells that satisfies them"""
+    cells = sorted(set().union(*clauses))
+    for values in product((False, True), repeat=len(cells) + extra_cells):
+        model = dict(zip(cells, values))
+        if assignment and any(model.get(pos, value) != value for pos, value in assignment.items()):
+            continue
+        if all(any(model[pos] for pos in clause) for clause in clauses):
+            yield model, sum(values)
+
+
+def brute_force_marginals(clauses, density, extra_cells=0, limit=None):
+    """Hazard probability of each clause cell by summing the prior of every model"""
+    cells = sorted(set().union(*clauses))
+    total = 0.0
+    mass = dict.fromkeys(cells, 0.0)
+    for model, hazards in enumerate_models(clauses, extra_cells):
+        if limit is not None and hazards > limit:
+            continue
+        weight = density ** hazards * (1 - density) ** (len(cells) + extra_cells - hazards)
+        total += weight
+        for pos in cells:
+            if model[pos]:
+                mass[pos] += weight
+    return {pos: mass[pos] / total for pos in cells}
+
+
+class ObserveShotTests(SimpleTestCase):
+
+    def test_ambiguous_hit_keeps_wumpus_budget(self):
+        game = build_game([(0, 5), (8, 1)], wumpus_limit=2)
+        engine = game.inference_engine
+
+        # Learn the wumpus at (0, 5) from the stench at (1, 5) without ruling out (0, 6)
+        walk(game, ['right', 'up', 'up', 'right', 'up', 'up', 'up', 'left', 'down',
+                    'right', 'down', 'down', 'left', 'down', 'down', 'left'])
+        self.assertEqual(set(engine.wumpus_cells), {(0, 5)})
+        self.assertNotIn((0, 6), engine.safe_from_wumpus)
+
+        # Shooting up from (0, 9) may have killed a wumpus at (0, 6) or the one at (0, 5)
+        game.make_move('turn_left')
+        self.assertEqual(game.board.agent.direction, 'up')
+        game.make_move('shoot')
+        self.assertTrue(game.board.wumpus_alive)
+
+        self.assertEqual(engine.remaining_wumpus_budget(), 1)
+        self.assertGreater(engine.calculate_wumpus_probability((8, 1)), 0.0)
+
+    def test_unambiguous_hit_counts_kill(self):
+        game = build_game([(0, 5), (8, 1)], wumpus_limit=2)
+        engine = game.inference_engine
+
+        # Every cell below the wumpus at (0, 5) is known to be wumpus-free
+        walk(game, ['right', 'up', 'up', 'up', 'right', 'up', 'up', 'left', 'down',
+                    'down', 'down', 'down', 'down', 'left'])
+        self.assertEqual(set(engine.wumpus_cells), {(0, 5)})
+
+        game.make_move('turn_left')
+        game.make_move('shoot')
+
+        self.assertEqual(engine.wumpus_kills, 1)
+        self.assertNotIn((0, 5), engine.wumpus_cells)
+        self.assertEqual(engine.remaining_wumpus_budget(), 1)
+
+
+class SharedGameStoreTests(SimpleTestCase):
+
+    def setUp(self):
+        self.backend = MemoryGameBackend()
+        self.store = SharedGameStore('games', self.backend)
+
+    def test_game_round_trip(self):
+        game = build_game([(5, 5)])
+        self.store['s'] = game
+        # A fresh store has nothing cached, so the game comes from the backend
+        loaded = SharedGameStore('games', self.backend)['s']
+        self.assertEqual(loaded.get_game_state(), game.get_game_state())
+
+    def test_unreadable_game_is_a_miss(self):
+        self.backend.save('old', bytes([0]) + serialize_game(build_game([]))[1:])
+        self.backend.save('broken', serialize_game(build_game([]))[:20])
+
+        self.assertIsNone(self.store.get('old'))
+        self.assertNotIn('broken', self.store)
+        self.assertEqual(self.backend.keys(), [])
+        self.assertEqual(self.store.get_metrics()['discarded'], 2)
+
+
+class HazardPriorTests(SimpleTestCase):
+
+    def test_defaults_match_generated_boards(self):
+        engine = WumpusGame().inference_engine
+        self.assertEqual(engine.pit_density, DEFAULT_PIT_DENSITY)
+        self.assertEqual(engine.wumpus_density, 1 / 100)
+
+    def test_game_priors_survive_reset(self):
+        game = WumpusGame(pit_density=0.2, wumpus_density=0.05)
+        game.reset_game()
+        self.assertEqual((game.inference_engine.pit_density, game.inference_engine.wumpus_density), (0.2, 0.05))
+
+    def test_invalid_density_is_rejected(self):
+        with self.assertRaises(ValueError):
+            WumpusGame(pit_density=1.5)
+
+
+class BitboardPerceptTests(SimpleTestCase):
+
+    def test_removing_hazards_keeps_percepts_of_neighbours(self):
+        rng = random.Random(2)
+        for size in (3, 4, 10):
+            cells = [(x, y) for x in range(size) for y in range(size)]
+            for _ in range(50):
+                board = BitboardWumpusBoard(size)
+                for x, y in rng.sample(cells, size):
+                    (board.place_wumpus if rng.random() < 0.4 else board.place_pit)(x, y)
+                for x, y in rng.sample(cells, len(cells)):
+                    board.remove_wumpus(x, y)
+                    board.remove_pit(x, y)
+                    self.assertEqual(board.stench_mask, spread_mask(size, board.wumpus_mask))
+                    self.assertEqual(board.breeze_mask, spread_mask(size, board.pit_mask))
+
+
+class SessionStoreTests(SimpleTestCase):
+
+    def test_evicted_session_is_restored(self):
+        store = SessionStore('test', max_entries=1)
+        store['a'] = {'moves': [1, 2]}
+        store['b'] = {'moves': [3]}
+        self.assertEqual(store.get_metrics()['evictions'], 1)
+        self.assertEqual(list(store.snapshots), ['a'])
+
+        self.assertEqual(store['a'], {'moves': [1, 2]})
+        self.assertEqual(store.get_metrics()['restores'], 1)
+        self.assertEqual(list(store.snapshots), ['b'])
+
+    def test_idle_session_is_snapshotted(self):
+        now = [0.0]
+        store = SessionStore('test', idle_ttl=10.0, clock=lambda: now[0])
+        store['a'] = 'game'
+        now[0] = 11.0
+        self.assertIn('a', store)
+        self.assertEqual((len(store.live), store.get_metrics()['expirations']), (0, 1))
+        self.assertEqual(store['a'], 'game')
+
+    def test_snapshots_are_capped_by_size(self):
+        store = SessionStore('test', max_entries=1, max_snapshot_bytes=50)
+        for key in 'abcde':
+            store[key] = key * 50
+        self.assertLessEqual(store.snapshot_bytes, 50)
+        self.assertEqual(store.snapshot_bytes, sum(map(len, store.snapshots.values())))
+        self.assertGreater(store.get_metrics()['snapshots_dropped'], 0)
+        self.assertNotIn('a', store)
+
+
+class ConstraintSolverTests(SimpleTestCase):
+
+    def test_backbone_matches_enumeration(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            clauses = random_clauses(rng)
+            cells = sorted(set().union(*clauses))
+            assignment = {pos: rng.random() < 0.5 for pos in rng.sample(cells, min(len(cells), rng.randint(0, 2)))}
+            models = [model for model, _ in enumerate_models(clauses, assignment=assignment)]
+
+            backbone = find_backbone(clauses, assignment)
+            if not models:
+                self.assertIsNone(backbone)
+                continue
+            must_true, must_false = backbone
+            self.assertEqual(must_true, {pos for pos in cells if all(model[pos] for model in models)})
+            self.assertEqual(must_false, {pos for pos in cells if not any(model[pos] for model in models)})
+
+    def test_marginals_match_enumeration(self):
+        rng = random.Random(4)
+        for _ in range(100):
+            clauses = random_clauses(rng)
+            density = rng.choice([0.03, 0.06, 0.2])
+            marginals = hazard_marginals(clauses, density)
+            for pos, probability in brute_force_marginals(clauses, density).items():
+                self.assertAlmostEqual(marginals[pos], probability)
+
+    def test_bounded_marginals_match_enumeration(self):
+        rng = random.Random(5)
+        for _ in range(100):
+            clauses = random_clauses(rng)
+            density = rng.choice([0.01, 0.1, 0.3])
+            limit = rng.randint(1, 3)
+            extra_cells = rng.randint(0, 3)
+            expected = brute_force_marginals(clauses, density, extra_cells, limit) if any(
+                hazards <= limit for _, hazards in enumerate_models(clauses, extra_cells)) else {}
+
+            marginals = bounded_hazard_marginals(clauses, density, limit, combine_counts([], extra_cells))
+            self.assertEqual(set(marginals), set(expected))
+            for pos, probability in expected.items():
+                self.assertAlmostEqual(marginals[pos], probability)
+
+
+class BoardCodecTests(SimpleTestCase):
+
+    def played_board(self, board_class, directions=('right', 'up', 'up', 'right')):
+        game = build_game([(4, 4)], board_class=board_class)
+        for x, y in [(3, 3), (6, 2)]:
+            game.board.place_pit(x, y)
+        walk(game, directions)
+        return game.board
+
+    def test_round_trip(self):
+        for board_class in (WumpusBoard, BitboardWumpusBoard):
+            with self.subTest(board_class=board_class.__name__):
+                board = self.played_board(board_class)
+                data = encode_board(board)
+                decoded = decode_board(data, board_class)
+
+                self.assertEqual(encode_board(decoded), data)
+                self.assertEqual(decoded.get_board_state()['board'], board.get_board_state()['board'])
+                self.assertEqual(decoded.get_board_state()['agent'], board.get_board_state()['agent'])
+                self.assertEqual(decoded.get_percepts(), board.get_percepts())
+
+    def test_boards_decode_into_either_class(self):
+        # Game moves leave the agent flag of WumpusBoard cells behind, so the agent stays put
+        data = encode_board(self.played_board(WumpusBoard, ()))
+        self.assertEqual(encode_board(decode_board(data, BitboardWumpusBoard)), data)
+
+
+class StateDeltaTests(SimpleTestCase):
+
+    def assert_delta_applies(self, game: WumpusGame, old_state, since_version: int):
+        """Patching the old full state with the delta gives the current full state"""
+        delta = game.get_state_delta(since_version, game.game_id)
+        self.assertFalse(delta['full'])
+        new_state = game.get_game_state()
+
+        board = [[dict(cell) for cell in row] for row in old_state['board']]
+        for cell in delta['cells']:
+            board[cell['y']][cell['x']] = cell
+        self.assertEqual(board, new_state['board'])
+        self.assertEqual({**old_state['agent'], **delta['agent']}, new_state['agent'])
+        for name, value in delta['fields'].items():
+            self.assertEqual(value, new_state[name])
+        for name in ('wumpus_alive', 'game_over', 'game_won', 'score', 'moves_made', 'percepts'):
+            if name not in delta['fields']:
+                self.assertEqual(old_state[name], new_state[name])
+        self.assertEqual(delta['state_version'], new_state['state_version'])
+
+    def test_delta_matches_full_state_diff(self):
+        game = build_game([(4, 4)])
+        versions = []
+        for direction in ['right', 'up', 'up', 'right', 'down']:
+            versions.append((game.state_version, game.get_game_state()))
+            walk(game, [direction])
+        game.run_ai_steps(3)
+
+        for since_version, old_state in versions:
+            self.assert_delta_applies(game, old_state, since_version)
+
+    def test_unknown_version_gets_full_state(self):
+        game = build_game([(4, 4)])
+        self.assertTrue(game.get_state_delta(game.state_version + 1)['full'])
+        self.assertTrue(game.get_state_delta(game.state_version, 'another-game')['full'])
+
+
+class EnvironmentGeneratorTests(SimpleTestCase):
+
+    def test_same_seed_same_boards(self):
+        for size in (4, 10):
+            first = EnvironmentGenerator(size, seed=42).generate_batch(5)
+            self.assertEqual(EnvironmentGenerator(size, seed=42).generate_batch(5), first)
+            self.assertNotEqual(EnvironmentGenerator(size, seed=43).generate_batch(5), first)
+
+
+class GameConflictTests(SimpleTestCase):
+
+    def test_stale_store_copy_conflicts(self):
+        backend = MemoryGameBackend()
+        SharedGameStore('games', backend)['s'] = build_game([])
+        first, second = SharedGameStore('games', backend), SharedGameStore('games', backend)
+        stale, fresh = first['s'], second['s']
+
+        walk(fresh, ['right'])
+        second['s'] = fresh
+        walk(stale, ['up'])
+        with self.assertRaises(GameConflictError):
+            first['s'] = stale
+        self.assertEqual(first.get_metrics()['conflicts'], 1)
+        # The stale copy was dropped, so the next read sees the other store's move
+        self.assertEqual(first['s'].board.agent.x, 1)
+
+    def test_stale_expected_version_conflicts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            for backend in (MemoryGameBackend(), SQLiteGameBackend(os.path.join(directory, 'games.sqlite3'))):
+                with self.subTest(backend=type(backend).__name__):
+                    version = backend.save('s', b'first')
+                    self.assertEqual(backend.save('s', b'second', expected_version=version), version + 1)
+                    with self.assertRaises(GameConflictError):
+                        backend.save('s', b'third', expected_version=version)
+                    self.assertEqual(backend.load('s'), (version + 1, b'second'))
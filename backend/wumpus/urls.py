@@ -13,15 +13,22 @@ urlpatterns = [
     path('api/manual-command/', views.manual_command, name='manual_command'),
     path('api/auto-play/', views.auto_play_game, name='auto_play'),
     path('api/ai-hint/', views.get_ai_hint, name='ai_hint'),
+    path('api/ai-step/', views.ai_step, name='ai_step'),
     path('api/reset-game/', views.reset_game, name='reset_game'),
     path('api/game-state/', views.get_game_state, name='game_state'),
+    path('api/packed-board/', views.get_packed_board, name='packed_board'),
+    path('api/events/', views.game_events, name='game_events'),
     path('api/load-environment/', views.load_environment, name='load_environment'),
     path('api/load-environment-from-uploaded-file/', views.load_environment_from_uploaded_file, name='load_environment_from_uploaded_file'),
     path('api/benchmark/', views.run_benchmark, name='benchmark'),
     path('api/compare-strategies/', views.compare_strategies, name='compare_strategies'),
+    path('api/jobs/<str:job_id>/', views.get_job_status, name='job_status'),
+    path('api/jobs/<str:job_id>/results/', views.get_job_results, name='job_results'),
+    path('api/jobs/<str:job_id>/cancel/', views.cancel_job, name='cancel_job'),
     path('api/performance-stats/', views.get_performance_stats, name='performance_stats'),
     path('api/safe-dangerous-cells/', views.get_safe_dangerous_cells, name='safe_dangerous_cells'),
     path('api/save-game/', views.save_game_state, name='save_game'),
     path('api/statistics/', views.get_game_statistics, name='statistics'),
     path('api/random-environment/', views.get_random_environment, name='random_environment'),
+    path('api/session-stats/', views.get_session_stats, name='session_stats'),
 ]
\ No newline at end of file
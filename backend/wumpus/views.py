@@ -1,18 +1,92 @@
 from django.shortcuts import render
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+from django.conf import settings
+import asyncio
+import base64
 import json
-import random
+import threading
 import time
+from typing import Callable, Dict, List, Optional, Tuple
 from .logic.game import WumpusGame
 from .logic.manual_play import ManualPlayer
 from .logic.auto_play import AutoPlayAI
+from .logic.environment_generator import DEFAULT_PIT_DENSITY, EnvironmentGenerator
+from .logic.environment_pool import EnvironmentPool, configure_environment_pool
+from .logic.board_codec import FORMAT_VERSION as BOARD_FORMAT_VERSION, encode_board
+from .game_store import create_game_store
+from .executor import get_session_executor, run_for_session
+from .jobs import get_job_manager
+from .push import get_event_broker, publish_ai_steps, publish_move, publish_state
+from .session_store import create_session_store
 
-# Global game instances (in production, use session-based storage)
-game_instances = {}
-manual_players = {}
-auto_players = {}
+# Games live in the shared game store so any worker process can serve a session;
+# the players are per-process, bounded and evicted by the session store
+game_instances = create_game_store('games')
+manual_players = create_session_store('manual_players')
+auto_players = create_session_store('auto_players')
+
+# New games are built from pre-parsed and pre-generated board templates. The
+# pool is only warmed on first use, so importing the views (as management
+# commands and asgi.py do) parses no files and starts no threads
+environment_pool = configure_environment_pool(
+    random_pool_size=getattr(settings, 'WUMPUS_ENVIRONMENT_POOL_SIZE', 32))
+
+
+def get_warm_environment_pool() -> EnvironmentPool:
+    """Get the environment pool, warming it on the first call"""
+    environment_pool.warm()
+    return environment_pool
+
+
+def create_game(template=None) -> WumpusGame:
+    """New game whose AI uses the wumpus bound and hazard priors from settings"""
+    return WumpusGame(template=template,
+                      wumpus_limit=getattr(settings, 'WUMPUS_AI_WUMPUS_LIMIT', None),
+                      pit_density=getattr(settings, 'WUMPUS_AI_PIT_DENSITY', DEFAULT_PIT_DENSITY),
+                      wumpus_density=getattr(settings, 'WUMPUS_AI_WUMPUS_DENSITY', None))
+
+
+def get_game(session_id: str, load_default: bool = True) -> WumpusGame:
+    """Get the session's game, creating a new one if there is none"""
+    game = game_instances.get(session_id)
+    if game is None:
+        # New games start on the default environment unless asked not to
+        game = create_game(get_warm_environment_pool().get_default_template() if load_default else None)
+        game_instances[session_id] = game
+    return game
+
+
+def save_game(session_id: str, game: WumpusGame):
+    """Write a changed game back to the shared store"""
+    game_instances[session_id] = game
+
+def get_since_version(data) -> Optional[int]:
+    """
+    Read the client's acknowledged state version; None means a full snapshot
+    was asked for. Raises ValueError for a malformed version.
+    """
+    since_version = data.get('since_version')
+    if since_version in (None, '') or str(data.get('full', '')).lower() in ('1', 'true'):
+        return None
+    return int(since_version)
+
+def get_benchmark_options(data, default_games: int, strategy_count: int = 1) -> Tuple[int, int]:
+    """
+    Read the game count and seed of a benchmark request. Raises ValueError
+    for malformed values or more games than WUMPUS_MAX_BENCHMARK_GAMES.
+    """
+    try:
+        num_games = int(data.get('num_games', default_games))
+        seed = int(data.get('seed', 0))
+    except (TypeError, ValueError):
+        raise ValueError('num_games and seed must be integers')
+    
+    max_games = getattr(settings, 'WUMPUS_MAX_BENCHMARK_GAMES', 1000)
+    if num_games < 1 or num_games * strategy_count > max_games:
+        raise ValueError(f'A benchmark may play between 1 and {max_games} games in total')
+    return num_games, seed
 
 def wumpus_board(request):
     """
@@ -26,7 +100,7 @@ def wumpus_board(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def make_move(request):
+async def make_move(request):
     """
     API endpoint to make a move in the game
     """
@@ -41,23 +115,39 @@ def make_move(request):
                 'message': 'Action is required'
             }, status=400)
         
-        # Get or create game instance
-        if session_id not in game_instances:
-            game_instances[session_id] = WumpusGame()
-            # Automatically load default environment for new games
-            game_instances[session_id].load_default_environment()
-        
-        game = game_instances[session_id]
+        try:
+            since_version = get_since_version(data)
+        except (TypeError, ValueError):
+            return JsonResponse({
+                'success': False,
+                'message': 'since_version must be an integer'
+            }, status=400)
         
-        # Make the move
-        result = game.make_move(action)
+        def play():
+            # Get or create game instance
+            game = get_game(session_id)
+            
+            # Make the move; clients that track the state version only get what changed
+            previous_version = game.state_version
+            if since_version is None:
+                result = game.make_move(action)
+            else:
+                result = game.make_move(action, include_state=False)
+            save_game(session_id, game)
+            publish_move(session_id, game, action, result, previous_version)
+            
+            response = {
+                'success': result.success,
+                'message': result.message,
+                'percepts': result.percepts
+            }
+            if since_version is None:
+                response['game_state'] = result.game_state
+            else:
+                response['delta'] = game.get_state_delta(since_version, data.get('game_id'))
+            return JsonResponse(response)
         
-        return JsonResponse({
-            'success': result.success,
-            'message': result.message,
-            'game_state': result.game_state,
-            'percepts': result.percepts
-        })
+        return await run_for_session(session_id, play)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -72,7 +162,7 @@ def make_move(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def manual_command(request):
+async def manual_command(request):
     """
     API endpoint for manual play commands
     """
@@ -87,16 +177,19 @@ def manual_command(request):
                 'message': 'Command is required'
             }, status=400)
         
-        # Get or create manual player instance
-        if session_id not in manual_players:
-            manual_players[session_id] = ManualPlayer()
-        
-        player = manual_players[session_id]
-        
-        # Process the command
-        result = player.process_command(command)
+        def run_command():
+            # Get or create manual player instance
+            if session_id not in manual_players:
+                manual_players[session_id] = ManualPlayer()
+            
+            player = manual_players[session_id]
+            
+            # Process the command
+            result = player.process_command(command)
+            
+            return JsonResponse(result)
         
-        return JsonResponse(result)
+        return await run_for_session(session_id, run_command)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -111,7 +204,7 @@ def manual_command(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def auto_play_game(request):
+async def auto_play_game(request):
     """
     API endpoint to start auto-play game
     """
@@ -121,23 +214,27 @@ def auto_play_game(request):
         strategy = data.get('strategy', 'random')
         environment = data.get('environment')
         
-        # Get or create auto player instance
-        if session_id not in auto_players:
-            auto_players[session_id] = AutoPlayAI()
-        
-        ai_player = auto_players[session_id]
-        
-        # Set strategy
-        ai_player.set_strategy(strategy)
-        
-        # Play the game
-        result = ai_player.play_game(environment, verbose=False)
+        def play():
+            # Get or create auto player instance
+            if session_id not in auto_players:
+                auto_players[session_id] = AutoPlayAI()
+            
+            ai_player = auto_players[session_id]
+            
+            # Set strategy
+            ai_player.set_strategy(strategy)
+            ai_player.set_headless(data.get('headless', False))
+            
+            # Play the game
+            result = ai_player.play_game(environment, verbose=False)
+            
+            return JsonResponse({
+                'success': True,
+                'message': 'Auto-play game completed',
+                'result': result
+            })
         
-        return JsonResponse({
-            'success': True,
-            'message': 'Auto-play game completed',
-            'result': result
-        })
+        return await run_for_session(session_id, play)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -152,7 +249,7 @@ def auto_play_game(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def get_ai_hint(request):
+async def get_ai_hint(request):
     """
     API endpoint to get AI hint for next move
     """
@@ -160,55 +257,53 @@ def get_ai_hint(request):
         data = json.loads(request.body)
         session_id = data.get('session_id', 'default')
         
-        # Get game instance
-        if session_id not in game_instances:
-            game_instances[session_id] = WumpusGame()
-            # Automatically load default environment for new games
-            game_instances[session_id].load_default_environment()
-        
-        game = game_instances[session_id]
-        
-        # Debug: Print game state
-        print(f"Game over: {game.board.game_over}")
-        print(f"Agent position: ({game.board.agent.x}, {game.board.agent.y})")
-        print(f"Agent alive: {game.board.agent.alive}")
-        
-        # Get AI suggestion
-        suggestion = game.get_ai_suggestion()
-        
-        # Debug: Print suggestion
-        print(f"AI suggestion: {suggestion}")
-        
-        if suggestion:
-            return JsonResponse({
-                'success': True,
-                'suggestion': suggestion,
-                'message': f'AI suggests: {suggestion}'
-            })
-        else:
-            # Try some fallback moves
-            possible_actions = game.get_possible_actions()
-            print(f"Possible actions: {possible_actions}")
-            
-            if possible_actions:
-                # Simple fallback: prefer forward movement
-                if 'forward' in possible_actions:
-                    suggestion = 'forward'
-                elif 'turn_right' in possible_actions:
-                    suggestion = 'turn_right'
-                else:
-                    suggestion = possible_actions[0]
-                
+        def suggest():
+            # Get game instance
+            game = get_game(session_id)
+            
+            # Debug: Print game state
+            print(f"Game over: {game.board.game_over}")
+            print(f"Agent position: ({game.board.agent.x}, {game.board.agent.y})")
+            print(f"Agent alive: {game.board.agent.alive}")
+            
+            # Get AI suggestion
+            suggestion = game.get_ai_suggestion()
+            
+            # Debug: Print suggestion
+            print(f"AI suggestion: {suggestion}")
+            
+            if suggestion:
                 return JsonResponse({
                     'success': True,
                     'suggestion': suggestion,
-                    'message': f'AI suggests (fallback): {suggestion}'
+                    'message': f'AI suggests: {suggestion}'
                 })
             else:
-                return JsonResponse({
-                    'success': False,
-                    'message': 'No AI suggestion available - no possible actions'
-                })
+                # Try some fallback moves
+                possible_actions = game.get_possible_actions()
+                print(f"Possible actions: {possible_actions}")
+                
+                if possible_actions:
+                    # Simple fallback: prefer forward movement
+                    if 'forward' in possible_actions:
+                        suggestion = 'forward'
+                    elif 'turn_right' in possible_actions:
+                        suggestion = 'turn_right'
+                    else:
+                        suggestion = possible_actions[0]
+                    
+                    return JsonResponse({
+                        'success': True,
+                        'suggestion': suggestion,
+                        'message': f'AI suggests (fallback): {suggestion}'
+                    })
+                else:
+                    return JsonResponse({
+                        'success': False,
+                        'message': 'No AI suggestion available - no possible actions'
+                    })
+        
+        return await run_for_session(session_id, suggest)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -226,33 +321,87 @@ def get_ai_hint(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def reset_game(request):
+async def ai_step(request):
     """
-    API endpoint to reset the game
+    API endpoint to let the AI choose and play one or more moves in a single request.
+    Returns what changed after each step instead of the full game state
     """
     try:
         data = json.loads(request.body)
         session_id = data.get('session_id', 'default')
+        try:
+            steps = int(data.get('steps', 1))
+        except (TypeError, ValueError):
+            return JsonResponse({
+                'success': False,
+                'message': 'steps must be an integer'
+            }, status=400)
+        steps = max(1, min(steps, getattr(settings, 'WUMPUS_MAX_AI_STEPS', 200)))
+        until = data.get('until')
         
-        # Reset game instance
-        if session_id in game_instances:
-            game_instances[session_id].reset_game()
-            # Load default environment after reset
-            game_instances[session_id].load_default_environment()
-        else:
-            game_instances[session_id] = WumpusGame()
-            # Automatically load default environment for new games
-            game_instances[session_id].load_default_environment()
+        if until not in (None, 'new_cell', 'percept', 'gold'):
+            return JsonResponse({
+                'success': False,
+                'message': "until must be one of 'new_cell', 'percept' or 'gold'"
+            }, status=400)
+        
+        def play():
+            game = get_game(session_id)
+            
+            # Play the steps
+            result = game.run_ai_steps(steps, until)
+            save_game(session_id, game)
+            publish_ai_steps(session_id, result['steps'])
+            
+            return JsonResponse({
+                'success': bool(result['steps']),
+                'message': f"AI played {len(result['steps'])} step(s), stopped: {result['stopped']}",
+                'game_id': result['game_id'],
+                'state_version': result['state_version'],
+                'steps': result['steps'],
+                'stopped': result['stopped']
+            })
         
-        # Reset manual player if exists
-        if session_id in manual_players:
-            manual_players[session_id].reset_game()
+        return await run_for_session(session_id, play)
         
+    except json.JSONDecodeError:
         return JsonResponse({
-            'success': True,
-            'message': 'Game reset successfully',
-            'game_state': game_instances[session_id].get_game_state()
-        })
+            'success': False,
+            'message': 'Invalid JSON data'
+        }, status=400)
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Error playing AI steps: {str(e)}'
+        }, status=500)
+
+@csrf_exempt
+@require_http_methods(["POST"])
+async def reset_game(request):
+    """
+    API endpoint to reset the game
+    """
+    try:
+        data = json.loads(request.body)
+        session_id = data.get('session_id', 'default')
+        
+        def reset():
+            # Reset game instance onto the default environment
+            game = create_game(get_warm_environment_pool().get_default_template())
+            save_game(session_id, game)
+            publish_state(session_id, game)
+            
+            # Reset manual player if exists
+            if session_id in manual_players:
+                manual_players[session_id].reset_game()
+            
+            return JsonResponse({
+                'success': True,
+                'message': 'Game reset successfully',
+                'game_state': game.get_game_state()
+            })
+        
+        return await run_for_session(session_id, reset)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -267,29 +416,41 @@ def reset_game(request):
 
 @csrf_exempt
 @require_http_methods(["GET", "POST"])
-def get_game_state(request):
+async def get_game_state(request):
     """
     API endpoint to get current game state
     """
     try:
         if request.method == 'POST':
             data = json.loads(request.body)
-            session_id = data.get('session_id', 'default')
         else:
-            session_id = request.GET.get('session_id', 'default')
+            data = request.GET
+        session_id = data.get('session_id', 'default')
         
-        # Get game instance
-        if session_id not in game_instances:
-            game_instances[session_id] = WumpusGame()
-            # Automatically load default environment for new games
-            game_instances[session_id].load_default_environment()
+        try:
+            since_version = get_since_version(data)
+        except (TypeError, ValueError):
+            return JsonResponse({
+                'success': False,
+                'message': 'since_version must be an integer'
+            }, status=400)
         
-        game = game_instances[session_id]
+        def read_state():
+            # Get game instance
+            game = get_game(session_id)
+            
+            if since_version is not None:
+                return JsonResponse({
+                    'success': True,
+                    'delta': game.get_state_delta(since_version, data.get('game_id'))
+                })
+            
+            return JsonResponse({
+                'success': True,
+                'game_state': game.get_game_state()
+            })
         
-        return JsonResponse({
-            'success': True,
-            'game_state': game.get_game_state()
-        })
+        return await run_for_session(session_id, read_state)
         
     except json.JSONDecodeError:
         return JsonResponse({
@@ -304,7 +465,7 @@ def get_game_state(request):
 
 @csrf_exempt
 @require_http_methods(["POST"])
-def load_environment(request):
+async def load_environment(request):
     """
     API endpoint to load a custom environment configuration
     """
@@ -319,27 +480,29 @@ def load_environment(request):
                 'message': 'Environment data is required'
             }, status=400)
         
-        # Get or create game instance
-        if session_id not in game_instances:
-            game_instances[session_id] = WumpusGame()
+        def load():
+            # Get or create game instance
             # Note: Don't auto-load default here since we're loading custom environment
+            game = get_game(session_id, load_default=False)
+            
+            # Load the environment
+            success = game.load_environment(environment)
+            save_game(session_id, game)
+            publish_state(session_id, game)
+            
+            if success:
+                return JsonResponse({
+                    'success': True,
+                    'message': 'Environment loaded successfully',
+                    'game_state': game.get_game_state()
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Failed to load environment'
+                }, status=400)
         
-        game = game_instances[session_id]
-        
-        # Load the environment
-        success = game.load_environment(environment)
-        
-        if success:
-            return JsonResponse({
-                'success': True,
-                'message': 'Environment loaded successfully',
-                'game_state': game.get_game_state()
-            })
-        else:
-            return JsonResponse({
-                'success': False,
-                'message': 'Failed to load environment'
-            }, status=400)
+        return await run_for_session(session_id, load)
             
     except json.JSONDecodeError:
         return JsonResponse({
@@ -352,40 +515,58 @@ def load_environment(request):
             'message': f'Error loading environment: {str(e)}'
         }, status=500)
 
+def record_job_results(session_id: str, results: List[Dict]):
+    """Merge games played by a background job into the stats of the session's auto player"""
+    if session_id not in auto_players:
+        auto_players[session_id] = AutoPlayAI()
+    
+    ai_player = auto_players[session_id]
+    for result in results:
+        ai_player.record_game_result(result)
+
+def job_results_recorder(session_id: str) -> Callable[[List[Dict]], None]:
+    """
+    Callback for a job's results. The player is looked up when the results
+    arrive, on the session executor, so the merge neither races with other
+    requests of the session nor lands on a player that has since been evicted
+    """
+    def record(results: List[Dict]):
+        get_session_executor().submit(session_id, record_job_results, session_id, results)
+    return record
+
 @csrf_exempt
 @require_http_methods(["POST"])
 def run_benchmark(request):
     """
-    API endpoint to run AI benchmark
+    API endpoint to start an AI benchmark as a background job
     """
     try:
         data = json.loads(request.body)
         session_id = data.get('session_id', 'default')
-        num_games = data.get('num_games', 10)
+        num_games, seed = get_benchmark_options(data, 10)
         strategy = data.get('strategy', 'logical')
         environment = data.get('environment')
         
-        # Get or create auto player instance
-        if session_id not in auto_players:
-            auto_players[session_id] = AutoPlayAI()
-        
-        ai_player = auto_players[session_id]
-        ai_player.set_strategy(strategy)
-        
-        # Run benchmark
-        benchmark_result = ai_player.run_benchmark(num_games, environment)
+        # Queue the benchmark; the session's auto player collects its performance stats
+        job = get_job_manager().submit_benchmark(strategy, num_games, environment, seed=seed,
+                                                 on_results=job_results_recorder(session_id))
         
         return JsonResponse({
             'success': True,
-            'message': 'Benchmark completed',
-            'benchmark_result': benchmark_result
-        })
+            'message': 'Benchmark started',
+            'job': job.to_dict()
+        }, status=202)
         
     except json.JSONDecodeError:
         return JsonResponse({
             'success': False,
             'message': 'Invalid JSON data'
         }, status=400)
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -396,34 +577,36 @@ def run_benchmark(request):
 @require_http_methods(["POST"])
 def compare_strategies(request):
     """
-    API endpoint to compare AI strategies
+    API endpoint to start an AI strategy comparison as a background job
     """
     try:
         data = json.loads(request.body)
         session_id = data.get('session_id', 'default')
         strategies = data.get('strategies', ['logical', 'random', 'cautious'])
-        num_games = data.get('num_games', 20)
-        
-        # Get or create auto player instance
-        if session_id not in auto_players:
-            auto_players[session_id] = AutoPlayAI()
-        
-        ai_player = auto_players[session_id]
+        if not isinstance(strategies, list):
+            raise ValueError('strategies must be a list')
+        num_games, seed = get_benchmark_options(data, 20, len(strategies))
         
-        # Compare strategies
-        comparison_result = ai_player.compare_strategies(strategies, num_games)
+        # Queue the comparison
+        job = get_job_manager().submit_comparison(strategies, num_games, seed=seed,
+                                                  on_results=job_results_recorder(session_id))
         
         return JsonResponse({
             'success': True,
-            'message': 'Strategy comparison completed',
-            'comparison_result': comparison_result
-        })
+            'message': 'Strategy comparison started',
+            'job': job.to_dict()
+        }, status=202)
         
     except json.JSONDecodeError:
         return JsonResponse({
             'success': False,
             'message': 'Invalid JSON data'
         }, status=400)
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'message': str(e)
+        }, status=400)
     except Exception as e:
         return JsonResponse({
             'success': False,
@@ -431,27 +614,95 @@ def compare_strategies(request):
         }, status=500)
 
 @require_http_methods(["GET"])
-def get_performance_stats(request):
+def get_job_status(request, job_id):
+    """
+    API endpoint to get the status of a background job
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Job not found'
+        }, status=404)
+    
+    return JsonResponse({
+        'success': True,
+        'job': job.to_dict()
+    })
+
+@require_http_methods(["GET"])
+def get_job_results(request, job_id):
+    """
+    API endpoint to get the results a background job has produced so far.
+    Optional query parameter offset skips results the client already has
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Job not found'
+        }, status=404)
+    
+    try:
+        offset = max(0, int(request.GET.get('offset', 0)))
+    except ValueError:
+        return JsonResponse({
+            'success': False,
+            'message': 'Offset must be an integer'
+        }, status=400)
+    
+    return JsonResponse({
+        'success': True,
+        'job': job.partial_results(offset)
+    })
+
+@csrf_exempt
+@require_http_methods(["POST"])
+def cancel_job(request, job_id):
+    """
+    API endpoint to cancel a background job
+    """
+    job_manager = get_job_manager()
+    job = job_manager.get(job_id)
+    if job is None:
+        return JsonResponse({
+            'success': False,
+            'message': 'Job not found'
+        }, status=404)
+    
+    cancelled = job_manager.cancel(job_id)
+    
+    return JsonResponse({
+        'success': cancelled,
+        'message': 'Cancellation requested' if cancelled else 'Job has already finished',
+        'job': job.to_dict()
+    })
+
+@require_http_methods(["GET"])
+async def get_performance_stats(request):
     """
     API endpoint to get AI performance statistics
     """
     try:
         session_id = request.GET.get('session_id', 'default')
         
-        # Get auto player instance
-        if session_id not in auto_players:
+        def read_stats():
+            # Get auto player instance
+            if session_id not in auto_players:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'No AI player found'
+                }, status=404)
+            
+            ai_player = auto_players[session_id]
+            stats = ai_player.get_performance_stats()
+            
             return JsonResponse({
-                'success': False,
-                'message': 'No AI player found'
-            }, status=404)
+                'success': True,
+                'performance_stats': stats
+            })
         
-        ai_player = auto_players[session_id]
-        stats = ai_player.get_performance_stats()
-        
-        return JsonResponse({
-            'success': True,
-            'performance_stats': stats
-        })
+        return await run_for_session(session_id, read_stats)
         
     except Exception as e:
         return JsonResponse({
@@ -460,30 +711,32 @@ def get_performance_stats(request):
         }, status=500)
 
 @require_http_methods(["GET"])
-def get_safe_dangerous_cells(request):
+async def get_safe_dangerous_cells(request):
     """
     API endpoint to get safe and dangerous cells
     """
     try:
         session_id = request.GET.get('session_id', 'default')
         
-        # Get game instance
-        if session_id not in game_instances:
+        def classify():
+            # Get game instance
+            game = game_instances.get(session_id)
+            if game is None:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'No active game found'
+                }, status=404)
+            
+            safe_cells = game.get_safe_cells()
+            dangerous_cells = game.get_dangerous_cells()
+            
             return JsonResponse({
-                'success': False,
-                'message': 'No active game found'
-            }, status=404)
-        
-        game = game_instances[session_id]
-        
-        safe_cells = game.get_safe_cells()
-        dangerous_cells = game.get_dangerous_cells()
+                'success': True,
+                'safe_cells': safe_cells,
+                'dangerous_cells': dangerous_cells
+            })
         
-        return JsonResponse({
-            'success': True,
-            'safe_cells': safe_cells,
-            'dangerous_cells': dangerous_cells
-        })
+        return await run_for_session(session_id, classify)
         
     except Exception as e:
         return JsonResponse({
@@ -592,79 +845,177 @@ def get_game_statistics(request):
 @require_http_methods(["GET"])
 def get_random_environment(request):
     """
-    Generate a random valid environment configuration
+    Generate a random valid environment configuration.
+    Optional query parameters: seed, size, pit_density
     """
-    
-    board_size = 10
-    agent_start = {'x': 0, 'y': 9}
-    
-    # Generate random positions avoiding agent start
-    def get_random_position():
-        while True:
-            x = random.randint(0, board_size - 1)
-            y = random.randint(0, board_size - 1)
-            if x != agent_start['x'] or y != agent_start['y']:
-                return {'x': x, 'y': y}
-    
-    # Generate random environment
-    environment = {}
-    
-    # Place wumpus (not too close to agent)
-    while True:
-        wumpus_pos = get_random_position()
-        # Ensure wumpus is not adjacent to agent start
-        if abs(wumpus_pos['x'] - agent_start['x']) > 1 or abs(wumpus_pos['y'] - agent_start['y']) > 1:
-            environment['wumpus'] = wumpus_pos
-            break
-    
-    # Place gold (random location)
-    while True:
-        gold_pos = get_random_position()
-        if (gold_pos['x'] != environment['wumpus']['x'] or 
-            gold_pos['y'] != environment['wumpus']['y']):
-            environment['gold'] = gold_pos
-            break
-    
-    # Place pits (4-7 pits for good challenge)
-    num_pits = random.randint(4, 7)
-    pits = []
-    occupied_positions = [
-        (environment['wumpus']['x'], environment['wumpus']['y']),
-        (environment['gold']['x'], environment['gold']['y']),
-        (agent_start['x'], agent_start['y'])
-    ]
-    
-    # Ensure at least one safe adjacent cell to agent start
-    safe_adjacent = [
-        (agent_start['x'] + 1, agent_start['y']),
-        (agent_start['x'], agent_start['y'] - 1)
-    ]
-    
-    for _ in range(num_pits):
-        attempts = 0
-        while attempts < 50:  # Prevent infinite loop
-            pit_pos = get_random_position()
-            pos_tuple = (pit_pos['x'], pit_pos['y'])
-            
-            # Don't place pit in occupied positions or safe adjacent cells
-            if (pos_tuple not in occupied_positions and 
-                pos_tuple not in safe_adjacent):
-                pits.append(pit_pos)
-                occupied_positions.append(pos_tuple)
-                break
-            attempts += 1
-    
-    environment['pits'] = pits
+    try:
+        seed = request.GET.get('seed')
+        size = int(request.GET.get('size', 10))
+        max_size = getattr(settings, 'WUMPUS_MAX_BOARD_SIZE', 10)
+        if size > max_size:
+            raise ValueError(f"Board size must be at most {max_size}")
+        generator = EnvironmentGenerator(
+            size=size,
+            pit_density=float(request.GET.get('pit_density', DEFAULT_PIT_DENSITY)),
+            seed=int(seed) if seed is not None else None
+        )
+        pool = get_warm_environment_pool()
+        if seed is None and (generator.size, generator.pit_density) == (pool.size, pool.pit_density):
+            # Unseeded default boards come pre-generated from the pool
+            environment = pool.take_random_template().environment
+        else:
+            environment = generator.generate()
+    except ValueError as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Invalid environment parameters: {str(e)}'
+        }, status=400)
     
     return JsonResponse({
         'success': True,
         'environment': environment,
-        'message': f'Generated environment with {len(pits)} pits'
+        'board_size': generator.size,
+        'seed': generator.seed,
+        'message': f'Generated environment with {len(environment["pits"])} pits'
     })
 
+def format_event(event) -> str:
+    """Format a game event as a Server-Sent Events message"""
+    return f"data: {json.dumps(event)}\n\n"
+
+def event_stream(session_id: str, heartbeat: float):
+    """Blocking event stream, for WSGI servers"""
+    subscription = get_event_broker().subscribe(session_id)
+    try:
+        yield format_event({'type': 'state', 'game_state': get_game(session_id).get_game_state()})
+        while True:
+            event = subscription.get(heartbeat)
+            yield format_event(event) if event is not None else ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+class SyncEventStream:
+    """
+    Blocking event stream that holds one of the process's sync stream slots
+    until the server closes it, even if it was never iterated
+    """
+
+    def __init__(self, session_id: str, heartbeat: float):
+        self.stream = event_stream(session_id, heartbeat)
+        self.closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        return next(self.stream)
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.stream.close()
+            release_sync_stream()
+
+# Each blocking stream ties up a WSGI worker thread, so only so many are served at once
+_sync_streams = 0
+_sync_streams_lock = threading.Lock()
+
+def acquire_sync_stream() -> bool:
+    """Take a sync stream slot, unless WUMPUS_PUSH_MAX_SYNC_STREAMS are already open"""
+    global _sync_streams
+    with _sync_streams_lock:
+        if _sync_streams >= getattr(settings, 'WUMPUS_PUSH_MAX_SYNC_STREAMS', 8):
+            return False
+        _sync_streams += 1
+        return True
+
+def release_sync_stream():
+    global _sync_streams
+    with _sync_streams_lock:
+        _sync_streams -= 1
+
+async def async_event_stream(session_id: str, heartbeat: float):
+    """Event stream served from the event loop, for ASGI servers; idle observers hold no thread"""
+    subscription = get_event_broker().subscribe(session_id, asyncio.get_running_loop())
+    try:
+        game_state = await run_for_session(session_id, lambda: get_game(session_id).get_game_state())
+        yield format_event({'type': 'state', 'game_state': game_state})
+        while True:
+            event = await subscription.get_async(heartbeat)
+            yield format_event(event) if event is not None else ": keep-alive\n\n"
+    finally:
+        subscription.close()
+
+@require_http_methods(["GET"])
+def game_events(request):
+    """
+    Server-Sent Events stream of a session's game events: the full state first,
+    then moves, AI steps and resets as they happen. Fallback for clients
+    without a WebSocket connection. Under WSGI each stream holds a worker
+    thread, so streams beyond WUMPUS_PUSH_MAX_SYNC_STREAMS get a 503.
+    """
+    session_id = request.GET.get('session_id', 'default')
+    heartbeat = getattr(settings, 'WUMPUS_PUSH_HEARTBEAT', 15.0)
+    
+    # ASGI requests carry their scope; only there can the stream be asynchronous
+    if hasattr(request, 'scope'):
+        stream = async_event_stream(session_id, heartbeat)
+    elif acquire_sync_stream():
+        stream = SyncEventStream(session_id, heartbeat)
+    else:
+        response = JsonResponse({
+            'success': False,
+            'message': 'Too many event streams open; use the WebSocket or retry later'
+        }, status=503)
+        response['Retry-After'] = str(int(heartbeat))
+        return response
+    
+    response = StreamingHttpResponse(stream, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+@require_http_methods(["GET"])
+async def get_packed_board(request):
+    """
+    Get the session's board in the packed format of board_codec. Clients that
+    accept application/octet-stream (or pass format=binary) get the raw bytes,
+    everyone else a base64 string in JSON.
+    """
+    try:
+        session_id = request.GET.get('session_id', 'default')
+        
+        def pack():
+            game = get_game(session_id)
+            data = encode_board(game.board)
+            
+            if (request.GET.get('format') == 'binary' or
+                    'application/octet-stream' in request.headers.get('Accept', '')):
+                response = HttpResponse(data, content_type='application/octet-stream')
+                response['X-Wumpus-Game-Id'] = game.game_id
+                response['X-Wumpus-State-Version'] = str(game.state_version)
+                return response
+            
+            return JsonResponse({
+                'success': True,
+                'game_id': game.game_id,
+                'state_version': game.state_version,
+                'encoding': 'base64',
+                'format_version': BOARD_FORMAT_VERSION,
+                'board': base64.b64encode(data).decode('ascii')
+            })
+        
+        return await run_for_session(session_id, pack)
+        
+    except Exception as e:
+        return JsonResponse({
+            'success': False,
+            'message': f'Error packing board: {str(e)}'
+        }, status=500)
+
 @csrf_exempt
 @require_http_methods(["POST"])
-def load_environment_from_uploaded_file(request):
+async def load_environment_from_uploaded_file(request):
     """
     API endpoint to load environment from uploaded file content
     """
@@ -679,29 +1030,31 @@ def load_environment_from_uploaded_file(request):
                 'message': 'File content is required'
             }, status=400)
         
-        # Get or create game instance
-        if session_id not in game_instances:
-            game_instances[session_id] = WumpusGame()
-        
-        game = game_instances[session_id]
-        
-        # Split file content into lines
-        lines = file_content.strip().split('\n')
-        
-        # Load from text lines using the existing method
-        success = game._load_from_text_lines(lines)
+        def load():
+            # Get or create game instance
+            game = get_game(session_id, load_default=False)
+            
+            # Split file content into lines
+            lines = file_content.strip().split('\n')
+            
+            # Load from text lines using the existing method
+            success = game._load_from_text_lines(lines)
+            save_game(session_id, game)
+            publish_state(session_id, game)
+            
+            if success:
+                return JsonResponse({
+                    'success': True,
+                    'message': 'Environment loaded from uploaded file',
+                    'game_state': game.get_game_state()
+                })
+            else:
+                return JsonResponse({
+                    'success': False,
+                    'message': 'Failed to load environment from uploaded file. Please check the file format.'
+                }, status=400)
         
-        if success:
-            return JsonResponse({
-                'success': True,
-                'message': 'Environment loaded from uploaded file',
-                'game_state': game.get_game_state()
-            })
-        else:
-            return JsonResponse({
-                'success': False,
-                'message': 'Failed to load environment from uploaded file. Please check the file format.'
-            }, status=400)
+        return await run_for_session(session_id, load)
             
     except json.JSONDecodeError:
         return JsonResponse({
@@ -721,4 +1074,21 @@ def handler404(request, exception):
 
 def handler500(request):
     """Custom 500 error handler"""
-    return render(request, 'wumpus/500.html', status=500)
\ No newline at end of file
+    return render(request, 'wumpus/500.html', status=500)
+
+@require_http_methods(["GET"])
+def get_session_stats(request):
+    """
+    API endpoint to get session store metrics
+    """
+    return JsonResponse({
+        'success': True,
+        'session_stats': {
+            'games': game_instances.get_metrics(),
+            'manual_players': manual_players.get_metrics(),
+            'auto_players': auto_players.get_metrics(),
+            'push': get_event_broker().get_metrics(),
+            'executor': get_session_executor().get_metrics(),
+            'environment_pool': environment_pool.get_metrics()
+        }
+    })
@@ -0,0 +1,157 @@
+"""
+WebSocket Endpoint for Wumpus World
+Plain ASGI application serving ws/game/?session_id=... . A connection first
+receives the full game state, then every event published for its session.
+Clients can send moves, AI step requests and auto-play start/pause commands
+over the same socket; their results reach every observer of the session.
+"""
+
+import asyncio
+import json
+from typing import Dict, Optional
+from urllib.parse import parse_qs
+
+from django.conf import settings
+
+from .executor import run_for_session
+from .push import Subscription, get_event_broker, publish_ai_steps, publish_move
+from .views import get_game, save_game
+
+WEBSOCKET_PATH = '/ws/game/'
+
+
+def play_move(session_id: str, action: str):
+    """Make a move in a session's game and publish it"""
+    game = get_game(session_id)
+    since_version = game.state_version
+    result = game.make_move(action, include_state=False)
+    save_game(session_id, game)
+    publish_move(session_id, game, action, result, since_version)
+
+
+def play_ai_steps(session_id: str, steps: int) -> Dict:
+    """Let the AI play up to steps moves in a session's game and publish them"""
+    game = get_game(session_id)
+    result = game.run_ai_steps(steps)
+    save_game(session_id, game)
+    publish_ai_steps(session_id, result['steps'])
+    return result
+
+
+def get_state(session_id: str) -> Dict:
+    return get_game(session_id).get_game_state()
+
+
+class GameSocket:
+    """One WebSocket connection observing (and optionally driving) a session's game"""
+
+    def __init__(self, scope: Dict, receive, send):
+        self.receive = receive
+        self.send = send
+        query = parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        self.session_id = query.get('session_id', ['default'])[0]
+        self.subscription: Optional[Subscription] = None
+        self.auto_play_task: Optional[asyncio.Task] = None
+        self.closed = False
+
+    async def run(self):
+        message = await self.receive()
+        if message['type'] != 'websocket.connect':
+            return
+        await self.send({'type': 'websocket.accept'})
+
+        self.subscription = get_event_broker().subscribe(self.session_id, asyncio.get_running_loop())
+        reader = asyncio.create_task(self.read_commands())
+        heartbeat = getattr(settings, 'WUMPUS_PUSH_HEARTBEAT', 15.0)
+        try:
+            game_state = await run_for_session(self.session_id, get_state, self.session_id)
+            await self.send_event({'type': 'state', 'game_state': game_state})
+            while not self.closed:
+                event = await self.subscription.get_async(heartbeat)
+                if self.closed:
+                    break
+                await self.send_event(event if event is not None else {'type': 'heartbeat'})
+        except Exception as e:
+            print(f"Error in game socket for {self.session_id}: {e}")
+        finally:
+            self.closed = True
+            self.subscription.close()
+            self.stop_auto_play()
+            reader.cancel()
+
+    async def send_event(self, event: Dict):
+        await self.send({'type': 'websocket.send', 'text': json.dumps(event)})
+
+    def notify(self, event: Dict):
+        """Queue an event for this connection only"""
+        self.subscription.put(event)
+
+    async def read_commands(self):
+        """Handle client commands until the socket closes"""
+        try:
+            while True:
+                message = await self.receive()
+                if message['type'] == 'websocket.disconnect':
+                    break
+                if message['type'] != 'websocket.receive':
+                    continue
+                try:
+                    await self.handle_command(json.loads(message.get('text') or message.get('bytes') or '{}'))
+                except (ValueError, TypeError) as e:
+                    self.notify({'type': 'error', 'message': f'Invalid command: {str(e)}'})
+                except Exception as e:
+                    self.notify({'type': 'error', 'message': f'Error handling command: {str(e)}'})
+        finally:
+            self.closed = True
+            # Wake the event loop in run()
+            self.notify({'type': 'closed'})
+
+    async def handle_command(self, command: Dict):
+        kind = command.get('type')
+        if kind == 'move':
+            if not command.get('action'):
+                raise ValueError('action is required')
+            await run_for_session(self.session_id, play_move, self.session_id, command['action'])
+        elif kind == 'ai_step':
+            steps = max(1, min(int(command.get('steps', 1)), getattr(settings, 'WUMPUS_MAX_AI_STEPS', 200)))
+            result = await run_for_session(self.session_id, play_ai_steps, self.session_id, steps)
+            if not result['steps']:
+                self.notify({'type': 'stopped', 'reason': result['stopped']})
+        elif kind == 'auto_play':
+            delay = max(float(command.get('delay', 1.5)), getattr(settings, 'WUMPUS_AUTO_PLAY_MIN_DELAY', 0.05))
+            if self.auto_play_task is None or self.auto_play_task.done():
+                self.auto_play_task = asyncio.create_task(self.auto_play(delay))
+        elif kind == 'pause':
+            self.stop_auto_play()
+        elif kind == 'state':
+            game_state = await run_for_session(self.session_id, get_state, self.session_id)
+            self.notify({'type': 'state', 'game_state': game_state})
+        else:
+            raise ValueError(f'unknown command type {kind!r}')
+
+    async def auto_play(self, delay: float):
+        """Play one AI move per delay seconds until the game ends or the AI is stuck"""
+        try:
+            while not self.closed:
+                result = await run_for_session(self.session_id, play_ai_steps, self.session_id, 1)
+                if result['stopped'] != 'steps':
+                    self.notify({'type': 'stopped', 'reason': result['stopped']})
+                    return
+                await asyncio.sleep(delay)
+        except Exception as e:
+            self.notify({'type': 'stopped', 'reason': 'error', 'message': str(e)})
+
+    def stop_auto_play(self):
+        if self.auto_play_task is not None:
+            self.auto_play_task.cancel()
+            self.auto_play_task = None
+
+
+async def game_websocket(scope: Dict, receive, send):
+    """ASGI application for game WebSocket connections"""
+    if scope['path'] != WEBSOCKET_PATH:
+        message = await receive()
+        if message['type'] == 'websocket.connect':
+            await send({'type': 'websocket.close', 'code': 4404})
+        return
+    await GameSocket(scope, receive, send).run()